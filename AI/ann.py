@@ -0,0 +1,127 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+import numpy as np
+
+# 갤러리가 이 크기를 넘으면 recognize_faces 가 전수 비교 대신 근사 검색을 사용
+DEFAULT_ANN_THRESHOLD = 20000
+DEFAULT_NPROBE = 32  # bench_ann.py: 사람당 사진이 적은 4만 개 갤러리에서 recall@1 ~97% (8 이면 ~88%)
+INDEX_SUFFIX = ".ivf.npz"
+ASSIGN_CHUNK_ROWS = 4096
+
+
+#저장소 옆에 두는 인덱스 파일 경로 (encodings.fenc -> encodings.fenc.ivf.npz)
+def index_path_for(encodings_location: Path) -> Path:
+    encodings_location = Path(encodings_location)
+    return encodings_location.with_name(encodings_location.name + INDEX_SUFFIX)
+
+
+#인덱스가 어떤 갤러리로 만들어졌는지 확인하는 값 (인코딩 수 + 노름 배열 해시)
+def gallery_fingerprint(norms) -> str:
+    return f"{len(norms)}:{hashlib.sha1(np.ascontiguousarray(norms, dtype=np.float32).tobytes()).hexdigest()}"
+
+
+def _squared_distances(rows, centroids, centroid_norms):
+    rows = np.asarray(rows, dtype=np.float32)
+    return np.einsum("ij,ij->i", rows, rows)[:, None] + centroid_norms[None, :] - 2.0 * (rows @ centroids.T)
+
+
+def _restore(rows, scales=None) -> np.ndarray:
+    rows = np.asarray(rows, dtype=np.float32)
+    return rows * scales if scales is not None else rows
+
+
+#각 행에서 가장 가까운 중심 번호 (메모리를 아끼려고 행을 나눠서 계산, scales 는 int8 갤러리의 차원별 배율)
+def _assign(matrix, centroids, scales=None):
+    centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+    assignments = np.empty(len(matrix), dtype=np.int32)
+    for start in range(0, len(matrix), ASSIGN_CHUNK_ROWS):
+        chunk = _restore(matrix[start:start + ASSIGN_CHUNK_ROWS], scales)
+        assignments[start:start + len(chunk)] = np.argmin(_squared_distances(chunk, centroids, centroid_norms), axis=1)
+    return assignments
+
+
+#k-means 역색인 (IVF): 갤러리를 n_lists 개의 묶음으로 나누고, 검색 시 가까운 nprobe 개 묶음만 비교
+class IVFIndex:
+    def __init__(self, centroids, order, offsets, fingerprint: str = ""):
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.centroid_norms = np.einsum("ij,ij->i", self.centroids, self.centroids)
+        self.order = np.ascontiguousarray(order, dtype=np.int32)      # 묶음 순서로 정렬된 행 번호
+        self.offsets = np.ascontiguousarray(offsets, dtype=np.int64)  # 묶음 i 는 order[offsets[i]:offsets[i + 1]]
+        self.fingerprint = fingerprint
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, matrix, n_lists: Optional[int] = None, iterations: int = 10, sample_size: int = 65536,
+              seed: int = 0, fingerprint: str = "", scales=None) -> "IVFIndex":
+        count = len(matrix)
+        if n_lists is None:
+            n_lists = int(np.clip(round(4 * np.sqrt(count)), 1, 4096))
+        n_lists = max(1, min(n_lists, count))
+        rng = np.random.default_rng(seed)
+        # 중심은 표본으로만 학습하고, 마지막에 전체 행을 배정
+        sample_rows = np.sort(rng.choice(count, size=min(count, max(sample_size, n_lists)), replace=False))
+        sample = _restore(matrix[sample_rows], scales)
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = _assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            counts = np.bincount(assignments, minlength=n_lists)
+            filled = counts > 0
+            centroids[filled] = sums[filled] / counts[filled, None]
+            # 빈 묶음은 임의의 표본으로 다시 시작
+            if not filled.all():
+                centroids[~filled] = sample[rng.choice(len(sample), size=int((~filled).sum()), replace=False)]
+        assignments = _assign(matrix, centroids, scales)
+        order = np.argsort(assignments, kind="stable")
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(assignments, minlength=n_lists))))
+        return cls(centroids, order, offsets, fingerprint)
+
+    def candidates(self, query, nprobe: int = DEFAULT_NPROBE) -> np.ndarray:
+        """query 와 가까운 nprobe 개 묶음에 속한 행 번호"""
+        nprobe = min(nprobe, self.n_lists)
+        distances = _squared_distances(np.asarray(query, dtype=np.float32)[None, :], self.centroids, self.centroid_norms)[0]
+        probes = np.argpartition(distances, nprobe - 1)[:nprobe] if nprobe < self.n_lists else np.arange(self.n_lists)
+        return np.concatenate([self.order[self.offsets[probe]:self.offsets[probe + 1]] for probe in probes])
+
+    def save(self, index_location: Path) -> Path:
+        index_location = Path(index_location)
+        fd, tmp_name = tempfile.mkstemp(prefix=index_location.name + ".", suffix=".tmp.npz", dir=index_location.parent)
+        os.close(fd)
+        try:
+            np.savez(tmp_name, centroids=self.centroids, order=self.order, offsets=self.offsets,
+                     fingerprint=np.array(self.fingerprint))
+            os.replace(tmp_name, index_location)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+            raise
+        return index_location
+
+    @classmethod
+    def load(cls, index_location: Path) -> "IVFIndex":
+        with np.load(index_location, allow_pickle=False) as data:
+            return cls(data["centroids"], data["order"], data["offsets"], str(data["fingerprint"]))
+
+
+#저장소 옆의 인덱스를 불러오고, 없거나 갤러리가 바뀌었으면 새로 만들어 저장
+def load_or_build_index(encodings_location: Path, matrix, norms, n_lists: Optional[int] = None, scales=None) -> IVFIndex:
+    index_location = index_path_for(encodings_location)
+    fingerprint = gallery_fingerprint(norms)
+    if index_location.exists():
+        try:
+            index = IVFIndex.load(index_location)
+            if index.fingerprint == fingerprint:
+                return index
+        except (OSError, KeyError, ValueError):
+            pass
+    print(f"[INFO] Building ANN index for {len(matrix)} encodings")
+    index = IVFIndex.build(matrix, n_lists=n_lists, fingerprint=fingerprint, scales=scales)
+    index.save(index_location)
+    return index
@@ -0,0 +1,72 @@
+import io
+import json
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+#인식 서버와 통신할 수 없을 때
+class RecognitionServerError(RuntimeError):
+    pass
+
+
+#상주 인식 서버(detector.py --serve) 용 클라이언트
+# 결과는 [{"name": ..., "box": [top, right, bottom, left], "distance": ...}, ...] 형태
+class RecognitionClient:
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, timeout: float = 30.0):
+        self.base_url = f"http://{host}:{port}"
+        self.timeout = timeout
+
+    def _request(self, path: str, body: bytes = None, content_type: str = None, timeout: float = None) -> dict:
+        request = urllib.request.Request(self.base_url + path, data=body, method="POST" if body is not None else "GET")
+        if content_type:
+            request.add_header("Content-Type", content_type)
+        try:
+            with urllib.request.urlopen(request, timeout=timeout or self.timeout) as response:
+                return json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            raise RecognitionServerError(f"{path}: {e.code} {e.read().decode('utf-8', 'replace')}") from e
+        except (urllib.error.URLError, OSError) as e:
+            raise RecognitionServerError(f"{self.base_url} is not reachable: {e}") from e
+
+    def health(self) -> dict:
+        return self._request("/health", timeout=1.0)
+
+    def is_available(self) -> bool:
+        """서버가 떠 있으면 True (GUI / 도어 유닛에서 서버 사용 여부 결정용)"""
+        try:
+            return self.health().get("status") == "ok"
+        except RecognitionServerError:
+            return False
+
+    def serves(self, encodings_location) -> bool:
+        """서버가 떠 있고 encodings_location 과 같은 저장소로 인식하면 True (다른 학습 데이터로 인식하지 않도록)"""
+        try:
+            health = self.health()
+        except RecognitionServerError:
+            return False
+        served = health.get("encodings")
+        return (health.get("status") == "ok" and served is not None
+                and Path(served).resolve() == Path(encodings_location).expanduser().resolve())
+
+    def reload(self) -> dict:
+        return self._request("/reload", body=b"")
+
+    def recognize_path(self, image_location, model: str = "hog") -> list:
+        """서버와 같은 컴퓨터에 있는 이미지 파일 경로로 인식"""
+        body = json.dumps({"path": str(Path(image_location).absolute())}).encode("utf-8")
+        return self._request(f"/recognize?model={model}", body, "application/json")["faces"]
+
+    def recognize_bytes(self, image_bytes: bytes, model: str = "hog") -> list:
+        """jpg/png 등 인코딩된 이미지 바이트로 인식"""
+        return self._request(f"/recognize?model={model}", image_bytes, "application/octet-stream")["faces"]
+
+    def recognize_array(self, image, model: str = "hog") -> list:
+        """RGB numpy 배열을 .npy 형식으로 보내서 jpg 인코딩/디코딩 없이 인식"""
+        import numpy as np
+        buffer = io.BytesIO()
+        np.save(buffer, np.ascontiguousarray(image, dtype=np.uint8), allow_pickle=False)
+        return self._request(f"/recognize?model={model}", buffer.getvalue(), "application/x-npy")["faces"]
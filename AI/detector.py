@@ -1,31 +1,61 @@
 import argparse
-import pickle
-from collections import Counter
+import os
+import time
+from functools import partial
+from itertools import repeat
 from pathlib import Path
+from typing import Callable, Optional
 from PIL import Image, ImageDraw
 import numpy as np
-import face_recognition
 
-DEFAULT_ENCODINGS_PATH = Path("../output/encodings.pkl")
+# face_recognition(dlib)은 import 할 때 모델 파일까지 읽어서 느리므로 처음 사용할 때 불러옴 (_face_recognition 참고)
+try:
+    from AI.encoding_cache import DEFAULT_CACHE_DIR, EncodingCache
+    from AI.evaluation import ValidationReport, ground_truth_for
+    from AI.manifest import TrainingManifest, TrainReport, file_digest
+    from AI.matcher import DEFAULT_TOLERANCE, GalleryMatcher, pairwise_distances
+    from AI.store import PRECISIONS, convert_store, migrate_pickle, write_store
+except ImportError:  # AI 폴더 안에서 detector.py 를 직접 실행하는 경우
+    from encoding_cache import DEFAULT_CACHE_DIR, EncodingCache
+    from evaluation import ValidationReport, ground_truth_for
+    from manifest import TrainingManifest, TrainReport, file_digest
+    from matcher import DEFAULT_TOLERANCE, GalleryMatcher, pairwise_distances
+    from store import PRECISIONS, convert_store, migrate_pickle, write_store
+
+TRAINING_DIR = Path("../training")
+VALIDATION_DIR = Path("../validation")
+DEFAULT_REPORT_DIR = Path("../output/validation")
+DEFAULT_COMPARE_OUTPUT = Path("../output/compare")
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".gif", ".jfif", ".webp"}
+DEFAULT_ENCODINGS_PATH = Path("../output/encodings.fenc")
+DEFAULT_MANIFEST_PATH = Path("../output/manifest.pkl")
+LEGACY_ENCODINGS_PATH = Path("../output/encodings.pkl")
 BOUNDING_BOX_COLOR = "blue"
 TEXT_COLOR = "white"
 
-#CLI 설정
-parser = argparse.ArgumentParser(description="Recognize faces in an image")
-parser.add_argument("--train", action="store_true", help="Train on input data")
-parser.add_argument("--validate", action="store_true", help="Validate trained model")
-parser.add_argument("--test", action="store_true", help="Test the model with an unknown image")
-parser.add_argument("-m", action="store", default="hog", choices=["hog", "cnn"], help="Which model to use for training: hog (CPU), cnn (GPU)")
-parser.add_argument("-f", action="store", help="Path to an image with an unknown face")
-parser.add_argument("--compare", action="store_true", help="Compare faces between two images")
-parser.add_argument("--image1", action="store", help="Path to the first image")
-parser.add_argument("--image2", action="store", help="Path to the second image")
-args = parser.parse_args()
-
-#저장소 생성
-Path("../training").mkdir(exist_ok=True)
-Path("../output").mkdir(exist_ok=True)
-Path("../validation").mkdir(exist_ok=True)
+_face_recognition_module = None
+
+
+#face_recognition 모듈을 처음 필요할 때 import (dlib 와 모델 파일 로딩이 여기서 일어남)
+def _face_recognition():
+    global _face_recognition_module
+    if _face_recognition_module is None:
+        import face_recognition
+        _face_recognition_module = face_recognition
+    return _face_recognition_module
+
+#모델 미리 불러오기 (GUI/서버 시작 직후 백그라운드에서 호출하면 첫 요청이 빨라짐)
+# encodings_location 을 주면 저장소 파일도 한 번 읽어서 페이지 캐시에 올려둠, 걸린 시간(초) 반환
+def warm_up(model: str = "hog", encodings_location: Optional[Path] = None) -> float:
+    started = time.perf_counter()
+    face_recognition = _face_recognition()
+    blank = np.zeros((64, 64, 3), dtype=np.uint8)
+    face_recognition.face_locations(blank, model=model)
+    face_recognition.face_encodings(blank, [(0, 64, 64, 0)])
+    if encodings_location is not None and Path(encodings_location).exists():
+        matcher = GalleryMatcher.from_file(encodings_location)
+        float(np.asarray(matcher.matrix).sum())
+    return time.perf_counter() - started
 
 #이미지 형식 변경 함수
 def load_image(file_path):
@@ -36,46 +66,103 @@ def load_image(file_path):
     print(f"Image mode after conversion: {image.mode}")
     return np.array(image)
 
-#학습 데이터 인코딩
-def encode_known_faces(model: str = "hog", encodings_location: Path = DEFAULT_ENCODINGS_PATH) -> None:
-    names = []
-    encodings = []
-    for filepath in Path("../training").glob("*/*"):
-        name = filepath.parent.name
-        image = load_image(filepath)
-        face_locations = face_recognition.face_locations(image, model=model)
-        face_encodings = face_recognition.face_encodings(image, face_locations)
-        for encoding in face_encodings:
-            names.append(name)
-            encodings.append(encoding)
-    name_encodings = {"names": names, "encodings": encodings}
-    with encodings_location.open(mode="wb") as f:
-        pickle.dump(name_encodings, f)
-
-#비교 인식 함수
-def recognize_faces(image_location: str, model: str = "hog", encodings_location: Path = DEFAULT_ENCODINGS_PATH) -> None:
-    with encodings_location.open(mode="rb") as f:
-        loaded_encodings = pickle.load(f)
+#검출에 사용할 축소 비율 (scale 과 max_side 중 더 많이 줄이는 쪽, 확대는 하지 않음)
+def detection_scale(image_shape, scale: float = 1.0, max_side: Optional[int] = None) -> float:
+    if max_side:
+        scale = min(scale, max_side / max(image_shape[:2]))
+    return min(scale, 1.0)
+
+#축소한 이미지에서 얼굴을 찾고 위치를 원본 좌표(top, right, bottom, left)로 되돌림
+# 인코딩은 이 위치로 원본 해상도 이미지에서 계산하므로 정확도는 유지되고 검출 시간만 줄어듦
+def detect_faces(image, model: str = "hog", scale: float = 1.0, max_side: Optional[int] = None,
+                 upsample: int = 1) -> list:
+    factor = detection_scale(image.shape, scale, max_side)
+    if factor >= 1.0:
+        return _face_recognition().face_locations(image, number_of_times_to_upsample=upsample, model=model)
+    height, width = image.shape[:2]
+    small_size = (max(1, round(width * factor)), max(1, round(height * factor)))
+    small_image = np.asarray(Image.fromarray(image).resize(small_size, Image.BILINEAR))
+    face_locations = _face_recognition().face_locations(small_image, number_of_times_to_upsample=upsample, model=model)
+    return [(max(0, round(top / factor)), min(width, round(right / factor)),
+             min(height, round(bottom / factor)), max(0, round(left / factor)))
+            for top, right, bottom, left in face_locations]
+
+#이미지 한 장의 얼굴 인코딩 (프로세스 풀에서 실행되므로 모듈 최상위 함수로 둠)
+def _encode_image(filepath: Path, model: str = "hog", scale: float = 1.0, max_side: Optional[int] = None):
+    image = load_image(filepath)
+    face_locations = detect_faces(image, model=model, scale=scale, max_side=max_side)
+    return _face_recognition().face_encodings(image, face_locations)
+
+#학습 데이터 인코딩 (manifest 에 기록된 해시와 비교해 새로 추가되거나 바뀐 사진만 인코딩)
+# workers > 1 이면 프로세스 풀에서 병렬로 인코딩, 0 이면 CPU 코어 수만큼 사용
+# progress(done, total) 는 사진 한 장이 끝날 때마다 호출됨
+# precision 이 float16 / int8 이면 저장소를 그 정밀도로 기록 (manifest 에는 원래 인코딩이 남음)
+def encode_known_faces(model: str = "hog", encodings_location: Path = DEFAULT_ENCODINGS_PATH,
+                       manifest_location: Path = DEFAULT_MANIFEST_PATH, full: bool = False,
+                       workers: int = 1, progress: Optional[Callable[[int, int], None]] = None,
+                       scale: float = 1.0, max_side: Optional[int] = None, precision: str = "float32") -> TrainReport:
+    manifest = TrainingManifest() if full else TrainingManifest.load(manifest_location)
+    filepaths = sorted(filepath for filepath in TRAINING_DIR.glob("*/*") if filepath.is_file())
+    pending, skipped = manifest.plan(TRAINING_DIR, filepaths, model, scale, max_side)
+    workers = workers or os.cpu_count() or 1
+    results = [None] * len(pending)
+    if workers > 1 and len(pending) > 1:
+        from concurrent.futures import ProcessPoolExecutor, as_completed  # 병렬 학습에서만 필요
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+            futures = {pool.submit(_encode_image, filepath, model, scale, max_side): index for index, (filepath, _, _) in enumerate(pending)}
+            for done, future in enumerate(as_completed(futures), start=1):
+                results[futures[future]] = future.result()
+                if progress:
+                    progress(done, len(pending))
+    else:
+        for index, (filepath, _, _) in enumerate(pending):
+            results[index] = _encode_image(filepath, model, scale, max_side)
+            if progress:
+                progress(index + 1, len(pending))
+    # 끝난 순서와 상관없이 항상 경로 순서대로 기록
+    for (filepath, key, digest), face_encodings in zip(pending, results):
+        manifest.update(filepath, key, digest, model, face_encodings, scale, max_side)
+    removed = manifest.prune(filepath.relative_to(TRAINING_DIR).as_posix() for filepath in filepaths)
+    manifest.save(manifest_location)
+    names, encodings = manifest.gallery()
+    write_store(encodings_location, names, encodings, precision=precision)
+    # 갤러리가 커서 근사 검색을 쓰게 되면 인덱스도 여기서 미리 만들어 둠 (첫 인식이 느려지지 않도록)
+    GalleryMatcher.from_file(encodings_location)
+    report = TrainReport([key for _, key, _ in pending], skipped, removed)
+    print(f"[INFO] Training done: {report.summary()}")
+    return report
+
+#이미지 배열에서 얼굴을 찾아 이름, 위치(top, right, bottom, left), 최소 거리를 반환
+def recognize_image(image, matcher: GalleryMatcher, model: str = "hog", scale: float = 1.0,
+                    max_side: Optional[int] = None) -> list:
+    face_locations = detect_faces(image, model=model, scale=scale, max_side=max_side)
+    face_encodings = _face_recognition().face_encodings(image, face_locations)
+    # 이미지 안의 얼굴 전부를 한 번에 매칭
+    return _describe_faces(face_locations, matcher.match(face_encodings, k=1))
+
+#얼굴 위치와 매칭 결과를 JSON 으로 보낼 수 있는 dict 목록으로 변환
+def _describe_faces(face_locations, results) -> list:
+    return [{"name": result.name or "Unknown",
+             "box": [int(value) for value in bounding_box],
+             "distance": result.distances[0] if result.distances else None}
+            for bounding_box, result in zip(face_locations, results)]
+
+#비교 인식 함수 (client 를 넘기면 상주 중인 인식 서버에 맡김)
+def recognize_faces(image_location: str, model: str = "hog", encodings_location: Path = DEFAULT_ENCODINGS_PATH,
+                    client=None, scale: float = 1.0, max_side: Optional[int] = None) -> None:
     input_image = load_image(image_location)
-    input_face_locations = face_recognition.face_locations(input_image, model=model)
-    input_face_encodings = face_recognition.face_encodings(input_image, input_face_locations)
+    if client is not None:
+        faces = client.recognize_path(image_location, model=model)
+    else:
+        faces = recognize_image(input_image, GalleryMatcher.from_file(encodings_location), model=model,
+                                scale=scale, max_side=max_side)
     pillow_image = Image.fromarray(input_image)
     draw = ImageDraw.Draw(pillow_image)
-    for bounding_box, unknown_encoding in zip(input_face_locations, input_face_encodings):
-        name = _recognize_face(unknown_encoding, loaded_encodings)
-        if not name:
-            name = "Unknown"
-        _display_face(draw, bounding_box, name)
+    for face in faces:
+        _display_face(draw, face["box"], face["name"])
     del draw
     pillow_image.show()
 
-#이름 매칭 함수
-def _recognize_face(unknown_encoding, loaded_encodings):
-    boolean_matches = face_recognition.compare_faces(loaded_encodings["encodings"], unknown_encoding)
-    votes = Counter(name for match, name in zip(boolean_matches, loaded_encodings["names"]) if match)
-    if votes:
-        return votes.most_common(1)[0][0]
-
 #얼굴 범위 표시 함수
 def _display_face(draw, bounding_box, name): 
     top, right, bottom, left = bounding_box
@@ -84,41 +171,204 @@ def _display_face(draw, bounding_box, name):
     draw.rectangle(((text_left, text_top), (text_right, text_bottom)), fill="blue", outline="blue")
     draw.text((text_left, text_top), name, fill="white")
 
+#이미지 한 장의 디코딩 -> 검출 -> 인코딩 (단계별 소요 시간 포함, 프로세스 풀에서 실행)
+def _analyze_image(filepath: Path, model: str = "hog", scale: float = 1.0, max_side: Optional[int] = None):
+    started = time.perf_counter()
+    image = load_image(filepath)
+    decoded = time.perf_counter()
+    face_locations = detect_faces(image, model=model, scale=scale, max_side=max_side)
+    detected = time.perf_counter()
+    face_encodings = _face_recognition().face_encodings(image, face_locations)
+    encoded = time.perf_counter()
+    timings = {"decode": decoded - started, "detect": detected - decoded, "encode": encoded - detected}
+    return face_locations, face_encodings, timings
+
+#여러 이미지를 순서대로 분석 (workers > 1 이면 프로세스 풀에서 미리 처리해 둔 결과를 순서대로 받음)
+def _analyze_images(filepaths, model: str = "hog", workers: int = 1, scale: float = 1.0, max_side: Optional[int] = None):
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(filepaths) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=min(workers, len(filepaths))) as pool:
+            yield from pool.map(_analyze_image, filepaths, repeat(model), repeat(scale), repeat(max_side), chunksize=4)
+    else:
+        for filepath in filepaths:
+            yield _analyze_image(filepath, model, scale, max_side)
+
 #validate 안의 사진 파일 전부 검증
-def validate(model: str = "hog"):
-    for filepath in Path("../validation").rglob("*"):
-        if filepath.is_file():
-            recognize_faces(image_location=str(filepath.absolute()), model=model)
+# headless=True 이면 창을 띄우지 않고 정확도, 혼동 행렬, 단계별 시간, 초당 이미지 수를 report_dir 에 기록
+# 정답은 하위 폴더 이름 또는 파일 이름(kim_03.jpg -> kim)에서 가져오며, annotate_dir 을 주면 표시된 이미지도 저장
+def validate(model: str = "hog", headless: bool = False, workers: int = 1, report_dir: Path = DEFAULT_REPORT_DIR,
+             annotate_dir: Optional[Path] = None, encodings_location: Path = DEFAULT_ENCODINGS_PATH,
+             scale: float = 1.0, max_side: Optional[int] = None) -> Optional[dict]:
+    if not headless:
+        for filepath in VALIDATION_DIR.rglob("*"):
+            if filepath.is_file():
+                recognize_faces(image_location=str(filepath.absolute()), model=model, scale=scale, max_side=max_side)
+        return None
+
+    filepaths = sorted(filepath for filepath in VALIDATION_DIR.rglob("*")
+                       if filepath.is_file() and filepath.suffix.lower() in IMAGE_SUFFIXES)
+    matcher = GalleryMatcher.from_file(encodings_location)
+    report = ValidationReport(matcher.label_names)
+    started = time.perf_counter()
+    for filepath, (face_locations, face_encodings, timings) in zip(filepaths, _analyze_images(filepaths, model, workers, scale, max_side)):
+        match_started = time.perf_counter()
+        faces = _describe_faces(face_locations, matcher.match(face_encodings, k=1))
+        timings["match"] = time.perf_counter() - match_started
+        report.add(filepath, ground_truth_for(filepath, VALIDATION_DIR), faces, timings)
+        if annotate_dir is not None:
+            _save_annotated(filepath, faces, Path(annotate_dir) / filepath.relative_to(VALIDATION_DIR))
+    report.wall_time = time.perf_counter() - started
+    summary = report.write(report_dir)
+    accuracy = "n/a" if summary["accuracy"] is None else f"{summary['accuracy']:.2%}"
+    print(f"[INFO] Validated {summary['images']} images, accuracy {accuracy}, "
+          f"{summary['images_per_sec'] or 0:.2f} images/sec, report: {report_dir}")
+    return summary
+
+#인식 결과를 표시한 이미지를 파일로 저장
+def _save_annotated(filepath: Path, faces: list, output_path: Path) -> None:
+    pillow_image = Image.fromarray(load_image(filepath))
+    draw = ImageDraw.Draw(pillow_image)
+    for face in faces:
+        _display_face(draw, face["box"], face["name"])
+    del draw
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    pillow_image.save(output_path)
+
+#파일/폴더 목록을 이미지 파일 목록으로 펼침 (폴더는 하위 폴더까지 검색)
+def _image_files(paths) -> list:
+    filepaths = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            filepaths.extend(sorted(filepath for filepath in path.rglob("*")
+                                    if filepath.is_file() and filepath.suffix.lower() in IMAGE_SUFFIXES))
+        else:
+            filepaths.append(path)
+    return filepaths
+
+#이미지별 얼굴 위치/인코딩 (내용 해시 캐시에 있으면 검출 생략, 없는 것만 모아서 분석)
+def _cached_encodings(filepaths, cache: EncodingCache, model: str = "hog", workers: int = 1,
+                      scale: float = 1.0, max_side: Optional[int] = None) -> list:
+    digests = [file_digest(filepath) for filepath in filepaths]
+    results = [cache.get(digest) for digest in digests]
+    missing = [index for index, result in enumerate(results) if result is None]
+    analyzed = _analyze_images([filepaths[index] for index in missing], model, workers, scale, max_side)
+    for index, (face_locations, face_encodings, _) in zip(missing, analyzed):
+        cache.put(digests[index], face_locations, face_encodings)
+        results[index] = (face_locations, np.asarray(face_encodings).reshape(-1, 128))
+    return results
 
-#두 인물 대조 함수
+#두 이미지 묶음(파일 또는 폴더)의 모든 얼굴 쌍 거리 행렬 계산
+# 행/열은 "경로#얼굴번호", output 에 .npy (행렬) 와 .csv (이름 포함) 저장, (행 이름, 열 이름, 행렬) 반환
+def compare_face_sets(set1, set2, model: str = "hog", output: Optional[Path] = DEFAULT_COMPARE_OUTPUT,
+                      workers: int = 1, cache_dir: Path = DEFAULT_CACHE_DIR, scale: float = 1.0,
+                      max_side: Optional[int] = None):
+    cache = EncodingCache(cache_dir, model=model, scale=scale, max_side=max_side)
+    sides = []
+    for paths in (set1, set2):
+        filepaths = _image_files(paths)
+        labels, encodings = [], []
+        for filepath, (_, face_encodings) in zip(filepaths, _cached_encodings(filepaths, cache, model, workers, scale, max_side)):
+            labels.extend(f"{filepath}#{index}" for index in range(len(face_encodings)))
+            encodings.append(face_encodings)
+        sides.append((labels, np.concatenate(encodings) if encodings else np.empty((0, 128))))
+    (row_labels, row_encodings), (column_labels, column_encodings) = sides
+    distances = pairwise_distances(row_encodings, column_encodings)
+    print(f"[INFO] {len(row_labels)} x {len(column_labels)} faces compared, "
+          f"{int((distances <= DEFAULT_TOLERANCE).sum())} pairs within {DEFAULT_TOLERANCE} "
+          f"(cache: {cache.hits} hits, {cache.misses} misses)")
+    if output is not None:
+        _write_distance_matrix(Path(output), row_labels, column_labels, distances)
+    return row_labels, column_labels, distances
+
+#거리 행렬을 output.npy, output.csv 로 저장
+def _write_distance_matrix(output: Path, row_labels, column_labels, distances) -> None:
+    import csv
+    output.parent.mkdir(parents=True, exist_ok=True)
+    np.save(output.with_suffix(".npy"), distances)
+    with output.with_suffix(".csv").open("w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([""] + column_labels)
+        for label, row in zip(row_labels, distances):
+            writer.writerow([label] + [f"{value:.4f}" for value in row])
+
+#두 인물 대조 함수 (이미지 두 장, 결과를 터미널에 출력)
 def compare_faces(image1_path: str, image2_path: str, model: str = "hog", # 얼굴 비교 검증 함수
                   encodings_location: Path = DEFAULT_ENCODINGS_PATH) -> None:
-    with encodings_location.open(mode="rb") as f:
-        loaded_encodings = pickle.load(f)
-
-    # 첫 번째 이미지 로드 및 인코딩
-    image1 = load_image(image1_path)
-    face_locations1 = face_recognition.face_locations(image1, model=model)
-    face_encodings1 = face_recognition.face_encodings(image1, face_locations1)
+    _, _, distances = compare_face_sets([image1_path], [image2_path], model=model, output=None)
+    # 얼굴 비교 (첫 번째 이미지의 얼굴마다 한 줄)
+    for row in distances:
+        print(f"Results: {(row <= DEFAULT_TOLERANCE).tolist()}")
+        print(f"Distances: {row}")
 
-    # 두 번째 이미지 로드 및 인코딩
-    image2 = load_image(image2_path)
-    face_locations2 = face_recognition.face_locations(image2, model=model)
-    face_encodings2 = face_recognition.face_encodings(image2, face_locations2)
 
-    # 얼굴 비교
-    for encoding1 in face_encodings1:
-        results = face_recognition.compare_faces(face_encodings2, encoding1)
-        distances = face_recognition.face_distance(face_encodings2, encoding1)
-        print(f"Results: {results}")
-        print(f"Distances: {distances}")
+#CLI 설정
+def _build_parser(default_port: int) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Recognize faces in an image")
+    parser.add_argument("--train", action="store_true", help="Train on input data")
+    parser.add_argument("--validate", action="store_true", help="Validate trained model")
+    parser.add_argument("--test", action="store_true", help="Test the model with an unknown image")
+    parser.add_argument("-m", action="store", default="hog", choices=["hog", "cnn"], help="Which model to use for training: hog (CPU), cnn (GPU)")
+    parser.add_argument("-f", action="store", help="Path to an image with an unknown face")
+    parser.add_argument("--compare", action="store_true", help="Compare faces between two images")
+    parser.add_argument("--image1", action="store", help="Path to the first image")
+    parser.add_argument("--image2", action="store", help="Path to the second image")
+    parser.add_argument("--set1", action="store", nargs="+", help="Images or directories for the rows of the --compare matrix")
+    parser.add_argument("--set2", action="store", nargs="+", help="Images or directories for the columns of the --compare matrix")
+    parser.add_argument("--out", action="store", default=str(DEFAULT_COMPARE_OUTPUT), help="Output prefix for the --compare distance matrix (.csv/.npy)")
+    parser.add_argument("--scale", action="store", type=float, default=1.0, help="Run face detection on the image resized by this factor (encoding stays full resolution)")
+    parser.add_argument("--max-side", action="store", type=int, help="Downscale detection input so its longest side is at most this many pixels")
+    parser.add_argument("-j", "--workers", action="store", type=int, default=1, help="Training/validation processes (0 = one per CPU core)")
+    parser.add_argument("--headless", action="store_true", help="Validate without opening image windows and write a metrics report")
+    parser.add_argument("--report", action="store", default=str(DEFAULT_REPORT_DIR), help="Directory for the headless validation report")
+    parser.add_argument("--annotate", action="store", help="Directory to save annotated validation images (headless mode)")
+    parser.add_argument("--full", action="store_true", help="Re-encode every training image instead of only new or changed ones")
+    parser.add_argument("--serve", action="store_true", help="Run the resident recognition server on localhost")
+    parser.add_argument("--remote", action="store_true", help="Use the running recognition server for --test")
+    parser.add_argument("--port", action="store", type=int, default=default_port, help="Recognition server port")
+    parser.add_argument("--encodings", action="store", default=str(DEFAULT_ENCODINGS_PATH), help="Encoding store the recognition server matches against (reported by /health)")
+    parser.add_argument("--migrate", action="store_true", help="Convert output/encodings.pkl to the memory-mapped store format")
+    parser.add_argument("--precision", action="store", choices=PRECISIONS, help="Store precision for --train/--migrate (float16/int8 use 1/2 and 1/4 of the memory); on its own, rewrites the existing store")
+    return parser
 
 
 #메인함수
 if __name__ == "__main__":
+    try:
+        from AI.client import DEFAULT_PORT, RecognitionClient
+    except ImportError:
+        from client import DEFAULT_PORT, RecognitionClient
+    args = _build_parser(DEFAULT_PORT).parse_args()
+
+    #저장소 생성
+    TRAINING_DIR.mkdir(exist_ok=True)
+    DEFAULT_ENCODINGS_PATH.parent.mkdir(exist_ok=True)
+    VALIDATION_DIR.mkdir(exist_ok=True)
+
+    precision = args.precision or "float32"
+    if args.migrate:
+        migrate_pickle(LEGACY_ENCODINGS_PATH, DEFAULT_ENCODINGS_PATH, precision=precision)
     if args.train:
-        encode_known_faces(model=args.m)
+        encode_known_faces(model=args.m, full=args.full, workers=args.workers, scale=args.scale, max_side=args.max_side,
+                           precision=precision)
+    if args.precision and not (args.migrate or args.train):
+        convert_store(DEFAULT_ENCODINGS_PATH, args.precision)
     if args.validate:
-        validate(model=args.m)
+        validate(model=args.m, headless=args.headless, workers=args.workers, report_dir=Path(args.report),
+                 annotate_dir=Path(args.annotate) if args.annotate else None, scale=args.scale, max_side=args.max_side)
     if args.test:
-        recognize_faces(image_location=args.f, model=args.m)
+        client = RecognitionClient(port=args.port) if args.remote else None
+        recognize_faces(image_location=args.f, model=args.m, client=client, scale=args.scale, max_side=args.max_side)
+    if args.compare:
+        if args.set1 or args.set2:
+            compare_face_sets(args.set1 or [], args.set2 or args.set1 or [], model=args.m, output=Path(args.out),
+                              workers=args.workers, scale=args.scale, max_side=args.max_side)
+        else:
+            compare_faces(image1_path=args.image1, image2_path=args.image2, model=args.m)
+    if args.serve:
+        try:
+            from AI.server import serve
+        except ImportError:
+            from server import serve
+        serve(recognize=partial(recognize_image, scale=args.scale, max_side=args.max_side), load_image=load_image,
+              encodings_location=Path(args.encodings).expanduser(), port=args.port, model=args.m)
@@ -0,0 +1,47 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, Tuple
+import numpy as np
+
+DEFAULT_CACHE_DIR = Path("../output/cache")
+
+
+#이미지 내용 해시별 얼굴 위치/인코딩 캐시 (같은 사진을 다시 비교할 때 검출/인코딩 생략)
+# 검출 설정(model, scale, max_side)이 다르면 결과도 다르므로 설정값도 키에 포함
+class EncodingCache:
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR, model: str = "hog", scale: float = 1.0,
+                 max_side: Optional[int] = None):
+        self.cache_dir = Path(cache_dir)
+        self.settings = hashlib.sha1(f"{model}:{scale:g}:{max_side}".encode("ascii")).hexdigest()[:8]
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, digest: str) -> Path:
+        return self.cache_dir / digest[:2] / f"{digest}-{self.settings}.npz"
+
+    def get(self, digest: str) -> Optional[Tuple[list, np.ndarray]]:
+        path = self._path(digest)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                boxes, encodings = [tuple(int(v) for v in box) for box in data["boxes"]], data["encodings"]
+        except (OSError, KeyError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return boxes, encodings
+
+    def put(self, digest: str, boxes, encodings) -> None:
+        path = self._path(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=path.stem + ".", suffix=".tmp.npz", dir=path.parent)
+        os.close(fd)
+        try:
+            np.savez(tmp_name, boxes=np.asarray(boxes, dtype=np.int32).reshape(-1, 4),
+                     encodings=np.asarray(encodings, dtype=np.float64).reshape(-1, 128))
+            os.replace(tmp_name, path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+            raise
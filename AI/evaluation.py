@@ -0,0 +1,99 @@
+import csv
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
+
+UNKNOWN = "Unknown"
+NO_FACE = "(no face)"
+STAGES = ("decode", "detect", "encode", "match")
+
+_TRAILING_INDEX = re.compile(r"^(.*?)[\s_\-.]*(\(\d+\)|\d+)?$")
+
+
+#파일 위치에서 정답 이름 추출
+# validation/kim/a.jpg -> "kim", validation/kim_03.jpg -> "kim", validation/0001.jpg -> None
+def ground_truth_for(filepath: Path, validation_dir: Path) -> Optional[str]:
+    relative = Path(filepath).relative_to(validation_dir)
+    if len(relative.parts) > 1:
+        return relative.parts[0]
+    name = _TRAILING_INDEX.match(relative.stem).group(1)
+    return name or None
+
+
+#이미지 한 장의 예측 이름 (가장 가까운 얼굴 기준)
+def predicted_name(faces: List[dict]) -> str:
+    if not faces:
+        return NO_FACE
+    best = min(faces, key=lambda face: face["distance"] if face["distance"] is not None else float("inf"))
+    return best["name"]
+
+
+#검증 결과 집계 및 보고서 작성
+class ValidationReport:
+    def __init__(self, known_names: List[str]):
+        self.known_names = set(known_names)
+        self.rows: List[dict] = []
+        self.wall_time = 0.0
+
+    def add(self, filepath: Path, truth: Optional[str], faces: List[dict], timings: Dict[str, float]) -> None:
+        # 학습되지 않은 사람이 정답이면 Unknown 으로 나와야 맞은 것
+        expected = truth if truth is None or truth in self.known_names else UNKNOWN
+        self.rows.append({
+            "path": str(filepath),
+            "truth": expected,
+            "predicted": predicted_name(faces),
+            "faces": len(faces),
+            "distance": min((face["distance"] for face in faces if face["distance"] is not None), default=None),
+            **{f"{stage}_ms": round(timings.get(stage, 0.0) * 1000, 3) for stage in STAGES},
+        })
+
+    def confusion(self):
+        labelled = [row for row in self.rows if row["truth"] is not None]
+        labels = sorted({row["truth"] for row in labelled} | {row["predicted"] for row in labelled})
+        index = {label: i for i, label in enumerate(labels)}
+        matrix = np.zeros((len(labels), len(labels)), dtype=np.int64)
+        for row in labelled:
+            matrix[index[row["truth"]], index[row["predicted"]]] += 1
+        return labels, matrix
+
+    def summary(self) -> dict:
+        labelled = [row for row in self.rows if row["truth"] is not None]
+        correct = sum(row["truth"] == row["predicted"] for row in labelled)
+        labels, matrix = self.confusion()
+        stage_ms = {}
+        for stage in STAGES:
+            values = np.array([row[f"{stage}_ms"] for row in self.rows]) if self.rows else np.zeros(1)
+            stage_ms[stage] = {"mean": float(values.mean()), "p50": float(np.percentile(values, 50)),
+                               "p95": float(np.percentile(values, 95)), "total": float(values.sum())}
+        return {
+            "images": len(self.rows),
+            "labelled": len(labelled),
+            "correct": correct,
+            "accuracy": correct / len(labelled) if labelled else None,
+            "no_face": sum(row["predicted"] == NO_FACE for row in self.rows),
+            "wall_time_s": round(self.wall_time, 3),
+            "images_per_sec": len(self.rows) / self.wall_time if self.wall_time > 0 else None,
+            "stage_ms": stage_ms,
+            "confusion": {"labels": labels, "matrix": matrix.tolist()},
+        }
+
+    def write(self, report_dir: Path) -> dict:
+        """report.json (요약, 혼동 행렬), report.csv (이미지별 결과), confusion.csv 작성"""
+        report_dir = Path(report_dir)
+        report_dir.mkdir(parents=True, exist_ok=True)
+        summary = self.summary()
+        with (report_dir / "report.json").open("w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "images": self.rows}, f, ensure_ascii=False, indent=2)
+        with (report_dir / "report.csv").open("w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(self.rows[0]) if self.rows else ["path"])
+            writer.writeheader()
+            writer.writerows(self.rows)
+        with (report_dir / "confusion.csv").open("w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            labels, matrix = summary["confusion"]["labels"], summary["confusion"]["matrix"]
+            writer.writerow(["truth \\ predicted"] + labels)
+            for label, counts in zip(labels, matrix):
+                writer.writerow([label] + counts)
+        return summary
@@ -0,0 +1,76 @@
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+try:
+    from AI.matcher import GalleryMatcher
+except ImportError:
+    from matcher import GalleryMatcher
+
+
+#메모리에 유지하는 갤러리 + 파일 교체 감시
+# 저장소 파일의 (inode, 크기, 수정 시각)을 주기적으로 확인해서 바뀌면 백그라운드에서 새로 읽고,
+# 다 읽은 뒤에 참조만 바꿔 끼우므로 인식 쪽은 멈추지 않음. 읽다가 실패하면(복사 중인 파일 등)
+# 기존 갤러리를 그대로 쓰고 다음 확인 때 다시 시도
+class HotGallery:
+    def __init__(self, encodings_location, poll_interval: float = 2.0,
+                 loader: Callable[[Path], GalleryMatcher] = GalleryMatcher.from_file):
+        self.encodings_location = Path(encodings_location)
+        self.poll_interval = poll_interval
+        self.loader = loader
+        self._matcher: Optional[GalleryMatcher] = None
+        self._signature = None
+        self._failed_signature = None  # 읽기에 실패한 파일 상태 (그대로면 다시 시도하지 않음)
+        self._stop = threading.Event()
+        self._thread = None
+        self.reloads = 0
+        self.failures = 0
+
+    @property
+    def matcher(self) -> GalleryMatcher:
+        """현재 갤러리 (참조 하나를 읽는 것이라 잠금 없이 안전)"""
+        return self._matcher
+
+    def _stat_signature(self):
+        try:
+            stat = os.stat(self.encodings_location)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def check(self) -> bool:
+        """파일이 바뀌었으면 다시 읽고 교체, 교체했으면 True"""
+        signature = self._stat_signature()
+        if self._matcher is not None and signature in (self._signature, self._failed_signature):
+            return False
+        try:
+            matcher = self.loader(self.encodings_location)
+        except Exception as e:
+            self.failures += 1
+            self._failed_signature = signature
+            print(f"[WARN] 갤러리 다시 읽기 실패, 기존 갤러리 유지: {e}")
+            if self._matcher is None:
+                raise
+            return False
+        # 읽는 도중 파일이 또 바뀌었으면 다음 확인 때 다시 읽도록 읽기 전 값을 기록
+        self._matcher, self._signature = matcher, signature
+        self.reloads += 1
+        print(f"[INFO] 갤러리 로드 완료: 인코딩 {len(matcher)}개, 인물 {len(matcher.label_names)}명")
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            self.check()
+
+    def start(self) -> "HotGallery":
+        self.check()
+        self._thread = threading.Thread(target=self._run, name="HotGallery", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1.0)
@@ -0,0 +1,120 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+import numpy as np
+
+MANIFEST_VERSION = 2  # 2: 검출 설정 (scale, max_side) 기록
+HASH_CHUNK_SIZE = 1 << 20
+
+
+#학습 결과 요약
+class TrainReport(NamedTuple):
+    encoded: List[str]    # 새로 추가되었거나 내용이 바뀌어 다시 인코딩한 파일
+    skipped: List[str]    # 해시가 같아서 건너뛴 파일
+    removed: List[str]    # training 폴더에서 사라져 목록에서 지운 파일
+
+    def summary(self) -> str:
+        return f"encoded {len(self.encoded)}, skipped {len(self.skipped)} unchanged, removed {len(self.removed)}"
+
+
+#파일 내용 해시 (sha1)
+def file_digest(filepath: Path) -> str:
+    digest = hashlib.sha1()
+    with Path(filepath).open(mode="rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+#학습 이미지별 해시와 인코딩 기록
+class TrainingManifest:
+    def __init__(self, entries: Dict[str, dict] = None):
+        # key: training 폴더 기준 상대 경로
+        # value: {"name", "hash", "size", "mtime_ns", "model", "scale", "max_side", "encodings": (n, 128) 배열}
+        self.entries = entries if entries is not None else {}
+
+    @classmethod
+    def load(cls, manifest_location: Path) -> "TrainingManifest":
+        manifest_location = Path(manifest_location)
+        if not manifest_location.exists():
+            return cls()
+        with manifest_location.open(mode="rb") as f:
+            data = pickle.load(f)
+        if data.get("version") != MANIFEST_VERSION:
+            print(f"[INFO] Ignoring manifest with version {data.get('version')}, retraining everything")
+            return cls()
+        return cls(data["entries"])
+
+    def save(self, manifest_location: Path) -> None:
+        manifest_location = Path(manifest_location)
+        manifest_location.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=manifest_location.name + ".", suffix=".tmp", dir=manifest_location.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump({"version": MANIFEST_VERSION, "entries": self.entries}, f)
+            os.replace(tmp_name, manifest_location)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+            raise
+
+    def plan(self, training_dir: Path, filepaths: Iterable[Path], model: str, scale: float = 1.0,
+             max_side: Optional[int] = None) -> Tuple[List[Tuple[Path, str, str]], List[str]]:
+        """다시 인코딩해야 하는 (경로, key, 해시) 목록과 건너뛸 key 목록을 반환
+
+        크기와 수정 시각이 그대로면 해시 계산도 생략하고, 시각만 바뀐 경우는 해시로 다시 확인함
+        모델이나 검출 설정 (scale, max_side) 이 바뀐 파일은 다시 인코딩함
+        """
+        pending, skipped = [], []
+        for filepath in filepaths:
+            key = filepath.relative_to(training_dir).as_posix()
+            stat = filepath.stat()
+            entry = self.entries.get(key)
+            if (entry is not None and entry["model"] == model and entry["scale"] == scale
+                    and entry["max_side"] == max_side and entry["name"] == filepath.parent.name):
+                if entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                    skipped.append(key)
+                    continue
+                digest = file_digest(filepath)
+                if digest == entry["hash"]:
+                    entry["size"], entry["mtime_ns"] = stat.st_size, stat.st_mtime_ns
+                    skipped.append(key)
+                    continue
+            else:
+                digest = file_digest(filepath)
+            pending.append((filepath, key, digest))
+        return pending, skipped
+
+    def update(self, filepath: Path, key: str, digest: str, model: str, encodings, scale: float = 1.0,
+               max_side: Optional[int] = None) -> None:
+        stat = filepath.stat()
+        self.entries[key] = {
+            "name": filepath.parent.name,
+            "hash": digest,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "model": model,
+            "scale": scale,
+            "max_side": max_side,
+            "encodings": np.asarray(encodings, dtype=np.float64).reshape(-1, 128),
+        }
+
+    def prune(self, keep_keys: Iterable[str]) -> List[str]:
+        """training 폴더에 더 이상 없는 파일의 기록을 지움"""
+        removed = sorted(set(self.entries) - set(keep_keys))
+        for key in removed:
+            del self.entries[key]
+        return removed
+
+    def gallery(self) -> Tuple[List[str], List[np.ndarray]]:
+        """경로 순서대로 (이름 목록, 인코딩 목록) 을 만듦"""
+        names, encodings = [], []
+        for key in sorted(self.entries):
+            entry = self.entries[key]
+            for encoding in entry["encodings"]:
+                names.append(entry["name"])
+                encodings.append(encoding)
+        return names, encodings
@@ -0,0 +1,152 @@
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Sequence
+import numpy as np
+
+try:
+    from AI.ann import DEFAULT_ANN_THRESHOLD, DEFAULT_NPROBE, IVFIndex, load_or_build_index
+    from AI.store import EncodingStore, dequantize, load_gallery, pack_gallery, quantize
+except ImportError:
+    from ann import DEFAULT_ANN_THRESHOLD, DEFAULT_NPROBE, IVFIndex, load_or_build_index
+    from store import EncodingStore, dequantize, load_gallery, pack_gallery, quantize
+
+DEFAULT_TOLERANCE = 0.6  # face_recognition.compare_faces 기본값과 동일
+UPCAST_CHUNK_ROWS = 8192  # float16 / int8 갤러리는 이만큼씩만 float32 로 바꿔서 계산 (전체 복사본을 만들지 않음)
+
+
+#두 인코딩 묶음 사이의 (N, M) 유클리드 거리 행렬 (행렬곱 한 번)
+def pairwise_distances(encodings_a, encodings_b) -> np.ndarray:
+    a = np.asarray(encodings_a, dtype=np.float32).reshape(-1, 128)
+    b = np.asarray(encodings_b, dtype=np.float32).reshape(-1, 128)
+    squared = np.einsum("ij,ij->i", a, a)[:, None] + np.einsum("ij,ij->i", b, b)[None, :] - 2.0 * (a @ b.T)
+    np.maximum(squared, 0.0, out=squared)
+    return np.sqrt(squared, out=squared)
+
+
+#매칭 결과 (얼굴 1개당 1개)
+class MatchResult(NamedTuple):
+    names: List[str]         # 득표수 -> 최소거리 순으로 정렬된 상위 k명
+    distances: List[float]   # 각 인물의 최소 거리
+    votes: List[int]         # 각 인물의 득표수 (tolerance 이내 인코딩 수)
+
+    @property
+    def name(self) -> Optional[str]:
+        """득표가 있는 경우에만 1순위 이름 반환 (기존 _recognize_face 와 동일한 의미)"""
+        if self.votes and self.votes[0] > 0:
+            return self.names[0]
+        return None
+
+
+#학습 데이터 전체를 하나의 행렬로 보관하는 매칭 객체
+# precision 이 float16 / int8 이면 갤러리를 그 형식 그대로 들고 있고, 거리 계산 때 조금씩만 float32 로 바꿈
+# (int8 의 차원별 배율은 질의 쪽에 한 번 곱해 두므로 갤러리를 복원하지 않음)
+class GalleryMatcher:
+    def __init__(self, names: Sequence[str], encodings, tolerance: float = DEFAULT_TOLERANCE, precision: str = "float32"):
+        # 같은 인물의 인코딩이 연속되도록 정렬해 두면 인물별 집계를 reduceat 한 번으로 처리할 수 있음
+        label_names, labels, matrix = pack_gallery(names, encodings)
+        matrix, scales = quantize(matrix, precision)
+        restored = dequantize(matrix, scales)
+        self._set_gallery(label_names, labels, matrix, np.einsum("ij,ij->i", restored, restored), tolerance, scales)
+
+    def _set_gallery(self, label_names, labels, matrix, norms, tolerance, scales=None):
+        self.label_names = label_names
+        self.labels = labels
+        self.matrix = matrix
+        self.norms = norms
+        self.scales = scales
+        self.starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]]) if len(labels) else np.empty(0, dtype=np.intp)
+        self.tolerance = tolerance
+        self.index: Optional[IVFIndex] = None  # 설정되면 근사 검색 사용 (use_index 참고)
+        self.nprobe = DEFAULT_NPROBE
+
+    @classmethod
+    def from_encodings(cls, loaded_encodings: dict, tolerance: float = DEFAULT_TOLERANCE) -> "GalleryMatcher":
+        return cls(loaded_encodings["names"], loaded_encodings["encodings"], tolerance=tolerance)
+
+    @classmethod
+    def from_store(cls, store: EncodingStore, tolerance: float = DEFAULT_TOLERANCE) -> "GalleryMatcher":
+        """저장소는 이미 정렬되어 있으므로 memmap 을 복사 없이 그대로 사용"""
+        matcher = cls.__new__(cls)
+        matcher._set_gallery(store.label_names, store.labels, store.matrix, store.norms, tolerance, store.scales)
+        return matcher
+
+    @classmethod
+    def from_file(cls, encodings_location: Path, tolerance: float = DEFAULT_TOLERANCE,
+                  ann_threshold: Optional[int] = DEFAULT_ANN_THRESHOLD, nprobe: int = DEFAULT_NPROBE) -> "GalleryMatcher":
+        """갤러리가 ann_threshold 보다 크면 저장소 옆의 IVF 인덱스를 불러와(없으면 만들어) 근사 검색 사용"""
+        store = load_gallery(encodings_location)
+        matcher = cls.from_store(store, tolerance=tolerance)
+        if ann_threshold is not None and len(store) > ann_threshold:
+            matcher.use_index(load_or_build_index(store.path, store.matrix, store.norms, scales=store.scales), nprobe)
+        return matcher
+
+    def use_index(self, index: Optional[IVFIndex], nprobe: int = DEFAULT_NPROBE) -> None:
+        self.index = index
+        self.nprobe = nprobe
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def precision(self) -> str:
+        return "int8" if self.scales is not None else self.matrix.dtype.name
+
+    def _scaled(self, queries) -> np.ndarray:
+        """int8 갤러리의 차원별 배율을 질의에 미리 곱함 (q . (s * c) = (q * s) . c)"""
+        return queries * self.scales if self.scales is not None else queries
+
+    def _gallery_dot(self, queries) -> np.ndarray:
+        """queries @ 갤러리.T (float32 가 아니면 UPCAST_CHUNK_ROWS 행씩 나눠서 계산)"""
+        queries = self._scaled(queries)
+        if self.matrix.dtype == np.float32:
+            return queries @ self.matrix.T
+        products = np.empty((len(queries), len(self)), dtype=np.float32)
+        for start in range(0, len(self), UPCAST_CHUNK_ROWS):
+            chunk = np.asarray(self.matrix[start:start + UPCAST_CHUNK_ROWS], dtype=np.float32)
+            products[:, start:start + len(chunk)] = queries @ chunk.T
+        return products
+
+    def face_distances(self, unknown_encodings) -> np.ndarray:
+        """(얼굴 수, 갤러리 크기) 유클리드 거리 행렬을 한 번의 행렬곱으로 계산"""
+        queries = np.asarray(unknown_encodings, dtype=np.float32).reshape(-1, self.matrix.shape[1])
+        if not len(self) or not len(queries):
+            return np.empty((len(queries), len(self)), dtype=np.float32)
+        squared = np.einsum("ij,ij->i", queries, queries)[:, None] + self.norms[None, :] - 2.0 * self._gallery_dot(queries)
+        np.maximum(squared, 0.0, out=squared)
+        return np.sqrt(squared, out=squared)
+
+    def match(self, unknown_encodings, k: int = 1) -> List[MatchResult]:
+        """여러 얼굴을 한 번에 매칭해서 얼굴마다 상위 k명의 이름, 거리, 득표수를 반환"""
+        if self.index is not None and len(self):
+            return self._match_approximate(unknown_encodings, k)
+        distances = self.face_distances(unknown_encodings)
+        if not len(self):
+            return [MatchResult([], [], []) for _ in range(len(distances))]
+        votes = np.add.reduceat((distances <= self.tolerance).astype(np.int32), self.starts, axis=1)
+        min_distances = np.minimum.reduceat(distances, self.starts, axis=1)
+        return [self._rank(row_votes, row_distances, k) for row_votes, row_distances in zip(votes, min_distances)]
+
+    def _match_approximate(self, unknown_encodings, k: int) -> List[MatchResult]:
+        """IVF 인덱스로 가까운 묶음의 인코딩만 비교 (후보에 없는 인물은 득표 0, 거리 inf)"""
+        queries = np.asarray(unknown_encodings, dtype=np.float32).reshape(-1, self.matrix.shape[1])
+        results = []
+        for query in queries:
+            rows = np.sort(self.index.candidates(query, self.nprobe))
+            squared = float(query @ query) + self.norms[rows] - 2.0 * (np.asarray(self.matrix[rows], dtype=np.float32) @ self._scaled(query))
+            distances = np.sqrt(np.maximum(squared, 0.0))
+            labels = self.labels[rows]
+            votes = np.bincount(labels[distances <= self.tolerance], minlength=len(self.label_names))
+            min_distances = np.full(len(self.label_names), np.inf, dtype=np.float32)
+            np.minimum.at(min_distances, labels, distances)
+            results.append(self._rank(votes, min_distances, k))
+        return results
+
+    def _rank(self, votes, min_distances, k: int) -> MatchResult:
+        top = np.lexsort((min_distances, -votes))[:min(k, len(self.label_names))]
+        return MatchResult(
+            names=[self.label_names[i] for i in top],
+            distances=min_distances[top].tolist(),
+            votes=votes[top].tolist(),
+        )
+
+    def identify(self, unknown_encodings) -> List[Optional[str]]:
+        return [result.name for result in self.match(unknown_encodings, k=1)]
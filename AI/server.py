@@ -0,0 +1,133 @@
+import io
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+import numpy as np
+
+try:
+    from AI.client import DEFAULT_HOST, DEFAULT_PORT
+    from AI.matcher import GalleryMatcher
+except ImportError:
+    from client import DEFAULT_HOST, DEFAULT_PORT
+    from matcher import GalleryMatcher
+
+MAX_BODY_SIZE = 64 * 1024 * 1024
+
+
+#모델과 학습 데이터를 메모리에 유지하는 인식 서버
+# GET  /health                 -> {"status": "ok", "gallery": 인코딩 수, "encodings": 저장소 절대 경로}
+# POST /reload                 -> 저장소 다시 읽기
+# POST /recognize?model=hog    -> {"faces": [...], "elapsed_ms": ...}
+#      body: {"path": ...} (application/json), .npy 배열 (application/x-npy), 또는 jpg/png 바이트
+class RecognitionServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, recognize, load_image, encodings_location: Path, model: str = "hog"):
+        super().__init__(address, _RecognitionHandler)
+        self.recognize = recognize
+        self.load_image = load_image
+        self.encodings_location = Path(encodings_location)
+        self.model = model
+        # dlib 검출기는 스레드 안전하지 않으므로 인식은 한 번에 하나씩
+        self.lock = threading.Lock()
+        self.matcher = None
+        self.gallery_mtime = None
+        self.reload()
+
+    def _signature(self):
+        """저장소와 예전 encodings.pkl 의 수정 시각 (없으면 None)"""
+        return tuple(location.stat().st_mtime_ns if location.exists() else None
+                     for location in (self.encodings_location, self.encodings_location.with_suffix(".pkl")))
+
+    def reload(self) -> None:
+        if any(self._signature()):
+            # 저장소가 없고 encodings.pkl 만 있으면 load_gallery 가 변환해서 읽음
+            self.matcher = GalleryMatcher.from_file(self.encodings_location)
+        else:
+            self.matcher = GalleryMatcher([], [])
+        self.gallery_mtime = self._signature()
+        print(f"[INFO] Gallery loaded: {len(self.matcher)} encodings")
+
+    def current_matcher(self) -> GalleryMatcher:
+        """학습으로 저장소 파일이 교체되었으면 다시 읽음 (stat 두 번이라 매 요청마다 확인)"""
+        if self._signature() != self.gallery_mtime:
+            self.reload()
+        return self.matcher
+
+    def warm_up(self) -> None:
+        """첫 요청이 느리지 않도록 검출/인코딩을 한 번 실행"""
+        self.recognize(np.zeros((64, 64, 3), dtype=np.uint8), self.matcher, model=self.model)
+
+
+class _RecognitionHandler(BaseHTTPRequestHandler):
+    server: RecognitionServer
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_image(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if length <= 0 or length > MAX_BODY_SIZE:
+            raise ValueError(f"invalid body size {length}")
+        body = self.rfile.read(length)
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.startswith("application/json"):
+            return self.server.load_image(json.loads(body.decode("utf-8"))["path"])
+        if content_type.startswith("application/x-npy"):
+            image = np.load(io.BytesIO(body), allow_pickle=False)
+            if image.ndim != 3 or image.shape[2] != 3 or image.dtype != np.uint8:
+                raise ValueError(f"expected HxWx3 uint8 array, got {image.dtype} {image.shape}")
+            return image
+        return self.server.load_image(io.BytesIO(body))
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/health":
+            self._send_json(200, {"status": "ok", "gallery": len(self.server.matcher), "model": self.server.model,
+                                  "encodings": str(self.server.encodings_location.resolve())})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        try:
+            if url.path == "/reload":
+                with self.server.lock:
+                    self.server.reload()
+                self._send_json(200, {"status": "ok", "gallery": len(self.server.matcher)})
+            elif url.path == "/recognize":
+                model = parse_qs(url.query).get("model", [self.server.model])[0]
+                image = self._read_image()
+                started = time.perf_counter()
+                with self.server.lock:
+                    faces = self.server.recognize(image, self.server.current_matcher(), model=model)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                self._send_json(200, {"faces": faces, "elapsed_ms": round(elapsed_ms, 2)})
+            else:
+                self._send_json(404, {"error": "not found"})
+        except (ValueError, KeyError, OSError) as e:
+            self._send_json(400, {"error": str(e)})
+
+    def log_message(self, format, *args):
+        pass
+
+
+#서버 실행 (Ctrl+C 로 종료)
+def serve(recognize, load_image, encodings_location: Path, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+          model: str = "hog") -> None:
+    server = RecognitionServer((host, port), recognize, load_image, encodings_location, model=model)
+    server.warm_up()
+    print(f"[INFO] Recognition server listening on http://{host}:{port} (encodings: {server.encodings_location.resolve()})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("[INFO] Recognition server stopped")
+    finally:
+        server.server_close()
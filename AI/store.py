@@ -0,0 +1,206 @@
+import os
+import pickle
+import struct
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+
+# 파일 구조 (little endian, 각 구역은 ALIGN 바이트 경계에서 시작)
+#   header : magic, version, dim, count, name_count, dtype, 구역별 offset
+#   matrix : (count, dim) 인코딩 행렬 (float32 / float16 / int8), 같은 인물끼리 연속으로 정렬
+#   norms  : (count,) float32 제곱 노름 (매칭 시 다시 계산하지 않도록 저장, int8 은 복원한 값 기준)
+#   labels : (count,) int32 인물 번호
+#   names  : 인물 이름 utf-8, \0 으로 구분 (번호 순서)
+#   scales : (dim,) float32 차원별 배율 (int8 만, 원래 값 = 저장 값 * 배율) - version 2
+MAGIC = b"FENC"
+VERSION = 2
+ALIGN = 64
+HEADER_V1 = struct.Struct("<4sHHII8sQQQQQ")
+HEADER = struct.Struct("<4sHHII8sQQQQQQ")
+STORE_SUFFIX = ".fenc"
+PRECISIONS = ("float32", "float16", "int8")
+
+
+class StoreFormatError(ValueError):
+    pass
+
+
+#메모리 매핑된 인코딩 저장소
+class EncodingStore:
+    def __init__(self, path: Path, version: int, label_names: List[str], labels, matrix, norms, scales=None):
+        self.path = path
+        self.version = version
+        self.label_names = label_names
+        self.labels = labels
+        self.matrix = matrix
+        self.norms = norms
+        self.scales = scales  # int8 저장소의 차원별 배율 (그 외에는 None)
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def dim(self) -> int:
+        return self.matrix.shape[1]
+
+    @property
+    def precision(self) -> str:
+        return "int8" if self.scales is not None else self.matrix.dtype.name
+
+    @property
+    def names(self) -> List[str]:
+        """인코딩별 이름 목록 (기존 pickle 의 "names" 와 같은 형태)"""
+        return [self.label_names[label] for label in self.labels]
+
+
+#이름 목록 + 인코딩 목록을 인물 번호 순으로 정렬된 배열로 변환
+def pack_gallery(names: Sequence[str], encodings, dtype=np.float32) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    label_names, labels = np.unique(np.asarray(names, dtype=object).astype(str), return_inverse=True)
+    if len(labels):
+        matrix = np.asarray(encodings, dtype=dtype).reshape(len(labels), -1)
+    else:
+        matrix = np.empty((0, 128), dtype=dtype)
+    order = np.argsort(labels, kind="stable")
+    return ([str(name) for name in label_names],
+            np.ascontiguousarray(labels[order], dtype=np.int32),
+            np.ascontiguousarray(matrix[order]))
+
+
+#인코딩 행렬을 저장 정밀도로 변환 (int8 은 차원별 최대 절댓값이 127 이 되도록 대칭 양자화하고 배율도 반환)
+def quantize(matrix, precision: str = "float32") -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if precision == "float32":
+        return np.ascontiguousarray(matrix), None
+    if precision == "float16":
+        return matrix.astype(np.float16), None
+    if precision == "int8":
+        scales = (np.abs(matrix).max(axis=0) / 127.0).astype(np.float32) if len(matrix) else np.ones(matrix.shape[1], dtype=np.float32)
+        scales[scales == 0] = 1.0
+        return np.clip(np.rint(matrix / scales), -127, 127).astype(np.int8), scales
+    raise ValueError(f"unknown precision: {precision} (expected one of {', '.join(PRECISIONS)})")
+
+
+#저장 정밀도의 행렬을 float32 로 복원
+def dequantize(matrix, scales=None) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    return matrix * scales if scales is not None else matrix
+
+
+def _aligned(offset: int) -> int:
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+#저장소 파일 쓰기 (임시 파일에 쓴 뒤 교체하므로 읽는 쪽은 항상 완성된 파일만 봄)
+# precision 이 float16 / int8 이면 인코딩 하나가 256 / 128 바이트 (float32 는 512 바이트)
+def write_store(store_location: Path, names: Sequence[str], encodings, precision: str = "float32") -> Path:
+    store_location = Path(store_location)
+    label_names, labels, matrix = pack_gallery(names, encodings)
+    matrix, scales = quantize(matrix, precision)
+    restored = dequantize(matrix, scales)
+    norms = np.einsum("ij,ij->i", restored, restored).astype(np.float32)
+    name_table = b"\0".join(name.encode("utf-8") for name in label_names)
+
+    matrix_offset = _aligned(HEADER.size)
+    norms_offset = _aligned(matrix_offset + matrix.nbytes)
+    labels_offset = _aligned(norms_offset + norms.nbytes)
+    names_offset = _aligned(labels_offset + labels.nbytes)
+    scales_offset = _aligned(names_offset + len(name_table)) if scales is not None else 0
+    header = HEADER.pack(MAGIC, VERSION, matrix.shape[1], len(labels), len(label_names),
+                         matrix.dtype.str.encode("ascii"),
+                         matrix_offset, norms_offset, labels_offset, names_offset, len(name_table), scales_offset)
+
+    store_location.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=store_location.name + ".", suffix=".tmp", dir=store_location.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            sections = [(0, header), (matrix_offset, matrix.tobytes()), (norms_offset, norms.tobytes()),
+                        (labels_offset, labels.tobytes()), (names_offset, name_table)]
+            if scales is not None:
+                sections.append((scales_offset, scales.tobytes()))
+            for offset, chunk in sections:
+                f.write(b"\0" * (offset - f.tell()))
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, store_location)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+        raise
+    return store_location
+
+
+#저장소 파일 열기 (헤더와 이름표만 읽고 행렬은 memmap 으로 페이지 캐시를 공유)
+def open_store(store_location: Path) -> EncodingStore:
+    store_location = Path(store_location)
+    file_size = store_location.stat().st_size
+    with store_location.open(mode="rb") as f:
+        raw_header = f.read(HEADER.size)
+        if len(raw_header) < HEADER_V1.size:
+            raise StoreFormatError(f"{store_location}: truncated header")
+        magic, version = struct.unpack_from("<4sH", raw_header)
+        if magic != MAGIC:
+            raise StoreFormatError(f"{store_location}: not an encoding store")
+        if version == 1:  # scales 구역이 없는 이전 형식 (float32 만 존재)
+            fields = HEADER_V1.unpack_from(raw_header) + (0,)
+        elif version == VERSION and len(raw_header) == HEADER.size:
+            fields = HEADER.unpack(raw_header)
+        else:
+            raise StoreFormatError(f"{store_location}: unsupported store version {version}")
+        (_, _, dim, count, name_count, dtype,
+         matrix_offset, norms_offset, labels_offset, names_offset, names_size, scales_offset) = fields
+        if max(names_offset + names_size, scales_offset + 4 * dim if scales_offset else 0) > file_size:
+            raise StoreFormatError(f"{store_location}: truncated store ({file_size} bytes)")
+        f.seek(names_offset)
+        name_table = f.read(names_size)
+        scales = None
+        if scales_offset:
+            f.seek(scales_offset)
+            scales = np.frombuffer(f.read(4 * dim), dtype="<f4").copy()
+    label_names = name_table.decode("utf-8").split("\0") if name_count else []
+    if len(label_names) != name_count:
+        raise StoreFormatError(f"{store_location}: corrupt name table")
+
+    dtype = np.dtype(dtype.rstrip(b"\0").decode("ascii"))
+    if count:
+        matrix = np.memmap(store_location, dtype=dtype, mode="r", offset=matrix_offset, shape=(count, dim))
+        norms = np.memmap(store_location, dtype=np.float32, mode="r", offset=norms_offset, shape=(count,))
+        labels = np.memmap(store_location, dtype=np.int32, mode="r", offset=labels_offset, shape=(count,))
+    else:  # 길이 0 memmap 은 만들 수 없음
+        matrix = np.empty((0, dim), dtype=dtype)
+        norms = np.empty(0, dtype=np.float32)
+        labels = np.empty(0, dtype=np.int32)
+    return EncodingStore(store_location, version, label_names, labels, matrix, norms, scales)
+
+
+#기존 encodings.pkl 을 저장소 형식으로 한 번 변환
+def migrate_pickle(pickle_location: Path, store_location: Path = None, precision: str = "float32") -> Path:
+    pickle_location = Path(pickle_location)
+    if store_location is None:
+        store_location = pickle_location.with_suffix(STORE_SUFFIX)
+    with pickle_location.open(mode="rb") as f:
+        loaded_encodings = pickle.load(f)
+    return write_store(store_location, loaded_encodings["names"], loaded_encodings["encodings"], precision=precision)
+
+
+#이미 있는 저장소를 다른 정밀도로 다시 쓰기 (int8 -> float32 로 되돌려도 잃은 정밀도는 복구되지 않음)
+def convert_store(store_location: Path, precision: str, output_location: Path = None) -> Path:
+    store = open_store(store_location)
+    encodings = dequantize(store.matrix, store.scales)
+    return write_store(output_location or store_location, store.names, encodings, precision=precision)
+
+
+#저장소 불러오기 - 저장소가 없고 같은 이름의 .pkl 만 있으면 먼저 변환
+def load_gallery(encodings_location: Path) -> EncodingStore:
+    encodings_location = Path(encodings_location)
+    if encodings_location.suffix == ".pkl":
+        store_location = encodings_location.with_suffix(STORE_SUFFIX)
+        if not store_location.exists() or store_location.stat().st_mtime < encodings_location.stat().st_mtime:
+            migrate_pickle(encodings_location, store_location)
+        return open_store(store_location)
+    if not encodings_location.exists():
+        legacy_location = encodings_location.with_suffix(".pkl")
+        if legacy_location.exists():
+            migrate_pickle(legacy_location, encodings_location)
+    return open_store(encodings_location)
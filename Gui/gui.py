@@ -4,6 +4,7 @@ from tkinter import ttk  # Progress Bar를 위한 ttk 모듈 사용
 import threading
 import time
 from AI import detector
+from AI.client import RecognitionClient
 
 
 class FaceRecognitionApp:
@@ -11,10 +12,15 @@ class FaceRecognitionApp:
         self.root = root
         self.root.title("Face Recognition App")
         self.root.geometry("400x300")  # GUI 창의 크기를 조정
+        self.client = RecognitionClient()  # 상주 인식 서버 (떠 있을 때만 사용)
 
         # Create the GUI elements
         self.create_widgets()
 
+        # 창을 먼저 띄운 뒤 dlib 모델을 백그라운드에서 불러옴
+        self.update_status("Loading models...")
+        self.run_in_thread(self._warm_up)
+
     def create_widgets(self):
         # 상태 표시 라벨
         self.status_label = tk.Label(self.root, text="Idle", fg="blue", font=("Arial", 12))
@@ -50,6 +56,10 @@ class FaceRecognitionApp:
         self.progress['value'] = value
         self.root.update_idletasks()
 
+    def update_train_progress(self, done, total):
+        """학습된 사진 수를 진행률로 변환해서 표시"""
+        self.update_progress(done * 100 // total)
+
     def run_in_thread(self, func, *args):
         """비동기 실행을 위해 별도의 스레드에서 작업 수행"""
         threading.Thread(target=func, args=args).start()
@@ -60,15 +70,21 @@ class FaceRecognitionApp:
             self.update_progress(i)
             time.sleep(0.05)
 
+    def _warm_up(self):
+        """detector.warm_up 으로 모델과 학습 데이터를 미리 불러옴"""
+        elapsed = detector.warm_up(model="hog", encodings_location=detector.DEFAULT_ENCODINGS_PATH)
+        self.update_status(f"Idle (models loaded in {elapsed:.1f}s)")
+
     def train_faces(self):
         """detector.py의 encode_known_faces 함수를 호출 (비동기 처리)"""
         self.update_status("Training started...")
         self.run_in_thread(self._train_faces)
 
     def _train_faces(self):
-        self.simulate_task()  # 실제 detector.py 작업 대신 임시 작업
-        detector.encode_known_faces(model="hog")
-        self.update_status("Training complete")
+        # CPU 코어 수만큼 병렬로 학습하고 실제 진행 상황을 표시
+        report = detector.encode_known_faces(model="hog", workers=0, progress=self.update_train_progress)
+        self.update_progress(100)
+        self.update_status(f"Training complete ({report.summary()})")
         messagebox.showinfo("Success", "Face training complete")
 
     def validate_faces(self):
@@ -94,7 +110,9 @@ class FaceRecognitionApp:
 
     def _test_faces(self, file_path):
         self.simulate_task()  # 실제 detector.py 작업 대신 임시 작업
-        detector.recognize_faces(image_location=file_path, model="hog")
+        # 인식 서버가 떠 있으면 모델 로딩 없이 서버에 맡김
+        client = self.client if self.client.is_available() else None
+        detector.recognize_faces(image_location=file_path, model="hog", client=client)
         self.update_status("Testing complete")
         messagebox.showinfo("Success", "Face test complete")
 
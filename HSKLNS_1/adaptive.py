@@ -0,0 +1,105 @@
+#검출 해상도 자동 조절 (목표 프레임 처리 시간 유지)
+# 검출 설정 (축소 비율 scale, number_of_times_to_upsample) 조합을 검출 비용 순으로 나열한 사다리를 만들고
+# 최근 window 프레임의 처리 시간(중앙값)이 목표보다 길면 싼 쪽으로, 여유가 있으면 비싼 쪽으로 한 칸씩 이동
+#
+# 검출 비용은 HOG 가 훑는 화소 수에 비례한다고 보고 (scale * 2^upsample)^2 로 계산
+# 인코딩/매칭처럼 검출 설정과 상관없는 시간은 그대로 두고 검출 시간만 비율로 예측해서
+# 옮겨간 뒤에도 목표를 넘지 않을 때만 비싼 쪽으로 올라감 (왔다 갔다 하지 않도록)
+#
+# 사용 예)
+#   resolution = AdaptiveResolution(target_ms=300)
+#   point = resolution.operating_point              # OperatingPoint(scale=1.0, upsample=1)
+#   boxes = detect_faces(image, scale=point.scale, upsample=point.upsample)
+#   resolution.record(frame_seconds, detect_seconds)
+
+import threading
+from collections import deque
+from statistics import median
+from typing import List, NamedTuple, Optional
+
+
+#검출 설정 하나
+class OperatingPoint(NamedTuple):
+    scale: float    # 검출 전에 이미지를 줄이는 비율 (1.0 = 원본)
+    upsample: int   # face_locations 의 number_of_times_to_upsample
+
+    @property
+    def cost(self) -> float:
+        """원본 해상도, upsample 0 대비 검출 비용"""
+        return (self.scale * 2 ** self.upsample) ** 2
+
+
+#bounds 안의 검출 설정을 비용이 큰 순서로 (비용이 같으면 upsample 이 적은 쪽만 남김)
+def build_ladder(min_scale: float = 0.25, max_scale: float = 1.0, scale_step: float = 0.8,
+                 min_upsample: int = 0, max_upsample: int = 1) -> List[OperatingPoint]:
+    if not 0 < min_scale <= max_scale or not 0 < scale_step < 1 or not 0 <= min_upsample <= max_upsample:
+        raise ValueError("invalid detection bounds")
+    scales, scale = [], max_scale
+    while scale > min_scale * 1.0001:
+        scales.append(round(scale, 3))
+        scale *= scale_step
+    scales.append(min_scale)
+    points = {}
+    for upsample in range(min_upsample, max_upsample + 1):
+        for scale in scales:
+            point = OperatingPoint(scale, upsample)
+            points.setdefault(round(point.cost, 4), point)
+    return sorted(points.values(), key=lambda point: point.cost, reverse=True)
+
+
+class AdaptiveResolution:
+    def __init__(self, target_ms: float = 300.0, min_scale: float = 0.25, max_scale: float = 1.0,
+                 scale_step: float = 0.8, min_upsample: int = 0, max_upsample: int = 1,
+                 start: Optional[OperatingPoint] = None, window: int = 8, tolerance: float = 0.15):
+        self.target = target_ms / 1000.0
+        self.window = window          # 판단에 쓰는 최근 프레임 수 (설정을 바꾸면 다시 모음)
+        self.tolerance = tolerance    # 목표의 이 비율만큼은 벗어나도 그대로 둠
+        self.ladder = build_ladder(min_scale, max_scale, scale_step, min_upsample, max_upsample)
+        start = start or OperatingPoint(max_scale, min(max(1, min_upsample), max_upsample))  # 기본: 원본, upsample 1
+        self.position = min(range(len(self.ladder)), key=lambda i: abs(self.ladder[i].cost - start.cost))
+        self.samples = deque(maxlen=window)  # (프레임 처리 시간, 그중 검출 시간) 초
+        self.adjustments = 0
+        self.lock = threading.Lock()
+
+    @property
+    def operating_point(self) -> OperatingPoint:
+        return self.ladder[self.position]
+
+    def _predict(self, frame_seconds: float, detect_seconds: float, position: int) -> float:
+        ratio = self.ladder[position].cost / self.ladder[self.position].cost
+        return max(0.0, frame_seconds - detect_seconds) + detect_seconds * ratio
+
+    def record(self, frame_seconds: float, detect_seconds: Optional[float] = None) -> bool:
+        """프레임 하나의 처리 시간 (검출 + 인코딩/매칭)과 그중 검출 시간 기록, 설정을 바꿨으면 True"""
+        with self.lock:
+            self.samples.append((frame_seconds, frame_seconds if detect_seconds is None else detect_seconds))
+            if len(self.samples) < self.window:
+                return False
+            frame_seconds = median(sample[0] for sample in self.samples)
+            detect_seconds = median(sample[1] for sample in self.samples)
+            position = self.position
+            if frame_seconds > self.target * (1 + self.tolerance):
+                # 목표 안으로 들어오는 가장 비싼 설정까지 한 번에 내려감 (없으면 가장 싼 설정)
+                cheaper = range(self.position + 1, len(self.ladder))
+                position = next((i for i in cheaper if self._predict(frame_seconds, detect_seconds, i) <= self.target),
+                                len(self.ladder) - 1)
+            elif frame_seconds < self.target * (1 - self.tolerance) and self.position > 0:
+                if self._predict(frame_seconds, detect_seconds, self.position - 1) <= self.target:
+                    position = self.position - 1
+            if position == self.position:
+                return False
+            self.position = position
+            self.samples.clear()
+            self.adjustments += 1
+        point = self.operating_point
+        print(f"[INFO] 검출 설정 변경: scale {point.scale:g}, upsample {point.upsample} "
+              f"(최근 {frame_seconds * 1000:.0f} ms, 목표 {self.target * 1000:.0f} ms)")
+        return True
+
+    def stats(self) -> dict:
+        with self.lock:
+            recent = [sample[0] for sample in self.samples]
+        point = self.operating_point
+        return {"target_ms": round(self.target * 1000, 1), "scale": point.scale, "upsample": point.upsample,
+                "recent_ms": round(median(recent) * 1000, 1) if recent else None,
+                "rung": self.position, "rungs": len(self.ladder), "adjustments": self.adjustments}
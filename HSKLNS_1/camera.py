@@ -0,0 +1,199 @@
+#카메라 캡처 모듈
+# 장치를 한 번만 열어두고 백그라운드 스레드가 계속 프레임을 읽어 작은 링 버퍼에 보관
+# 인식 쪽은 디스크에 저장/다시 읽기 없이 메모리의 RGB 배열을 바로 받음
+#
+# 사용 예)
+#   grabber = FrameGrabber(CameraSource(0)).start()
+#   frame = grabber.wait_for_frame()      # Frame(index, timestamp, bgr)
+#   rgb = frame.rgb()                     # face_recognition 에 바로 넘길 수 있는 배열
+#   grabber.stop()
+#
+# 테스트에서는 CameraSource 대신 VideoFileSource / ImageDirSource 를 넘기면 됨
+
+import os
+import threading
+import time
+from collections import deque
+from typing import List, NamedTuple, Optional
+
+import cv2
+import numpy as np
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+#캡처된 프레임 한 장
+class Frame(NamedTuple):
+    index: int          # 캡처 순서 번호 (0부터)
+    timestamp: float    # time.monotonic() 기준 캡처 시각
+    bgr: np.ndarray     # OpenCV 원본 (BGR)
+
+    def rgb(self) -> np.ndarray:
+        """face_recognition 용 RGB 배열 (연속 메모리)"""
+        return cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB)
+
+
+#프레임 공급원 인터페이스
+class FrameSource:
+    def read(self):
+        """(성공 여부, BGR 프레임) 반환, 더 이상 프레임이 없으면 (False, None)"""
+        raise NotImplementedError
+
+    def is_opened(self) -> bool:
+        return True
+
+    def release(self) -> None:
+        pass
+
+
+#USB 웹캠
+class CameraSource(FrameSource):
+    def __init__(self, device=0, width: Optional[int] = None, height: Optional[int] = None):
+        self.capture = cv2.VideoCapture(device)
+        if width:
+            self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height:
+            self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        # 드라이버 버퍼를 줄여서 오래된 프레임이 쌓이지 않게 함 (지원하지 않는 장치는 무시됨)
+        self.capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    def read(self):
+        return self.capture.read()
+
+    def is_opened(self) -> bool:
+        return self.capture.isOpened()
+
+    def release(self) -> None:
+        self.capture.release()
+
+
+#동영상 파일 (loop=True 이면 끝나면 처음부터 다시)
+class VideoFileSource(FrameSource):
+    def __init__(self, path: str, loop: bool = False):
+        self.path = path
+        self.loop = loop
+        self.capture = cv2.VideoCapture(path)
+
+    def read(self):
+        ok, frame = self.capture.read()
+        if not ok and self.loop:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.capture.read()
+        return ok, frame
+
+    @property
+    def fps(self) -> Optional[float]:
+        """파일에 기록된 초당 프레임 수 (알 수 없으면 None), FrameGrabber 의 max_fps 로 넘기면 카메라 속도로 재생"""
+        fps = self.capture.get(cv2.CAP_PROP_FPS)
+        return fps if fps and fps > 0 else None
+
+    def is_opened(self) -> bool:
+        return self.capture.isOpened()
+
+    def release(self) -> None:
+        self.capture.release()
+
+
+#이미지 폴더 (파일 이름 순서, loop=True 이면 반복)
+class ImageDirSource(FrameSource):
+    def __init__(self, directory: str, loop: bool = False):
+        self.paths = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                            if name.lower().endswith(IMAGE_SUFFIXES))
+        self.loop = loop
+        self.position = 0
+
+    def read(self):
+        if self.position >= len(self.paths):
+            if not self.loop or not self.paths:
+                return False, None
+            self.position = 0
+        frame = cv2.imread(self.paths[self.position])
+        self.position += 1
+        return frame is not None, frame
+
+    def is_opened(self) -> bool:
+        return bool(self.paths)
+
+
+#백그라운드에서 계속 프레임을 읽어 최근 buffer_size 장을 보관
+class FrameGrabber:
+    def __init__(self, source: FrameSource, buffer_size: int = 4, max_fps: Optional[float] = None, metrics=None):
+        self.source = source
+        self.metrics = metrics  # metrics.Metrics 를 주면 장치에서 프레임 하나 읽는 시간을 "capture" 로 기록
+        self.buffer = deque(maxlen=buffer_size)
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0  # 파일 공급원을 카메라 속도로 재생할 때 사용
+        self.condition = threading.Condition()
+        self.thread = None
+        self.running = False
+        self.finished = False   # 공급원이 끝났거나 읽기에 실패하면 True
+        self.frames_read = 0
+        self.read_failures = 0
+
+    def start(self) -> "FrameGrabber":
+        if not self.source.is_opened():
+            raise RuntimeError("frame source could not be opened")
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="FrameGrabber", daemon=True)
+        self.thread.start()
+        return self
+
+    def _run(self):
+        last_read = 0.0
+        while self.running:
+            if self.min_interval:
+                delay = last_read + self.min_interval - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            last_read = time.monotonic()
+            ok, bgr = self.source.read()
+            if self.metrics is not None:
+                self.metrics.observe("capture", time.monotonic() - last_read)
+            if not ok:
+                self.read_failures += 1
+                if isinstance(self.source, CameraSource) and self.read_failures < 10:
+                    time.sleep(0.05)  # 카메라는 일시적인 실패가 있으므로 몇 번 더 시도
+                    continue
+                break
+            self.read_failures = 0
+            with self.condition:
+                self.buffer.append(Frame(self.frames_read, time.monotonic(), bgr))
+                self.frames_read += 1
+                self.condition.notify_all()
+        with self.condition:
+            self.finished = True
+            self.condition.notify_all()
+
+    def latest(self) -> Optional[Frame]:
+        """가장 최근 프레임 (아직 없으면 None)"""
+        with self.condition:
+            return self.buffer[-1] if self.buffer else None
+
+    def recent(self) -> List[Frame]:
+        """버퍼에 남아있는 최근 프레임들 (오래된 순)"""
+        with self.condition:
+            return list(self.buffer)
+
+    def wait_for_frame(self, after_index: int = -1, timeout: Optional[float] = 5.0) -> Optional[Frame]:
+        """after_index 보다 새로운 프레임이 들어올 때까지 기다려서 가장 최근 프레임 반환
+
+        같은 프레임을 두 번 인식하지 않도록 마지막으로 처리한 index 를 넘기면 됨
+        시간 초과나 공급원 종료 시 None
+        """
+        with self.condition:
+            ready = self.condition.wait_for(
+                lambda: (self.buffer and self.buffer[-1].index > after_index) or self.finished, timeout)
+            if ready and self.buffer and self.buffer[-1].index > after_index:
+                return self.buffer[-1]
+            return None
+
+    def stop(self) -> None:
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
+        self.source.release()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
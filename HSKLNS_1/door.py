@@ -0,0 +1,178 @@
+#문 개폐 제어 (서보)
+# 서보 이동/문 열림 유지 시간 동안 인증 루프가 멈추지 않도록 별도 스레드의 상태 기계로 동작
+#
+#   CLOSED --request_open()--> OPENING --(move_seconds)--> OPEN --(open_seconds)--> CLOSING --(move_seconds)--> CLOSED
+#
+# 열리는 중/열린 상태에서 다시 인증되면 닫힐 시각만 뒤로 미루고,
+# 닫히는 중에 다시 인증되면 곧바로 다시 연다
+#
+# 사용 예)
+#   door = DoorController(RPiServoBackend(18), open_angle=80, open_seconds=10).start()
+#   door.request_open()       # 바로 반환
+#   door.stop()               # 문을 닫고 GPIO 정리
+#
+# 라즈베리파이가 아닌 곳에서는 RPiServoBackend 대신 MockServoBackend 를 넘기면 됨
+
+import threading
+import time
+from typing import List, Optional, Tuple
+
+CLOSED = "closed"
+OPENING = "opening"
+OPEN = "open"
+CLOSING = "closing"
+
+
+#서보 구동 인터페이스
+class ServoBackend:
+    def set_angle(self, angle: float) -> None:
+        """서보를 angle 도로 움직이기 시작 (기다리지 않음)"""
+        raise NotImplementedError
+
+    def release(self) -> None:
+        """이동이 끝난 뒤 펄스를 끊어 떨림 방지"""
+        pass
+
+    def cleanup(self) -> None:
+        pass
+
+
+#라즈베리파이 GPIO PWM 서보 (50Hz)
+class RPiServoBackend(ServoBackend):
+    def __init__(self, pin: int, frequency: int = 50):
+        import RPi.GPIO as GPIO  # 라즈베리파이에만 설치되어 있으므로 여기서 불러옴
+        self.GPIO = GPIO
+        self.pin = pin
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setup(pin, GPIO.OUT)
+        self.pwm = GPIO.PWM(pin, frequency)
+        self.pwm.start(0)
+
+    def set_angle(self, angle: float) -> None:
+        self.pwm.ChangeDutyCycle(angle / 18.0 + 2)
+
+    def release(self) -> None:
+        self.pwm.ChangeDutyCycle(0)
+
+    def cleanup(self) -> None:
+        self.pwm.stop()
+        self.GPIO.cleanup()
+
+
+#기기 없이 시험할 때 쓰는 가짜 서보 (움직인 기록만 남김)
+class MockServoBackend(ServoBackend):
+    def __init__(self, verbose: bool = False):
+        self.verbose = verbose
+        self.angle: Optional[float] = None
+        self.moves: List[Tuple[float, float]] = []  # (time.monotonic(), 각도)
+        self.cleaned_up = False
+
+    def set_angle(self, angle: float) -> None:
+        self.angle = angle
+        self.moves.append((time.monotonic(), angle))
+        if self.verbose:
+            print(f"[MOCK] 서보 {angle}도")
+
+    def cleanup(self) -> None:
+        self.cleaned_up = True
+
+
+class DoorController:
+    def __init__(self, backend: ServoBackend, open_angle: float = 80, closed_angle: float = 0,
+                 open_seconds: float = 10.0, move_seconds: float = 0.5):
+        self.backend = backend
+        self.open_angle = open_angle
+        self.closed_angle = closed_angle
+        self.open_seconds = open_seconds    # 마지막 인증 이후 문을 열어두는 시간
+        self.move_seconds = move_seconds    # 서보가 움직이는 데 걸리는 시간
+        self.state = CLOSED
+        self.opens = 0                      # 닫힌(닫히는) 상태에서 연 횟수
+        self.extensions = 0                 # 열린 상태에서 재인증으로 연장한 횟수
+        self._condition = threading.Condition()
+        self._open_requested = False
+        self._close_at = 0.0
+        self._move_done_at = 0.0
+        self._running = False
+        self._thread = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.state in (OPENING, OPEN)
+
+    def start(self) -> "DoorController":
+        self.backend.set_angle(self.closed_angle)  # 시작할 때 닫힌 위치로 맞춤
+        self.backend.release()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="DoorController", daemon=True)
+        self._thread.start()
+        return self
+
+    def request_open(self, seconds: Optional[float] = None) -> None:
+        """문을 열거나, 이미 열려 있으면 닫힐 시각을 지금부터 seconds 뒤로 연장 (바로 반환)"""
+        seconds = self.open_seconds if seconds is None else seconds
+        with self._condition:
+            now = time.monotonic()
+            if self.state in (OPENING, OPEN):
+                self.extensions += 1
+                self._close_at = max(self._close_at, now + seconds)
+            else:
+                self._open_requested = True
+                self._close_at = now + self.move_seconds + seconds
+            self._condition.notify_all()
+
+    def wait_for_state(self, state: str, timeout: Optional[float] = None) -> bool:
+        with self._condition:
+            return self._condition.wait_for(lambda: self.state == state, timeout)
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        print(f"[INFO] 문 상태: {state}")
+        self._condition.notify_all()
+
+    def _move(self, state: str, angle: float, now: float) -> None:
+        self.backend.set_angle(angle)
+        self._move_done_at = now + self.move_seconds
+        self._set_state(state)
+
+    def _run(self):
+        with self._condition:
+            while self._running:
+                now = time.monotonic()
+                if self._open_requested and self.state in (CLOSED, CLOSING):
+                    self._open_requested = False
+                    self.opens += 1
+                    self._move(OPENING, self.open_angle, now)
+                elif self.state == CLOSED:
+                    self._condition.wait()
+                elif self.state in (OPENING, CLOSING):
+                    if now < self._move_done_at:
+                        self._condition.wait(self._move_done_at - now)
+                    else:
+                        self.backend.release()
+                        self._set_state(OPEN if self.state == OPENING else CLOSED)
+                elif now < self._close_at:  # OPEN
+                    self._condition.wait(self._close_at - now)
+                else:
+                    self._move(CLOSING, self.closed_angle, now)
+
+            # 종료할 때 문이 열려 있으면 닫아둠
+            if self.state != CLOSED:
+                self._move(CLOSING, self.closed_angle, time.monotonic())
+                self._condition.wait(self.move_seconds)
+                self.backend.release()
+                self._set_state(CLOSED)
+
+    def stop(self) -> None:
+        """문을 닫고 스레드 종료 후 서보 정리"""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=self.move_seconds + 2.0)
+        self.backend.cleanup()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -55,14 +55,18 @@ def printMenu():
     print("**********************************************************"*2)
     print("")
 
+def objectToDict(obj):
+    # Block/Arrow are named tuples: fields from _asdict(), learned/type are properties
+    return dict(obj._asdict(), learned=obj.learned, type=obj.type)
+
 def printObjectNicely(obj):
     count=1
     if(type(obj)==list):
         for i in obj:
-            print("\t "+ ("BLOCK_" if i.type=="BLOCK" else "ARROW_")+str(count)+" : "+ json.dumps(i.__dict__))
+            print("\t "+ ("BLOCK_" if i.type=="BLOCK" else "ARROW_")+str(count)+" : "+ json.dumps(objectToDict(i)))
             count+=1
     else:
-        print("\t "+ ("BLOCK_" if obj.type=="BLOCK" else "ARROW_")+str(count)+" : "+ json.dumps(obj.__dict__))
+        print("\t "+ ("BLOCK_" if obj.type=="BLOCK" else "ARROW_")+str(count)+" : "+ json.dumps(objectToDict(obj)))
 
 
 ex = 1
@@ -14,6 +14,10 @@
 #   B) I2C
 #           huskyLens = HuskyLensLibrary("I2C","", address=0xADDR) *address is hex integer
 # 3) Call your desired functions on the huskyLens object!
+# 4) Or stream results instead of polling requestAll() in a loop
+#          for frame in huskyLens.stream(rate=10): print(frame.frameNumber, frame.objects)
+#          async for frame in huskyLens.astream(rate=10): ...
+# 5) huskyLens.linkStats() counts corrupt frames and resyncs, noise on the line is skipped without flushing
 ###
 # Example code
 '''
@@ -29,9 +33,10 @@ while(true):
 
 
 import time
-import serial
-import png
+import struct
 import json
+import asyncio
+from collections import namedtuple
 
 
 commandHeaderAndAddress = "55AA11"
@@ -47,35 +52,317 @@ algorthimsByteID = {
     "ALGORITHM_BARCODE_RECOGNTITION":"0800",
 }
 
-class Arrow:
-    def __init__(self, xTail, yTail , xHead , yHead, ID):
-        self.xTail=xTail
-        self.yTail=yTail
-        self.xHead=xHead
-        self.yHead=yHead
-        self.ID=ID
-        self.learned= True if ID > 0 else False
-        self.type="ARROW"
+# Binary protocol codec
+# A frame is 55 AA 11 | data length | command | data | checksum (low byte of the sum of all previous bytes).
+# Multi-byte fields are 16-bit little endian. Everything below works on bytes/memoryview directly,
+# the hex string helpers further down (calculateChecksum, cmdToBytes, splitCommandToParts) are kept for old callers.
+FRAME_HEADER = b"\x55\xaa\x11"
+FRAME_PREFIX_SIZE = 5  # header + data length + command
+FRAME_MIN_SIZE = FRAME_PREFIX_SIZE + 1  # ... + checksum
+
+COMMAND_REQUEST = 0x20
+COMMAND_REQUEST_BLOCKS = 0x21
+COMMAND_REQUEST_ARROWS = 0x22
+COMMAND_REQUEST_LEARNED = 0x23
+COMMAND_REQUEST_BLOCKS_LEARNED = 0x24
+COMMAND_REQUEST_ARROWS_LEARNED = 0x25
+COMMAND_REQUEST_BY_ID = 0x26
+COMMAND_REQUEST_BLOCKS_BY_ID = 0x27
+COMMAND_REQUEST_ARROWS_BY_ID = 0x28
+COMMAND_RETURN_INFO = 0x29
+COMMAND_RETURN_BLOCK = 0x2A
+COMMAND_RETURN_ARROW = 0x2B
+COMMAND_REQUEST_KNOCK = 0x2C
+COMMAND_REQUEST_ALGORITHM = 0x2D
+COMMAND_RETURN_OK = 0x2E
+COMMAND_REQUEST_CUSTOMNAMES = 0x2F
+COMMAND_REQUEST_PHOTO = 0x30
+COMMAND_REQUEST_SEND_KNOWLEDGES = 0x32
+COMMAND_REQUEST_RECEIVE_KNOWLEDGES = 0x33
+COMMAND_REQUEST_CUSTOM_TEXT = 0x34
+COMMAND_REQUEST_CLEAR_TEXT = 0x35
+COMMAND_REQUEST_LEARN = 0x36
+COMMAND_REQUEST_FORGET = 0x37
+COMMAND_REQUEST_SCREENSHOT = 0x39
+
+INFO_STRUCT = struct.Struct("<HHH")      # blocks/arrows that follow, learned IDs, frame number (+ 4 reserved bytes)
+OBJECT_STRUCT = struct.Struct("<HHHHH")  # block: x, y, width, height, ID / arrow: xTail, yTail, xHead, yHead, ID
+ID_STRUCT = struct.Struct("<H")
+
+# Batch mode: all objects of a frame in one NumPy structured array (arrows keep xTail, yTail, xHead, yHead in x, y, w, h)
+KIND_BLOCK = 0
+KIND_ARROW = 1
+OBJECT_DTYPE = [("x", "<u2"), ("y", "<u2"), ("w", "<u2"), ("h", "<u2"), ("id", "<u2"), ("kind", "u1")]
+
+
+# Responses the parser accepts and the data length each must have (anything else is a corrupt frame)
+RESPONSE_DATA_LENGTHS = {
+    COMMAND_RETURN_INFO: 10,
+    COMMAND_RETURN_BLOCK: 10,
+    COMMAND_RETURN_ARROW: 10,
+    COMMAND_RETURN_OK: 0,
+}
+READ_TIMEOUT = .5
+
+
+class HuskyLensProtocolError(ValueError):
+    pass
+
+
+def checksumOf(frame):
+    return sum(frame) & 0xFF
 
 
-class Block:
-    def __init__(self, x, y , width , height, ID):
-        self.x = x
-        self.y=y
-        self.width=width
-        self.height=height
-        self.ID=ID
-        self.learned= True if ID > 0 else False
-        self.type="BLOCK"
+def buildCommand(command, data=b""):
+    frame = FRAME_HEADER + bytes((len(data), command)) + bytes(data)
+    return frame + bytes((checksumOf(frame),))
+
+
+# Fixed commands never change, so their frames (checksum included) are built once
+COMMAND_FRAMES = {
+    command: buildCommand(command)
+    for command in (COMMAND_REQUEST, COMMAND_REQUEST_BLOCKS, COMMAND_REQUEST_ARROWS, COMMAND_REQUEST_LEARNED,
+                    COMMAND_REQUEST_BLOCKS_LEARNED, COMMAND_REQUEST_ARROWS_LEARNED, COMMAND_REQUEST_KNOCK,
+                    COMMAND_REQUEST_PHOTO, COMMAND_REQUEST_CLEAR_TEXT, COMMAND_REQUEST_FORGET, COMMAND_REQUEST_SCREENSHOT)
+}
+
+
+def parseFrame(frame):
+    """Validate one complete frame and return (command, data) with data as a memoryview"""
+    view = memoryview(frame)
+    if len(view) < FRAME_MIN_SIZE or view[:3] != FRAME_HEADER:
+        raise HuskyLensProtocolError("bad frame header")
+    length = view[3]
+    if len(view) != FRAME_MIN_SIZE + length:
+        raise HuskyLensProtocolError(f"frame length {len(view)} does not match data length {length}")
+    if checksumOf(view[:-1]) != view[-1]:
+        raise HuskyLensProtocolError("frame checksum mismatch")
+    return view[4], view[FRAME_PREFIX_SIZE:-1]
+
+
+def decodeInfo(data):
+    """(number of blocks/arrows, number of learned IDs, frame number) from a COMMAND_RETURN_INFO payload"""
+    return INFO_STRUCT.unpack_from(data)
+
+
+def decodeObject(command, data):
+    values = OBJECT_STRUCT.unpack_from(data)
+    return Block(*values) if command == COMMAND_RETURN_BLOCK else Arrow(*values)
+
+
+def decodeObjectArray(payloads):
+    """Structured array (OBJECT_DTYPE) from a list of (command, data) block/arrow payloads"""
+    import numpy as np  # only needed for batch mode
+    # OBJECT_DTYPE is packed, so each record is the 10 payload bytes followed by the kind byte
+    records = bytearray()
+    for command, data in payloads:
+        records += data[:OBJECT_STRUCT.size]
+        records.append(KIND_ARROW if command == COMMAND_RETURN_ARROW else KIND_BLOCK)
+    return np.frombuffer(records, dtype=OBJECT_DTYPE)
+
+
+# Incremental parser for a byte stream that may contain noise
+# feed() whatever was received, next() returns each valid frame as bytes (None until one is complete).
+# Bytes before a header are skipped, a header whose command is not a known response or whose length or
+# checksum does not check out is treated as noise and scanning restarts one byte later, so a bad byte costs
+# at most the frame it landed in and the frames after it are still found. The command is checked before
+# waiting for the rest of the frame, so a noise length byte cannot hold back the frames behind it.
+# Nothing already received is thrown away to recover.
+class FrameParser:
+    def __init__(self, maxBuffer=4096):
+        self.buffer = bytearray()
+        self.maxBuffer = maxBuffer
+        self.frames = 0    # valid frames returned
+        self.corrupt = 0   # frames rejected by the command, length or checksum check
+        self.resynced = 0  # times bytes had to be skipped to reach the next header
+        self.skipped = 0   # bytes skipped (noise, rejected headers, clear(), overflow)
+
+    def feed(self, data):
+        self.buffer += data
+        if len(self.buffer) > self.maxBuffer:  # nobody is reading, keep the newest bytes
+            self.skip(len(self.buffer) - self.maxBuffer)
+            self.resynced += 1
+
+    def skip(self, count):
+        del self.buffer[:count]
+        self.skipped += count
+
+    def clear(self):
+        self.skip(len(self.buffer))
+
+    def next(self):
+        buffer = self.buffer
+        while True:
+            start = buffer.find(FRAME_HEADER)
+            if start < 0:
+                # keep a header that may be split across reads
+                keep = 2 if buffer.endswith(FRAME_HEADER[:2]) else 1 if buffer.endswith(FRAME_HEADER[:1]) else 0
+                if len(buffer) > keep:
+                    self.skip(len(buffer) - keep)
+                    self.resynced += 1
+                return None
+            if start > 0:
+                self.skip(start)
+                self.resynced += 1
+            if len(buffer) < FRAME_PREFIX_SIZE:
+                return None
+            length = buffer[3]
+            expected = RESPONSE_DATA_LENGTHS.get(buffer[4])
+            if expected is None or length != expected:
+                self.corrupt += 1
+                self.skip(1)
+                continue
+            size = FRAME_MIN_SIZE + length
+            if len(buffer) < size:
+                return None
+            if checksumOf(buffer[:size - 1]) != buffer[size - 1]:
+                self.corrupt += 1
+                self.skip(1)
+                continue
+            frame = bytes(buffer[:size])
+            del buffer[:size]
+            self.frames += 1
+            return frame
+
+    def __iter__(self):
+        frame = self.next()
+        while frame is not None:
+            yield frame
+            frame = self.next()
+
+
+# One complete answer to a request: info frame + every block/arrow frame it announced
+# objects is a list of Block/Arrow, or a structured array (OBJECT_DTYPE) in batch mode
+# requestedAt / receivedAt are time.monotonic() values (request sent, last frame parsed)
+HuskyLensFrame = namedtuple("HuskyLensFrame", "frameNumber learnedIDs objects requestedAt receivedAt")
+
+
+# Transports
+# HuskyLensLibrary only talks to a transport: write(frame) sends one command frame,
+# readFrame() returns one complete response frame. A fake bus/port can be dropped in to count traffic.
+I2C_REGISTER = 12
+
+
+class Transport:
+    def write(self, frame):
+        raise NotImplementedError
+
+    def read(self, size):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def readAvailable(self):
+        """Bytes that can be read right now; transports that cannot tell return the next frame"""
+        return self.readFrame()
+
+    def readChunk(self):
+        """At least some bytes, waiting for them if needed (b"" on timeout)"""
+        return self.readFrame()
+
+    def readFrame(self):
+        prefix = self.read(FRAME_PREFIX_SIZE)
+        if len(prefix) < FRAME_PREFIX_SIZE:
+            raise HuskyLensProtocolError("no response from HuskyLens")
+        return prefix + self.read(prefix[3] + 1)
+
+
+class SerialTransport(Transport):
+    def __init__(self, port):
+        self.port = port  # serial.Serial
+
+    def write(self, frame):
+        self.port.flush()
+        self.port.flushInput()
+        self.port.write(frame)
+
+    def read(self, size):
+        return self.port.read(size)
+
+    def readAvailable(self):
+        waiting = self.port.in_waiting
+        return self.port.read(waiting) if waiting else b""
+
+    def readChunk(self):
+        return self.port.read(self.port.in_waiting or 1)
+
+    def flush(self):
+        self.port.flushInput()
+        self.port.flushOutput()
+        self.port.flush()
+
+
+# Reads a whole header or payload in one I2C transaction with i2c_rdwr (smbus2) instead of one
+# read_byte transaction per byte, so a frame costs two reads no matter how long it is.
+# Buses without i2c_rdwr (the old smbus module) fall back to read_byte, with a warning: install smbus2.
+class I2CTransport(Transport):
+    def __init__(self, bus, address=0x32, register=I2C_REGISTER, i2cMsg=None):
+        self.bus = bus
+        self.address = address
+        self.register = register
+        if i2cMsg is None and callable(getattr(bus, "i2c_rdwr", None)):
+            try:
+                from smbus2 import i2c_msg as i2cMsg
+            except ImportError:
+                i2cMsg = None
+        self.i2cMsg = i2cMsg
+        self.transactions = 0
+        if i2cMsg is None:
+            print("HuskyLens I2C: block reads need smbus2 (pip install smbus2), reading one byte per transaction")
+
+    @property
+    def blockReads(self):
+        return self.i2cMsg is not None
+
+    def write(self, frame):
+        self.transactions += 1
+        self.bus.write_i2c_block_data(self.address, self.register, list(frame))
+
+    def read(self, size):
+        if size <= 0:
+            return b""
+        if self.i2cMsg is None:
+            self.transactions += size
+            return bytes(self.bus.read_byte(self.address) for i in range(size))
+        message = self.i2cMsg.read(self.address, size)
+        self.transactions += 1
+        self.bus.i2c_rdwr(message)
+        return bytes(message)
+
+
+# Results are immutable tuples without a per-object __dict__; learned and type are computed on access.
+# Use _asdict() where the attributes are needed as a dict.
+class Arrow(namedtuple("Arrow", "xTail yTail xHead yHead ID")):
+    __slots__ = ()
+    type = "ARROW"
+
+    @property
+    def learned(self):
+        return self.ID > 0
+
+
+class Block(namedtuple("Block", "x y width height ID")):
+    __slots__ = ()
+    type = "BLOCK"
+
+    @property
+    def learned(self):
+        return self.ID > 0
 
 
 
 class HuskyLensLibrary:
-    def __init__(self, proto, comPort="", speed=3000000, channel=1, address=0x32):
+    def __init__(self, proto, comPort="", speed=3000000, channel=1, address=0x32, bus=None):
         self.proto = proto
         self.address = address
-        self.checkOnceAgain=True
+        self.lastCmdSent = ""
+        self.parser = FrameParser()  # received bytes that do not form a whole frame yet stay here between reads
+        self.response = None         # (info, objects) of the response stream() is collecting
+        self.dropped = 0             # valid frames that did not belong to a response (left over or interrupted)
+        self.linkErrors = 0          # stream()/astream() requests that failed on the link (port or bus errors)
         if(proto == "SERIAL"):
+            import serial
             self.huskylensSer =serial.Serial(
                 baudrate=speed,
                 parity=serial.PARITY_NONE,
@@ -88,6 +375,7 @@ class HuskyLensLibrary:
             time.sleep(.1)
             self.huskylensSer.port=comPort
             self.huskylensSer.open()
+            self.transport = SerialTransport(self.huskylensSer)
             time.sleep(2)
             self.knock()
             time.sleep(.5)
@@ -95,23 +383,22 @@ class HuskyLensLibrary:
             time.sleep(.5)
             self.knock()
             # self.huskylensSer.timeout=5
-            self.huskylensSer.flushInput()
-            self.huskylensSer.flushOutput()
-            self.huskylensSer.flush()
+            self.transport.flush()
 
         elif (proto == "I2C"):
-            import smbus
-            self.huskylensSer = smbus.SMBus(channel)
-        self.lastCmdSent = ""
+            # bus: an already open SMBus (or a fake one); smbus2 is preferred because it supports block reads
+            if bus is None:
+                try:
+                    import smbus2 as smbus
+                except ImportError:
+                    import smbus
+                bus = smbus.SMBus(channel)
+            self.huskylensSer = bus
+            self.transport = I2CTransport(bus, address)
 
     def writeToHuskyLens(self, cmd):
         self.lastCmdSent = cmd
-        if(self.proto == "SERIAL"):
-            self.huskylensSer.flush()
-            self.huskylensSer.flushInput()
-            self.huskylensSer.write(cmd)
-        else:
-            self.huskylensSer.write_i2c_block_data(self.address, 12, list(cmd))
+        self.transport.write(cmd)
 
     def calculateChecksum(self, hexStr):
         total = 0
@@ -137,92 +424,62 @@ class HuskyLensLibrary:
 
         return [headers, address, data_length, command, data, checkSum]
 
-    def getBlockOrArrowCommand(self):
-        if(self.proto == "SERIAL"):
-            byteString = self.huskylensSer.read(5)
-            byteString += self.huskylensSer.read(int(byteString[3]))
-            byteString += self.huskylensSer.read(1)
-        else:
-            byteString = b''
-            for i in range(5):
-                byteString += bytes([(self.huskylensSer.read_byte(self.address))])
-            for i in range(int(byteString[3])+1):
-                byteString += bytes([(self.huskylensSer.read_byte(self.address))])
+    def readFrame(self, timeout=None):
+        """Next valid frame, skipping noise (HuskyLensProtocolError if none arrives within timeout)"""
+        if timeout is None:
+            timeout = getattr(self.huskylensSer, "timeout", None) or READ_TIMEOUT
+        deadline = time.monotonic() + timeout
+        frame = self.parser.next()
+        while frame is None:
+            if time.monotonic() > deadline:
+                raise HuskyLensProtocolError("no response from HuskyLens")
+            self.parser.feed(self.transport.readChunk())
+            frame = self.parser.next()
+        return frame
+
+    def linkStats(self):
+        """Frame counters of the receive side (corrupt/resynced/skipped show how noisy the link is)"""
+        parser = self.parser
+        return {"frames": parser.frames, "corrupt": parser.corrupt, "resynced": parser.resynced,
+                "skippedBytes": parser.skipped, "dropped": self.dropped, "linkErrors": self.linkErrors}
 
+    def getBlockOrArrowCommand(self):
+        byteString = self.readFrame()
         commandSplit = self.splitCommandToParts(byteString.hex())
         isBlock = True if commandSplit[3] == "2a" else False
         return (commandSplit[4],isBlock)
 
-    def processReturnData(self, numIdLearnFlag=False, frameFlag=False):
-        inProduction = True
-        byteString=""
-        if(inProduction):
-            try:
-                if(self.proto == "SERIAL"):
-                    byteString = self.huskylensSer.read(5)
-                    byteString += self.huskylensSer.read(int(byteString[3]))
-                    byteString += self.huskylensSer.read(1)
-                else:
-                    byteString = b''
-                    for i in range(5):
-                        byteString += bytes([(self.huskylensSer.read_byte(self.address))])
-                    for i in range(int(byteString[3])+1):
-                        byteString += bytes([(self.huskylensSer.read_byte(self.address))])
-                commandSplit = self.splitCommandToParts(byteString.hex())
-                # print(commandSplit)
-                if(commandSplit[3] == "2e"):
-                    self.checkOnceAgain=True
-                    return "Knock Recieved"
-                else:
-                    returnData = []
-                    numberOfBlocksOrArrow = int(
-                        commandSplit[4][2:4]+commandSplit[4][0:2], 16)
-                    numberOfIDLearned = int(
-                        commandSplit[4][6:8]+commandSplit[4][4:6], 16)
-                    frameNumber = int(
-                        commandSplit[4][10:12]+commandSplit[4][8:10], 16)
-                    isBlock=True
-                    for i in range(numberOfBlocksOrArrow):
-                        tmpObj=self.getBlockOrArrowCommand()
-                        isBlock=tmpObj[1]
-                        returnData.append(tmpObj[0])
-
-                    
-                    # isBlock = True if commandSplit[3] == "2A"else False
-                    
-                    finalData = []
-                    tmp = []
-                    # print(returnData)
-                    for i in returnData:
-                        tmp = []
-                        for q in range(0, len(i), 4):
-                            low=int(i[q:q+2], 16)
-                            high=int(i[q+2:q+4], 16)
-                            if(high>0):
-                                val=low+255+high
-                            else:
-                                val=low
-                            tmp.append(val)
-                        finalData.append(tmp)
-                        tmp = []
-                    self.checkOnceAgain=True
-                    ret=self.convert_to_class_object(finalData,isBlock)
-                    if(numIdLearnFlag):
-                        ret.append(numberOfIDLearned)
-                    if(frameFlag):
-                        ret.append(frameNumber)
-                    return ret
-            except:
-                if(self.checkOnceAgain):
-                    self.huskylensSer.timeout=5
-                    self.checkOnceAgain=False
-                    self.huskylensSer.timeout=.5
-                    return self.processReturnData()
-                print("Read response error, please try again")
-                self.huskylensSer.flushInput()
-                self.huskylensSer.flushOutput()
-                self.huskylensSer.flush()
-                return []
+    def processReturnData(self, numIdLearnFlag=False, frameFlag=False, batch=False):
+        try:
+            command, data = parseFrame(self.readFrame())
+            while(command in (COMMAND_RETURN_BLOCK, COMMAND_RETURN_ARROW)):
+                # left over from a response that was cut short
+                self.dropped += 1
+                command, data = parseFrame(self.readFrame())
+            if(command == COMMAND_RETURN_OK):
+                return "Knock Recieved"
+            else:
+                if(command != COMMAND_RETURN_INFO):
+                    raise HuskyLensProtocolError(f"unexpected response command 0x{command:02x}")
+                numberOfBlocksOrArrow, numberOfIDLearned, frameNumber = decodeInfo(data)
+                ret = []
+                for i in range(numberOfBlocksOrArrow):
+                    command, data = parseFrame(self.readFrame())
+                    if(command not in (COMMAND_RETURN_BLOCK, COMMAND_RETURN_ARROW)):
+                        self.dropped += 1 + len(ret)
+                        raise HuskyLensProtocolError(f"response cut short by command 0x{command:02x}")
+                    ret.append((command, data) if batch else decodeObject(command, data))
+                if(batch):
+                    return decodeObjectArray(ret)
+                if(numIdLearnFlag):
+                    ret.append(numberOfIDLearned)
+                if(frameFlag):
+                    ret.append(frameNumber)
+                return ret
+        except (HuskyLensProtocolError, OSError) as e:
+            # bytes already received stay in the parser, nothing is flushed
+            print(f"Read response error, please try again ({e})")
+            return []
 
     def convert_to_class_object(self,data,isBlock):
         tmp=[]
@@ -234,172 +491,190 @@ class HuskyLensLibrary:
             tmp.append(obj)
         return tmp
 
+    def startRequest(self, command=COMMAND_REQUEST):
+        self.parser.clear()  # anything still buffered answers an earlier request
+        self.response = None
+        self.writeToHuskyLens(COMMAND_FRAMES[command])
+        return time.monotonic()
+
+    def pollResponse(self, requestedAt, batch=False):
+        """Parse whatever has arrived without waiting; HuskyLensFrame once the whole response is in, else None"""
+        self.parser.feed(self.transport.readAvailable())
+        for frame in self.parser:
+            command, data = parseFrame(frame)
+            if command == COMMAND_RETURN_INFO:
+                if self.response is not None:  # the previous response lost some of its frames
+                    self.dropped += 1 + len(self.response[1])
+                self.response = (decodeInfo(data), [])
+            elif command in (COMMAND_RETURN_BLOCK, COMMAND_RETURN_ARROW) and self.response is not None:
+                self.response[1].append((command, data) if batch else decodeObject(command, data))
+            else:
+                self.dropped += 1
+                continue
+            (count, learnedIDs, frameNumber), objects = self.response
+            if len(objects) >= count:
+                self.response = None
+                if batch:
+                    objects = decodeObjectArray(objects)
+                return HuskyLensFrame(frameNumber, learnedIDs, objects, requestedAt, time.monotonic())
+        return None
+
+    def linkError(self, error):
+        """A stream request failed on the link: count it and give the request up, the stream carries on"""
+        if self.linkErrors == 0:
+            print(f"HuskyLens link error, retrying ({error})")
+        self.linkErrors += 1
+        self.response = None
+
+    def stream(self, rate=20.0, command=COMMAND_REQUEST, skipDuplicates=True, timeout=0.5, pollInterval=0.002,
+               batch=False):
+        """Keep requesting and yield a HuskyLensFrame for every new HuskyLens frame
+
+        rate           : requests per second (None or 0 = as fast as the HuskyLens answers)
+        skipDuplicates : drop answers whose frameNumber is the same as the last one yielded
+        timeout        : give up on a request after this many seconds and send a new one
+        batch          : objects as one NumPy structured array (OBJECT_DTYPE) instead of Block/Arrow tuples
+        Serial reads only take what is already waiting, so a slow answer never blocks on the port timeout.
+        Port/bus errors are counted in linkStats()["linkErrors"] and the next request waits at least timeout.
+        """
+        interval = 1.0 / rate if rate else 0.0
+        lastFrameNumber = None
+        while True:
+            requestedAt, wait = time.monotonic(), interval
+            try:
+                requestedAt = self.startRequest(command)
+                result = self.pollResponse(requestedAt, batch)
+                while result is None and time.monotonic() - requestedAt < timeout:
+                    time.sleep(pollInterval)
+                    result = self.pollResponse(requestedAt, batch)
+            except (HuskyLensProtocolError, OSError) as e:  # serial.SerialException is an OSError
+                self.linkError(e)
+                result, wait = None, max(interval, timeout)
+            if result is not None and not (skipDuplicates and result.frameNumber == lastFrameNumber):
+                lastFrameNumber = result.frameNumber
+                yield result
+            delay = requestedAt + wait - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+    async def astream(self, rate=20.0, command=COMMAND_REQUEST, skipDuplicates=True, timeout=0.5, pollInterval=0.002,
+                      batch=False):
+        """async for version of stream() (waits with asyncio.sleep so other tasks keep running)"""
+        interval = 1.0 / rate if rate else 0.0
+        lastFrameNumber = None
+        while True:
+            requestedAt, wait = time.monotonic(), interval
+            try:
+                requestedAt = self.startRequest(command)
+                result = self.pollResponse(requestedAt, batch)
+                while result is None and time.monotonic() - requestedAt < timeout:
+                    await asyncio.sleep(pollInterval)
+                    result = self.pollResponse(requestedAt, batch)
+            except (HuskyLensProtocolError, OSError) as e:
+                self.linkError(e)
+                result, wait = None, max(interval, timeout)
+            if result is not None and not (skipDuplicates and result.frameNumber == lastFrameNumber):
+                lastFrameNumber = result.frameNumber
+                yield result
+            await asyncio.sleep(max(0.0, requestedAt + wait - time.monotonic()))
+
     def knock(self):
-        cmd = self.cmdToBytes(commandHeaderAndAddress+"002c3c")
-        self.writeToHuskyLens(cmd)
+        self.writeToHuskyLens(COMMAND_FRAMES[COMMAND_REQUEST_KNOCK])
         return self.processReturnData()
     
     def learn(self,x):
-        data = "{:04x}".format(x)
-        part1=data[2:]
-        part2=data[0:2]
-        #reverse to correct endiness
-        data=part1+part2
-        dataLen = "{:02x}".format(len(data)//2)
-        cmd = commandHeaderAndAddress+dataLen+"36"+data
-        cmd += self.calculateChecksum(cmd)
-        cmd = self.cmdToBytes(cmd)
-        self.writeToHuskyLens(cmd)
+        self.writeToHuskyLens(buildCommand(COMMAND_REQUEST_LEARN, ID_STRUCT.pack(x)))
         return self.processReturnData()
 
     def forget(self):
-        cmd = self.cmdToBytes(commandHeaderAndAddress+"003747")
-        self.writeToHuskyLens(cmd)
+        self.writeToHuskyLens(COMMAND_FRAMES[COMMAND_REQUEST_FORGET])
         return self.processReturnData()
 
     def setCustomName(self,name,idV):
-        nameDataSize = "{:02x}".format(len(name)+1)
-        name = name.encode("utf-8").hex()+"00"
-        localId = "{:02x}".format(idV)
-        data = localId+nameDataSize+name
-        dataLen = "{:02x}".format(len(data)//2)
-        cmd = commandHeaderAndAddress+dataLen+"2f"+data
-        cmd += self.calculateChecksum(cmd)
-        cmd = self.cmdToBytes(cmd)
-        self.writeToHuskyLens(cmd)
+        name = name.encode("utf-8")+b"\x00"
+        self.writeToHuskyLens(buildCommand(COMMAND_REQUEST_CUSTOMNAMES, bytes((idV, len(name)))+name))
         return self.processReturnData()
 
     def customText(self,nameV,xV,yV):
-        name=nameV.encode("utf-8").hex()
-        nameDataSize = "{:02x}".format(len(name)//2)
-        if(xV>255):
-            x="ff"+"{:02x}".format(xV%255)
-        else:
-            x="00"+"{:02x}".format(xV)
-        y="{:02x}".format(yV)
-
-        data = nameDataSize+x+y+name
-        dataLen = "{:02x}".format(len(data)//2)
-
-        cmd = commandHeaderAndAddress+dataLen+"34"+data
-        cmd += self.calculateChecksum(cmd)
-        cmd = self.cmdToBytes(cmd)
-        self.writeToHuskyLens(cmd)
+        name=nameV.encode("utf-8")
+        # x is sent as a flag byte (0xff when past 255) and the remainder, the same way the Arduino library does
+        x=bytes((0xff, xV%255)) if xV>255 else bytes((0, xV))
+        self.writeToHuskyLens(buildCommand(COMMAND_REQUEST_CUSTOM_TEXT, bytes((len(name),))+x+bytes((yV,))+name))
         return self.processReturnData()
     
     def clearText(self):
-        cmd = self.cmdToBytes(commandHeaderAndAddress+"003545")
-        self.writeToHuskyLens(cmd)
+        self.writeToHuskyLens(COMMAND_FRAMES[COMMAND_REQUEST_CLEAR_TEXT])
         return self.processReturnData()
 
-    def requestAll(self):
-        cmd = self.cmdToBytes(commandHeaderAndAddress+"002030")
-        self.writeToHuskyLens(cmd)
-        return self.processReturnData()
+    def requestAll(self, batch=False):
+        self.writeToHuskyLens(COMMAND_FRAMES[COMMAND_REQUEST])
+        return self.processReturnData(batch=batch)
     
     def saveModelToSDCard(self,idVal):
-        idVal = "{:04x}".format(idVal)
-        idVal = idVal[2:]+idVal[0:2]
-        cmd = commandHeaderAndAddress+"0232"+idVal
-        cmd += self.calculateChecksum(cmd)
-        cmd = self.cmdToBytes(cmd)
-        self.writeToHuskyLens(cmd)
+        self.writeToHuskyLens(buildCommand(COMMAND_REQUEST_SEND_KNOWLEDGES, ID_STRUCT.pack(idVal)))
         return self.processReturnData()
 
     def loadModelFromSDCard(self,idVal):
-        idVal = "{:04x}".format(idVal)
-        idVal = idVal[2:]+idVal[0:2]
-        cmd = commandHeaderAndAddress+"0233"+idVal
-        cmd += self.calculateChecksum(cmd)
-        cmd = self.cmdToBytes(cmd)
-        self.writeToHuskyLens(cmd)
+        self.writeToHuskyLens(buildCommand(COMMAND_REQUEST_RECEIVE_KNOWLEDGES, ID_STRUCT.pack(idVal)))
         return self.processReturnData()
 
     def savePictureToSDCard(self):
         self.huskylensSer.timeout=5
-        cmd = self.cmdToBytes(commandHeaderAndAddress+"003040")
-        self.writeToHuskyLens(cmd)
+        self.writeToHuskyLens(COMMAND_FRAMES[COMMAND_REQUEST_PHOTO])
         return self.processReturnData()
     
     def saveScreenshotToSDCard(self):
-        cmd = self.cmdToBytes(commandHeaderAndAddress+"003949")
-        self.writeToHuskyLens(cmd)
+        self.writeToHuskyLens(COMMAND_FRAMES[COMMAND_REQUEST_SCREENSHOT])
         return self.processReturnData()
 
     def blocks(self):
-        cmd = self.cmdToBytes(commandHeaderAndAddress+"002131")
-        self.writeToHuskyLens(cmd)
+        self.writeToHuskyLens(COMMAND_FRAMES[COMMAND_REQUEST_BLOCKS])
         return self.processReturnData()[0]
 
     def arrows(self):
-        cmd = self.cmdToBytes(commandHeaderAndAddress+"002232")
-        self.writeToHuskyLens(cmd)
+        self.writeToHuskyLens(COMMAND_FRAMES[COMMAND_REQUEST_ARROWS])
         return self.processReturnData()[0]
 
     def learned(self):
-        cmd = self.cmdToBytes(commandHeaderAndAddress+"002333")
-        self.writeToHuskyLens(cmd)
+        self.writeToHuskyLens(COMMAND_FRAMES[COMMAND_REQUEST_LEARNED])
         return self.processReturnData()[0]
 
     def learnedBlocks(self):
-        cmd = self.cmdToBytes(commandHeaderAndAddress+"002434")
-        self.writeToHuskyLens(cmd)
+        self.writeToHuskyLens(COMMAND_FRAMES[COMMAND_REQUEST_BLOCKS_LEARNED])
         return self.processReturnData()[0]
 
     def learnedArrows(self):
-        cmd = self.cmdToBytes(commandHeaderAndAddress+"002535")
-        self.writeToHuskyLens(cmd)
+        self.writeToHuskyLens(COMMAND_FRAMES[COMMAND_REQUEST_ARROWS_LEARNED])
         return self.processReturnData()[0]
 
     def getObjectByID(self, idVal):
-        idVal = "{:04x}".format(idVal)
-        idVal = idVal[2:]+idVal[0:2]
-        cmd = commandHeaderAndAddress+"0226"+idVal
-        cmd += self.calculateChecksum(cmd)
-        cmd = self.cmdToBytes(cmd)
-        self.writeToHuskyLens(cmd)
+        self.writeToHuskyLens(buildCommand(COMMAND_REQUEST_BY_ID, ID_STRUCT.pack(idVal)))
         return self.processReturnData()[0]
 
     def getBlocksByID(self, idVal):
-        idVal = "{:04x}".format(idVal)
-        idVal = idVal[2:]+idVal[0:2]
-        cmd = commandHeaderAndAddress+"0227"+idVal
-        cmd += self.calculateChecksum(cmd)
-        cmd = self.cmdToBytes(cmd)
-        self.writeToHuskyLens(cmd)
+        self.writeToHuskyLens(buildCommand(COMMAND_REQUEST_BLOCKS_BY_ID, ID_STRUCT.pack(idVal)))
         return self.processReturnData()[0]
 
     def getArrowsByID(self, idVal):
-        idVal = "{:04x}".format(idVal)
-        idVal = idVal[2:]+idVal[0:2]
-        cmd = commandHeaderAndAddress+"0228"+idVal
-        cmd += self.calculateChecksum(cmd)
-        cmd = self.cmdToBytes(cmd)
-        self.writeToHuskyLens(cmd)
+        self.writeToHuskyLens(buildCommand(COMMAND_REQUEST_ARROWS_BY_ID, ID_STRUCT.pack(idVal)))
         return self.processReturnData()[0]
 
     def algorthim(self, alg):
         if alg in algorthimsByteID:
-            cmd = commandHeaderAndAddress+"022d"+algorthimsByteID[alg]
-            cmd += self.calculateChecksum(cmd)
-            cmd = self.cmdToBytes(cmd)
-            self.writeToHuskyLens(cmd)
+            self.writeToHuskyLens(buildCommand(COMMAND_REQUEST_ALGORITHM, bytes.fromhex(algorthimsByteID[alg])))
             return self.processReturnData()
         else:
             print("INCORRECT ALGORITHIM NAME")
 
     def count(self):
-        cmd = self.cmdToBytes(commandHeaderAndAddress+"002030")
-        self.writeToHuskyLens(cmd)
+        self.writeToHuskyLens(COMMAND_FRAMES[COMMAND_REQUEST])
         return len(self.processReturnData())
     
     def learnedObjCount(self):
-        cmd = self.cmdToBytes(commandHeaderAndAddress+"002030")
-        self.writeToHuskyLens(cmd)
+        self.writeToHuskyLens(COMMAND_FRAMES[COMMAND_REQUEST])
         return self.processReturnData(numIdLearnFlag=True)[-1]
     
     def frameNumber(self):
-        cmd = self.cmdToBytes(commandHeaderAndAddress+"002030")
-        self.writeToHuskyLens(cmd)
+        self.writeToHuskyLens(COMMAND_FRAMES[COMMAND_REQUEST])
         return self.processReturnData(frameFlag=True)[-1]
 
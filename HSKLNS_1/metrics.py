@@ -0,0 +1,198 @@
+#도어 유닛 계측 (단계별 소요 시간 + 카운터)
+# 단계마다 최근 window 개의 소요 시간을 보관하는 롤링 히스토그램과 누적 횟수/합계를 기록
+# 보는 방법은 두 가지
+#   serve(port)            : http://127.0.0.1:port/metrics 에 Prometheus 텍스트 형식으로 노출
+#   start_json_lines(path) : interval 초마다 스냅샷 한 줄(JSON)을 파일 끝에 추가
+# enabled=False 이면 timer() 가 아무것도 하지 않는 공용 객체를 돌려주므로 부담이 거의 없음
+#
+# 사용 예)
+#   metrics = Metrics()
+#   with metrics.timer("detect"):
+#       boxes = face_locations(image)
+#   metrics.inc("auth_success")
+#   metrics.serve(9108)
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+DEFAULT_METRICS_PORT = 9108
+QUANTILES = (0.5, 0.9, 0.99)
+PREFIX = "door"
+
+
+#최근 window 개 표본의 분위수 + 전체 누적 횟수/합계
+class RollingHistogram:
+    def __init__(self, window: int = 512):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self.lock:
+            self.samples.append(value)
+            self.count += 1
+            self.total += value
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            samples = sorted(self.samples)
+            count, total = self.count, self.total
+        result = {"count": count, "sum": total}
+        for quantile in QUANTILES:
+            result[f"p{int(quantile * 100)}"] = samples[min(len(samples) - 1, int(quantile * len(samples)))] if samples else None
+        result["max"] = samples[-1] if samples else None
+        return result
+
+
+class _Timer:
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram: RollingHistogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started)
+
+
+#계측을 끈 경우의 timer (아무 일도 하지 않음)
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    def __init__(self, enabled: bool = True, window: int = 512):
+        self.enabled = enabled
+        self.window = window
+        self.histograms: Dict[str, RollingHistogram] = {}
+        self.counters: Dict[str, int] = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._server = None
+        self._writer = None
+        self._stop = threading.Event()
+
+    def _histogram(self, stage: str) -> RollingHistogram:
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(stage, RollingHistogram(self.window))
+        return histogram
+
+    def timer(self, stage: str):
+        """with metrics.timer("detect"): ... 구간의 소요 시간 기록"""
+        if not self.enabled:
+            return NULL_TIMER
+        return _Timer(self._histogram(stage))
+
+    def observe(self, stage: str, seconds: float) -> None:
+        if self.enabled:
+            self._histogram(stage).observe(seconds)
+
+    def inc(self, counter: str, value: int = 1) -> None:
+        if self.enabled:
+            with self._lock:
+                self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+            histograms = dict(self.histograms)
+        return {"time": time.time(), "uptime": time.time() - self.started, "counters": counters,
+                "stages": {stage: histogram.snapshot() for stage, histogram in histograms.items()}}
+
+    def prometheus_text(self) -> str:
+        snapshot = self.snapshot()
+        lines = [f"# TYPE {PREFIX}_stage_seconds summary"]
+        for stage, values in sorted(snapshot["stages"].items()):
+            for quantile in QUANTILES:
+                value = values[f"p{int(quantile * 100)}"]
+                if value is not None:
+                    lines.append(f'{PREFIX}_stage_seconds{{stage="{stage}",quantile="{quantile}"}} {value:.6f}')
+            lines.append(f'{PREFIX}_stage_seconds_sum{{stage="{stage}"}} {values["sum"]:.6f}')
+            lines.append(f'{PREFIX}_stage_seconds_count{{stage="{stage}"}} {values["count"]}')
+        lines.append(f"# TYPE {PREFIX}_events_total counter")
+        for counter, value in sorted(snapshot["counters"].items()):
+            lines.append(f'{PREFIX}_events_total{{event="{counter}"}} {value}')
+        lines.append(f"# TYPE {PREFIX}_uptime_seconds gauge")
+        lines.append(f"{PREFIX}_uptime_seconds {snapshot['uptime']:.1f}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int = DEFAULT_METRICS_PORT, host: str = "127.0.0.1") -> int:
+        """백그라운드 스레드로 /metrics 제공, 실제 포트 반환 (port=0 이면 빈 포트)"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # 요청마다 로그를 남기지 않음
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="MetricsServer", daemon=True).start()
+        return self._server.server_address[1]
+
+    def write_json_line(self, path) -> None:
+        with open(path, "a", encoding="utf-8") as log_file:
+            log_file.write(json.dumps(self.snapshot(), ensure_ascii=False) + "\n")
+
+    def start_json_lines(self, path, interval: float = 10.0) -> None:
+        """interval 초마다 스냅샷을 path 에 한 줄씩 추가"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        def run():
+            while not self._stop.wait(interval):
+                self.write_json_line(path)
+            self.write_json_line(path)  # 종료 직전 마지막 값
+
+        self._writer = threading.Thread(target=run, name="MetricsWriter", daemon=True)
+        self._writer.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._writer is not None:
+            self._writer.join(timeout=5.0)
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+#설정값에 따라 Metrics 생성 (port/log_path 가 모두 없으면 꺼진 상태)
+def configure(port: Optional[int] = None, log_path: Optional[str] = None, interval: float = 10.0) -> Metrics:
+    metrics = Metrics(enabled=port is not None or log_path is not None)
+    if port is not None:
+        port = metrics.serve(port)
+        print(f"[INFO] 계측 값 제공: http://127.0.0.1:{port}/metrics")
+    if log_path is not None:
+        metrics.start_json_lines(log_path, interval=interval)
+        print(f"[INFO] 계측 값 기록: {log_path} ({interval:g}초마다)")
+    return metrics
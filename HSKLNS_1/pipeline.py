@@ -0,0 +1,252 @@
+#단계별 파이프라인 (캡처 -> 검출 -> 인코딩/매칭 -> 동작)
+# 단계마다 별도 스레드(workers 개)가 돌고 단계 사이에는 크기가 정해진 큐를 둠
+# 뒤 단계가 밀리면 policy 에 따라 프레임을 버림
+#   drop_oldest : 큐가 차면 가장 오래된 프레임을 버리고 새 프레임을 넣음 (항상 최신 프레임 처리, 기본값)
+#   drop_newest : 큐가 차면 들어오려는 프레임을 버림
+#   block       : 자리가 날 때까지 앞 단계가 기다림 (버리는 프레임 없음, 지연은 늘어남)
+#
+# 사용 예)
+#   stages = [Stage("detect", detect, workers=2), Stage("identify", identify, ordered=True), Stage("actuate", actuate)]
+#   pipeline = Pipeline(grabber, stages, queue_size=2).start()
+#   print(pipeline.report())    # 단계별 큐 깊이/버린 수, 처리 시간, 전체 지연 p50/p90/p99
+#   pipeline.stop()
+#
+# 단계 함수는 앞 단계의 결과를 받아 다음 단계로 넘길 값을 반환 (None 이면 그 프레임은 거기서 끝)
+# 첫 단계는 camera.Frame 을 받음
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, List, Optional, Sequence
+
+import numpy as np
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+BLOCK = "block"
+POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+
+#파이프라인을 흐르는 프레임 하나
+class Job:
+    __slots__ = ("index", "timestamp", "value")
+
+    def __init__(self, index: int, timestamp: float, value: Any):
+        self.index = index          # 프레임 번호
+        self.timestamp = timestamp  # 캡처 시각 (time.monotonic())
+        self.value = value          # 앞 단계의 결과
+
+
+#단계 앞의 크기 제한 큐
+class StageQueue:
+    def __init__(self, maxsize: int, policy: str = DROP_OLDEST):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown drop policy: {policy}")
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.policy = policy
+        self.dropped = 0
+        self.max_depth = 0
+        self.lock = threading.Lock()  # 넣는 쪽끼리 (가득 참 확인 -> 버림 -> 넣기) 가 섞이지 않도록
+
+    def put(self, job: Job, stopped: threading.Event) -> List[Job]:
+        """job 을 넣고, 대신 버려진 Job 목록을 반환 (버린 것이 없으면 빈 목록)"""
+        dropped = []
+        if self.policy == BLOCK:
+            while not stopped.is_set():
+                try:
+                    self.queue.put(job, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            else:
+                dropped.append(job)
+            with self.lock:
+                self.dropped += len(dropped)
+                self.max_depth = max(self.max_depth, self.queue.qsize())
+            return dropped
+        with self.lock:
+            if self.policy == DROP_NEWEST:
+                try:
+                    self.queue.put_nowait(job)
+                except queue.Full:
+                    dropped.append(job)
+            else:
+                # 꺼내는 쪽은 자리를 만들기만 하므로 잠금 안에서는 버린 만큼 반드시 들어감
+                while True:
+                    try:
+                        self.queue.put_nowait(job)
+                        break
+                    except queue.Full:
+                        try:
+                            dropped.append(self.queue.get_nowait())
+                        except queue.Empty:
+                            pass
+            self.dropped += len(dropped)
+            self.max_depth = max(self.max_depth, self.queue.qsize())
+        return dropped
+
+    def get(self, timeout: float = 0.1) -> Optional[Job]:
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def depth(self) -> int:
+        return self.queue.qsize()
+
+
+#파이프라인 단계 (ordered=True 이면 이미 처리한 것보다 오래된 프레임은 버림)
+class Stage:
+    def __init__(self, name: str, func: Callable[[Any], Any], workers: int = 1, ordered: bool = False):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.ordered = ordered
+        self.processed = 0
+        self.stale = 0          # 순서가 뒤집혀 도착해서 버린 프레임 (ordered 단계)
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.last_index = -1
+        self.lock = threading.Lock()
+
+    def _admit(self, job: Job) -> bool:
+        if not self.ordered:
+            return True
+        with self.lock:
+            if job.index <= self.last_index:
+                self.stale += 1
+                return False
+            self.last_index = job.index
+            return True
+
+
+class Pipeline:
+    def __init__(self, grabber, stages: Sequence[Stage], queue_size: int = 2, policy: str = DROP_OLDEST,
+                 latency_window: int = 1000):
+        self.grabber = grabber  # camera.FrameGrabber
+        self.stages = list(stages)
+        self.queues = [StageQueue(queue_size, policy) for _ in self.stages]
+        self.latencies = deque(maxlen=latency_window)  # 캡처부터 마지막 단계 완료까지 (초)
+        self.captured = 0
+        self.completed = 0
+        self.results: deque = deque(maxlen=latency_window)  # 마지막 단계의 (프레임 번호, 결과)
+        self._stopped = threading.Event()
+        self._source_done = threading.Event()
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> "Pipeline":
+        self._threads.append(threading.Thread(target=self._capture, name="Pipeline-capture", daemon=True))
+        for position, stage in enumerate(self.stages):
+            for worker in range(stage.workers):
+                self._threads.append(threading.Thread(target=self._work, args=(position,),
+                                                      name=f"Pipeline-{stage.name}-{worker}", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def _finish(self, count: int = 1) -> None:
+        with self._condition:
+            self._in_flight -= count
+            self._condition.notify_all()
+
+    def _push(self, position: int, job: Job) -> None:
+        dropped = self.queues[position].put(job, self._stopped)
+        if dropped:
+            self._finish(len(dropped))
+
+    def _capture(self):
+        last_index = -1
+        while not self._stopped.is_set():
+            frame = self.grabber.wait_for_frame(after_index=last_index, timeout=0.5)
+            if frame is None:
+                if self.grabber.finished:
+                    break
+                continue
+            last_index = frame.index
+            self.captured += 1
+            with self._condition:
+                self._in_flight += 1
+            self._push(0, Job(frame.index, frame.timestamp, frame))
+        self._source_done.set()
+        with self._condition:
+            self._condition.notify_all()
+
+    def _work(self, position: int):
+        stage, inbox = self.stages[position], self.queues[position]
+        last = position == len(self.stages) - 1
+        while not self._stopped.is_set():
+            job = inbox.get()
+            if job is None:
+                continue
+            if not stage._admit(job):
+                self._finish()
+                continue
+            started = time.perf_counter()
+            try:
+                result = stage.func(job.value)
+            except Exception as e:
+                result = None
+                with stage.lock:
+                    stage.errors += 1
+                print(f"[ERROR] 파이프라인 단계 {stage.name} 오류: {e}")
+            with stage.lock:
+                stage.processed += 1
+                stage.busy_seconds += time.perf_counter() - started
+            if last:
+                self.latencies.append(time.monotonic() - job.timestamp)
+                self.results.append((job.index, result))
+                self.completed += 1
+                self._finish()
+            elif result is None:
+                self._finish()
+            else:
+                job.value = result
+                self._push(position + 1, job)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """공급원이 끝나고 남은 프레임을 다 처리하면 True (카메라는 끝나지 않으므로 시간 초과 시 False)"""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._source_done.is_set() and self._in_flight <= 0, timeout)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+
+    def latency_percentiles(self, percentiles=(50, 90, 99)) -> dict:
+        """전체 지연 백분위 (ms)"""
+        latencies = list(self.latencies)
+        if not latencies:
+            return {f"p{p}": None for p in percentiles}
+        values = np.percentile(np.asarray(latencies) * 1000.0, percentiles)
+        return {f"p{p}": round(float(value), 1) for p, value in zip(percentiles, values)}
+
+    def stats(self) -> dict:
+        stages = {}
+        for stage, inbox in zip(self.stages, self.queues):
+            stages[stage.name] = {
+                "depth": inbox.depth(), "max_depth": inbox.max_depth, "dropped": inbox.dropped,
+                "stale": stage.stale, "processed": stage.processed, "errors": stage.errors,
+                "mean_ms": round(1000.0 * stage.busy_seconds / stage.processed, 1) if stage.processed else None,
+            }
+        return {"captured": self.captured, "completed": self.completed,
+                "latency_ms": self.latency_percentiles(), "stages": stages}
+
+    def report(self) -> str:
+        stats = self.stats()
+        latency = stats["latency_ms"]
+        parts = [f"captured={stats['captured']} completed={stats['completed']} "
+                 f"latency p50/p90/p99={latency['p50']}/{latency['p90']}/{latency['p99']} ms"]
+        for name, stage in stats["stages"].items():
+            parts.append(f"{name}: depth={stage['depth']} (max {stage['max_depth']}) dropped={stage['dropped']} "
+                         f"stale={stage['stale']} mean={stage['mean_ms']} ms")
+        return " | ".join(parts)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,91 @@
+#얼굴 인식 전 단계 필터 (사람이 없을 때 HOG 검출/128차원 인코딩을 돌리지 않기 위함)
+#
+# 1단계 (움직임): 프레임을 작은 흑백 이미지로 줄여 배경(천천히 갱신되는 평균)과 비교
+#                 바뀐 화소 비율이 motion_fraction 미만이면 탈락
+#                 움직임이 있었던 뒤 hold_seconds 동안은 가만히 서 있어도 통과
+# 2단계 (얼굴 존재): 축소한 흑백 이미지에서 Haar cascade 로 얼굴이 있는지만 빠르게 확인
+# 두 단계를 모두 통과한 프레임만 전체 얼굴 인식으로 넘김
+#
+# 사용 예)
+#   gate = PresenceGate()
+#   if gate.check(frame.bgr):
+#       ... 전체 인식 ...
+#   print(gate.stats())
+
+import time
+from typing import Callable, List, Optional
+
+import cv2
+import numpy as np
+
+
+#OpenCV 에 포함된 정면 얼굴 Haar cascade 로 얼굴 위치 (x, y, w, h) 목록 반환
+def haar_face_detector(min_size: int = 24) -> Callable[[np.ndarray], list]:
+    cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+    if cascade.empty():
+        raise RuntimeError("haarcascade_frontalface_default.xml could not be loaded")
+
+    def detect(gray):
+        return list(cascade.detectMultiScale(gray, scaleFactor=1.2, minNeighbors=4, minSize=(min_size, min_size)))
+    return detect
+
+
+class PresenceGate:
+    def __init__(self, motion_size=(80, 60), pixel_threshold: int = 25, motion_fraction: float = 0.01,
+                 background_rate: float = 0.05, hold_seconds: float = 3.0, presence_width: int = 320,
+                 presence_detector: Optional[Callable[[np.ndarray], list]] = None):
+        self.motion_size = motion_size                # 1단계 비교 해상도 (가로, 세로)
+        self.pixel_threshold = pixel_threshold        # 배경과 이만큼 넘게 다르면 바뀐 화소
+        self.motion_fraction = motion_fraction        # 바뀐 화소 비율이 이 값 이상이면 움직임
+        self.background_rate = background_rate        # 배경 갱신 비율 (클수록 빨리 배경에 흡수)
+        self.hold_seconds = hold_seconds              # 움직임 이후 1단계를 계속 통과시키는 시간
+        self.presence_width = presence_width          # 2단계 검출 해상도 (가로)
+        self.presence_detector = presence_detector or haar_face_detector()
+        self.background = None
+        self.last_motion = float("-inf")
+        self.last_boxes: List[tuple] = []             # 2단계에서 찾은 얼굴 (원본 좌표 x, y, w, h)
+        self.frames = 0
+        self.rejected_motion = 0
+        self.rejected_presence = 0
+        self.passed = 0
+
+    def motion_detected(self, frame_bgr, now: Optional[float] = None) -> bool:
+        """1단계: 저해상도 밝기 변화 확인"""
+        now = time.monotonic() if now is None else now
+        small = cv2.resize(cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY), self.motion_size, interpolation=cv2.INTER_AREA)
+        small = small.astype(np.float32)
+        if self.background is None:
+            self.background = small
+            self.last_motion = now  # 시작 직후 한 번은 확인
+            return True
+        changed = np.count_nonzero(np.abs(small - self.background) > self.pixel_threshold) / small.size
+        cv2.accumulateWeighted(small, self.background, self.background_rate)
+        if changed >= self.motion_fraction:
+            self.last_motion = now
+        return now - self.last_motion <= self.hold_seconds
+
+    def face_present(self, frame_bgr) -> bool:
+        """2단계: 축소 이미지에서 얼굴이 하나라도 있는지 확인"""
+        height, width = frame_bgr.shape[:2]
+        factor = min(1.0, self.presence_width / width)
+        gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
+        if factor < 1.0:
+            gray = cv2.resize(gray, (self.presence_width, max(1, round(height * factor))), interpolation=cv2.INTER_AREA)
+        self.last_boxes = [tuple(int(round(value / factor)) for value in box) for box in self.presence_detector(gray)]
+        return bool(self.last_boxes)
+
+    def check(self, frame_bgr, now: Optional[float] = None) -> bool:
+        """두 단계를 모두 통과하면 True (전체 인식을 실행할 프레임)"""
+        self.frames += 1
+        if not self.motion_detected(frame_bgr, now):
+            self.rejected_motion += 1
+            return False
+        if not self.face_present(frame_bgr):
+            self.rejected_presence += 1
+            return False
+        self.passed += 1
+        return True
+
+    def stats(self) -> dict:
+        return {"frames": self.frames, "rejected_motion": self.rejected_motion,
+                "rejected_presence": self.rejected_presence, "passed": self.passed}
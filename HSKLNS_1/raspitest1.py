@@ -6,41 +6,61 @@ import os
 import time
 import sys
 import cv2  # OpenCV for webcam integration
-import pickle  # for encoding models
 import numpy as np  # for image array processing
-import RPi.GPIO as GPIO
-from collections import Counter
 from PIL import Image
 from huskylib import HuskyLensLibrary
-from face_recognition import face_locations, face_encodings, compare_faces
+from door import DoorController, RPiServoBackend
+from metrics import Metrics, configure as configure_metrics
+from face_recognition import face_locations, face_encodings
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "AI"))
+from hot_gallery import HotGallery  # noqa: E402  (AI/hot_gallery.py)
 
 # 전역 변수
 husky = None  # HuskyLens 객체
+HUSKY_RATE = 10  # HuskyLens 에 초당 요청하는 횟수 (같은 프레임 번호의 응답은 건너뜀)
 HOME_DIR = os.path.expanduser("~")  # 사용자 홈 디렉토리 경로
 SCREENSHOT_DIR = os.path.join(HOME_DIR, "HNUCE", "screenshot")  # 스크린샷 저장 경로
 SERVO_PIN = 17  # 서보 모터 GPIO 핀 번호
 WEBCAM_SAVE_PATH = os.path.join(SCREENSHOT_DIR, "webcam_snapshot.jpg")  # 웹캠 캡처 이미지 저장 경로
-ENCODINGS_PATH = os.path.join(HOME_DIR, "output", "encodings.pkl")  # 얼굴 인코딩 데이터 경로
+ENCODINGS_PATH = os.path.join(HOME_DIR, "output", "encodings.fenc")  # 얼굴 인코딩 저장소 경로 (없으면 encodings.pkl 에서 변환)
+gallery = None  # 메모리에 올려둔 학습 데이터 (파일이 교체되면 자동으로 다시 읽음)
+DOOR_OPEN_SECONDS = 5  # 마지막 인증 이후 문을 열어두는 시간 (열린 동안 다시 인증되면 연장)
+door = None  # 서보를 별도 스레드에서 움직이는 DoorController (setup()에서 시작)
+METRICS_PORT = None  # 예: 9108 -> http://127.0.0.1:9108/metrics 에서 단계별 소요 시간 확인
+METRICS_LOG = None  # 예: os.path.join(HOME_DIR, "HNUCE", "metrics.jsonl") -> 10초마다 JSON 한 줄씩 기록
+metrics = Metrics(enabled=False)  # 위 두 값 중 하나라도 설정하면 setup()에서 켜짐
 
 
 # 오류 메시지 출력 후 종료 함수
 def fail_exit(message):
     """오류 메시지를 출력하고 프로그램 종료"""
     print(f"[ERROR] {message}")
-    GPIO.cleanup()
+    metrics.inc("fatal_errors")
+    if door is not None:
+        door.stop()
+    metrics.close()  # 마지막 계측 값 기록
     sys.exit(1)
 
 
 # 초기 설정 함수
-def setup():
-    global husky
+def setup(servo_backend=None):
+    """servo_backend 로 MockServoBackend 를 넘기면 서보 없이 실행"""
+    global husky, gallery, door, metrics
     print("초기 설정 중...")
+    metrics = configure_metrics(port=METRICS_PORT, log_path=METRICS_LOG)
 
     # 스크린샷 저장 폴더 생성
     if not os.path.exists(SCREENSHOT_DIR):
         os.makedirs(SCREENSHOT_DIR)
         print(f"[INFO] 스크린샷 저장 디렉토리 생성 완료: {SCREENSHOT_DIR}")
 
+    # 학습 데이터는 한 번만 읽어두고, 파일이 교체되면 백그라운드에서 다시 읽어 바꿔 끼움
+    try:
+        gallery = HotGallery(ENCODINGS_PATH).start()
+    except Exception as e:
+        fail_exit(f"얼굴 인코딩 데이터를 불러올 수 없습니다: {e}")
+
     # HuskyLens Serial 연결
     print("[INFO] HuskyLens Serial 연결 중...")
     husky = HuskyLensLibrary("SERIAL", comPort="/dev/ttyS0", speed=9600)
@@ -49,25 +69,13 @@ def setup():
     else:
         fail_exit("HuskyLens 연결 실패: Serial 설정 확인 필요.")
 
-    # GPIO 초기화 및 서보 모터 설정
+    # GPIO 초기화 및 서보 모터 설정 (문 열기/닫기는 별도 스레드에서 처리)
     print("[INFO] GPIO 및 서보 설정 중...")
-    GPIO.setmode(GPIO.BCM)
-    GPIO.setup(SERVO_PIN, GPIO.OUT)
-    global servo
-    servo = GPIO.PWM(SERVO_PIN, 50)  # 50Hz PWM 동작
-    servo.start(0)
+    backend = servo_backend if servo_backend is not None else RPiServoBackend(SERVO_PIN)
+    door = DoorController(backend, open_angle=90, closed_angle=0, open_seconds=DOOR_OPEN_SECONDS).start()
     print("[INFO] 초기 설정 완료.")
 
 
-# 서보 모터를 특정 각도로 회전시키는 함수
-def rotate_servo(angle):
-    """서보 모터 회전"""
-    duty_cycle = angle / 18.0 + 2
-    servo.ChangeDutyCycle(duty_cycle)
-    time.sleep(0.5)
-    servo.ChangeDutyCycle(0)
-
-
 # HuskyLens 학습된 얼굴 감지
 def detect_face(data):
     """HuskyLens의 감지 데이터를 분석하여 학습된 얼굴 확인"""
@@ -87,18 +95,19 @@ def detect_face(data):
 def capture_webcam_image(output_path=WEBCAM_SAVE_PATH):
     """USB 웹캠에서 실시간 이미지 캡처"""
     print("[INFO] USB 웹캠으로 이미지 캡처 시도 중...")
-    cam = cv2.VideoCapture(0)
-    if not cam.isOpened():
-        fail_exit("웹캠에 접근할 수 없습니다. 연결을 확인하세요.")
-
-    ret, frame = cam.read()
-    if ret:
-        cv2.imwrite(output_path, frame)
-        print(f"[INFO] USB 웹캠 이미지 캡처 완료: {output_path}")
-    else:
-        fail_exit("웹캠에서 이미지를 캡처하는 데 실패했습니다.")
-
-    cam.release()
+    with metrics.timer("capture"):
+        cam = cv2.VideoCapture(0)
+        if not cam.isOpened():
+            fail_exit("웹캠에 접근할 수 없습니다. 연결을 확인하세요.")
+
+        ret, frame = cam.read()
+        if ret:
+            cv2.imwrite(output_path, frame)
+            print(f"[INFO] USB 웹캠 이미지 캡처 완료: {output_path}")
+        else:
+            fail_exit("웹캠에서 이미지를 캡처하는 데 실패했습니다.")
+
+        cam.release()
     return output_path
 
 
@@ -106,28 +115,25 @@ def capture_webcam_image(output_path=WEBCAM_SAVE_PATH):
 def recognize_faces_with_result(image_location, model="hog"):
     """웹캠에서 캡처한 이미지를 사용하여 얼굴을 인식"""
     try:
-        with open(ENCODINGS_PATH, "rb") as f:
-            loaded_encodings = pickle.load(f)
+        matcher = gallery.matcher  # 프레임마다 파일을 읽지 않음
 
-        image = np.array(Image.open(image_location).convert("RGB"))
-        face_locations_list = face_locations(image, model=model)
-        face_encodings_list = face_encodings(image, face_locations_list)
+        with metrics.timer("decode"):
+            image = np.array(Image.open(image_location).convert("RGB"))
+        with metrics.timer("detect"):
+            face_locations_list = face_locations(image, model=model)
+        with metrics.timer("encode"):
+            face_encodings_list = face_encodings(image, face_locations_list[:1])
 
         if not face_locations_list:
             print("[DEBUG] 얼굴이 감지되지 않았습니다.")
             return None
 
-        for face_encoding in face_encodings_list:
-            matches = compare_faces(loaded_encodings["encodings"], face_encoding)
-            name_votes = Counter(
-                name for match, name in zip(matches, loaded_encodings["names"]) if match
-            )
-            if name_votes:
-                recognized_name = name_votes.most_common(1)[0][0]
-                return recognized_name
-            else:
-                return "Unknown"
+        # 첫 번째 얼굴의 결과만 사용 (기존 동작과 동일)
+        with metrics.timer("match"):
+            recognized_name = matcher.identify(face_encodings_list)[0]
+        return recognized_name if recognized_name else "Unknown"
     except Exception as e:
+        metrics.inc("recognition_errors")
         print(f"[ERROR] 얼굴 인식 중 오류 발생: {e}")
         return "Unknown"
 
@@ -140,15 +146,16 @@ def secondary_face_verification_with_webcam():
 
     result = recognize_faces_with_result(image_location=image_path)  # 얼굴 인식
     if result == "Unknown" or result is None:
+        metrics.inc("auth_failure")
         print("[ERROR] 2차 인증 실패: 얼굴이 인식되지 않거나 권한이 없는 사용자입니다.")
         return False  # 인증 실패
 
+    metrics.inc("auth_success")
     print(f"[INFO] 2차 인증 성공: 얼굴 인증 완료! (사용자: {result})")
 
-    # 서보 모터 회전
-    rotate_servo(90)  # 문 열기 상태 (90도 회전)
-    time.sleep(5)  # 5초간 문 열기 상태 유지
-    rotate_servo(0)  # 문 닫기 상태 (0도 회전)
+    # 문 열기 (기다리지 않음, 이미 열려 있으면 열림 시간 연장)
+    with metrics.timer("actuate"):
+        door.request_open()
 
     return True  # 인증 성공
 
@@ -157,17 +164,21 @@ def secondary_face_verification_with_webcam():
 def loop():
     print("[INFO] 메인 루프 실행 중...")
     try:
-        while True:
-            # HuskyLens에서 얼굴 데이터 요청
-            print("[DEBUG] HuskyLens 데이터 요청 중...")
-            husky_data = husky.requestAll()
+        # HuskyLens 에 계속 요청하고 새 프레임이 들어올 때마다 바로 처리
+        for husky_frame in husky.stream(rate=HUSKY_RATE):
+            metrics.observe("husky", husky_frame.receivedAt - husky_frame.requestedAt)
+            husky_data = husky_frame.objects
 
             # 1차 인증 (HuskyLens 학습된 얼굴 감지)
             if detect_face(husky_data):
                 print("[INFO] 1차 인증: 학습된 얼굴 확인됨.")
+                metrics.inc("husky_detected")
 
                 # 2차 인증 단계: USB 웹캠 얼굴 인식
-                if not secondary_face_verification_with_webcam():
+                started = time.monotonic()
+                verified = secondary_face_verification_with_webcam()
+                metrics.observe("end_to_end", time.monotonic() - started)  # 1차 인증 이후 판단까지
+                if not verified:
                     print("[INFO] 2차 인증 실패: 1차 인증 단계로 복귀.")
                     continue  # 실패 시 1차 인증 루프 복귀
 
@@ -175,12 +186,11 @@ def loop():
                 # 성공 이후 루프는 계속 실행
             else:
                 print("[INFO] 학습된 얼굴 없음 - 대기 중...")
-
-            time.sleep(0.5)  # 각 검증 루프 간 짧은 대기
     except KeyboardInterrupt:
         # 사용자 인터럽트 시 프로그램 안전 종료
         print("[INFO] 프로그램 종료 중...")
-        GPIO.cleanup()
+        door.stop()  # 열려 있으면 닫고 GPIO 정리
+        metrics.close()
         sys.exit(0)
 
 
@@ -1,127 +1,327 @@
+import argparse
 import os
 import time
 import sys
+import threading
 import cv2  # OpenCV for webcam integration
-import pickle  # for encoding models
 import numpy as np  # for image array processing
-import RPi.GPIO as GPIO
-from collections import Counter
 from PIL import Image
-from face_recognition import face_locations, face_encodings, compare_faces
+from camera import CameraSource, FrameGrabber, VideoFileSource
+from presence_gate import PresenceGate
+from door import DoorController, MockServoBackend, RPiServoBackend
+from pipeline import DROP_OLDEST, POLICIES, Pipeline, Stage
+from tracker import FaceTracker
+from metrics import Metrics, configure as configure_metrics
+from adaptive import AdaptiveResolution
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "AI"))
+from hot_gallery import HotGallery  # noqa: E402  (AI/hot_gallery.py)
+from client import RecognitionClient, RecognitionServerError  # noqa: E402  (AI/client.py)
+from detector import detect_faces  # noqa: E402  (AI/detector.py)
 
 # 전역 변수
 HOME_DIR = os.path.expanduser("~")  # 사용자 홈 디렉토리 경로
 SCREENSHOT_DIR = os.path.join(HOME_DIR, "HNUCE", "screenshot")  # 스크린샷 저장 경로
 SERVO_PIN = 18  # 서보 모터 GPIO 핀 번호
-WEBCAM_SAVE_PATH = os.path.join(SCREENSHOT_DIR, "webcam_snapshot.jpg")  # 웹캠 캡처 이미지 저장 경로
-ENCODINGS_PATH = os.path.join(HOME_DIR, "output", "encodings.pkl")  # 얼굴 인코딩 데이터 경로
+WEBCAM_SAVE_PATH = os.path.join(SCREENSHOT_DIR, "webcam_snapshot.jpg")  # 디버그용 캡처 이미지 저장 경로 (capture_webcam_image(save_path=...))
+CAMERA_DEVICE = 0  # USB 웹캠 장치 번호
+ENCODINGS_PATH = os.path.join(HOME_DIR, "output", "encodings.fenc")  # 얼굴 인코딩 저장소 경로 (없으면 encodings.pkl 에서 변환)
+gallery = None  # 메모리에 올려둔 학습 데이터 (파일이 교체되면 자동으로 다시 읽음)
+recognition_client = None  # 상주 인식 서버(detector.py --serve)가 떠 있으면 setup()에서 설정 (서버 오류 중에는 None)
+server_client = None  # setup() 때 찾은 인식 서버 (오류로 로컬 인식으로 바꾼 뒤 다시 연결할 때 사용)
+SERVER_RETRY_SECONDS = 30  # 인식 서버 오류 후 이 시간이 지나면 다시 연결 시도
+server_retry_at = 0.0  # 다음 재연결 시도 시각 (time.monotonic)
+grabber = None  # 웹캠을 열어두고 계속 프레임을 읽는 FrameGrabber (setup()에서 시작)
+last_frame_index = -1  # 마지막으로 인식한 프레임 번호 (같은 프레임 중복 인식 방지)
+USE_PRESENCE_GATE = True  # 움직임/얼굴 존재를 먼저 확인해서 사람이 없으면 전체 인식을 건너뜀
+GATE_REPORT_INTERVAL = 300  # 이 프레임 수마다 단계별 탈락 횟수 출력
+gate = None  # PresenceGate (임계값은 presence_gate.py 참고)
+USE_TRACKER = True  # 프레임 간 얼굴을 추적해 인코딩 횟수를 줄이고, 여러 프레임 투표로 출입 판단
+tracker = None  # FaceTracker (투표 창/재인코딩 주기는 tracker.py 참고)
+DOOR_OPEN_SECONDS = 10  # 마지막 인증 이후 문을 열어두는 시간 (열린 동안 다시 인증되면 연장)
+door = None  # 서보를 별도 스레드에서 움직이는 DoorController (setup()에서 시작)
+metrics = Metrics(enabled=False)  # 단계별 소요 시간/카운터 (setup()에서 metrics_port / metrics_log 를 주면 켜짐)
+ADAPTIVE_TARGET_MS = 300  # 프레임 하나의 검출+인코딩 목표 시간, 넘으면 검출 해상도/upsample 을 낮춤 (0 이면 원본 해상도 고정)
+resolution = None  # AdaptiveResolution (범위/단계는 adaptive.py 참고)
+last_detect_seconds = 0.0  # 마지막 프레임의 검출 시간 (resolution 에 프레임 시간과 함께 기록)
+_face_recognition_module = None  # 로컬 인식을 처음 할 때 import (서버만 쓰면 dlib 를 불러오지 않음)
+detect_lock = threading.Lock()  # face_recognition 의 dlib HOG 검출기는 하나뿐이고 스레드 안전하지 않음
 
 
 # 오류 메시지 출력 후 종료 함수
 def fail_exit(message):
     """오류 메시지를 출력하고 프로그램 종료"""
     print(f"[ERROR] {message}")
-    GPIO.cleanup()
+    metrics.inc("fatal_errors")
+    if grabber is not None:
+        grabber.stop()
+    if door is not None:
+        door.stop()
+    metrics.close()  # 마지막 계측 값 기록
     sys.exit(1)
 
 
 # 초기 설정 함수
-def setup():
-    GPIO.cleanup()
+def setup(source=None, servo_backend=None, use_server=True, metrics_port=None, metrics_log=None, max_fps=None):
+    """source 로 VideoFileSource / ImageDirSource 를, servo_backend 로 MockServoBackend 를 넘기면 기기 없이 실행
+
+    파일 공급원은 max_fps 를 주면 그 속도로 읽음 (주지 않으면 디코딩 속도로 읽어 처리하지 못한 프레임은 건너뜀)
+    metrics_port 를 주면 http://127.0.0.1:port/metrics, metrics_log 를 주면 JSON-lines 파일로 단계별 소요 시간 제공
+    """
+    global recognition_client, server_client, grabber, gallery, gate, door, tracker, metrics, resolution
     print("초기 설정 중...")
+    metrics = configure_metrics(port=metrics_port, log_path=metrics_log)
+
+    # 상주 인식 서버 확인 (있으면 모델/학습 데이터 로딩 없이 바로 인식, 같은 학습 데이터를 쓸 때만)
+    client = RecognitionClient()
+    if use_server and client.is_available():
+        if client.serves(ENCODINGS_PATH):
+            recognition_client = server_client = client
+            print(f"[INFO] 인식 서버 사용: {client.base_url}")
+        else:
+            print(f"[WARN] 인식 서버가 다른 학습 데이터를 사용 중이라 로컬 인식 사용 "
+                  f"(서버: {client.health().get('encodings')}, 도어 유닛: {ENCODINGS_PATH})")
 
     # 스크린샷 저장 폴더 생성
     if not os.path.exists(SCREENSHOT_DIR):
         os.makedirs(SCREENSHOT_DIR)
         print(f"[INFO] 스크린샷 저장 디렉토리 생성 완료: {SCREENSHOT_DIR}")
 
-    # GPIO 초기화 및 서보 모터 설정
+    if recognition_client is None:
+        try:
+            load_local_gallery()
+        except Exception as e:
+            fail_exit(f"얼굴 인코딩 데이터를 불러올 수 없습니다: {e}")
+
+    # 웹캠을 한 번만 열고 백그라운드에서 계속 프레임을 읽음
+    print("[INFO] 웹캠 연결 중...")
+    try:
+        grabber = FrameGrabber(source if source is not None else CameraSource(CAMERA_DEVICE), max_fps=max_fps,
+                               metrics=metrics).start()
+    except RuntimeError:
+        fail_exit("웹캠에 접근할 수 없습니다. 연결을 확인하세요.")
+
+    if USE_PRESENCE_GATE:
+        gate = PresenceGate()
+    if USE_TRACKER:
+        tracker = FaceTracker()
+
+    # GPIO 초기화 및 서보 모터 설정 (문 열기/닫기는 별도 스레드에서 처리)
     print("[INFO] GPIO 및 서보 설정 중...")
-    GPIO.setmode(GPIO.BCM)
-    GPIO.setup(SERVO_PIN, GPIO.OUT)
-    global servo
-    servo = GPIO.PWM(SERVO_PIN, 50)  # 50Hz PWM 동작
-    servo.start(0)
+    backend = servo_backend if servo_backend is not None else RPiServoBackend(SERVO_PIN)
+    door = DoorController(backend, open_angle=80, closed_angle=0, open_seconds=DOOR_OPEN_SECONDS).start()
     print("[INFO] 초기 설정 완료.")
 
 
-# 서보 모터를 특정 각도로 회전시키는 함수
-def rotate_servo(angle):
-    """서보 모터 회전"""
-    duty_cycle = angle / 18.0 + 2
-    servo.ChangeDutyCycle(duty_cycle)
-    time.sleep(0.5)
-    servo.ChangeDutyCycle(0)
+#face_recognition 모듈을 처음 필요할 때 import (dlib 와 모델 파일 로딩이 여기서 일어남)
+def _face_recognition():
+    global _face_recognition_module
+    if _face_recognition_module is None:
+        import face_recognition
+        _face_recognition_module = face_recognition
+    return _face_recognition_module
 
 
-# USB 웹캠으로 이미지 캡처
-def capture_webcam_image(output_path=WEBCAM_SAVE_PATH):
-    """USB 웹캠에서 실시간 이미지 캡처"""
-    print("[INFO] USB 웹캠으로 이미지 캡처 시도 중...")
-    cam = cv2.VideoCapture(0)
-    if not cam.isOpened():
-        fail_exit("웹캠에 접근할 수 없습니다. 연결을 확인하세요.")
+# 로컬 인식 준비 (서버를 쓰다가 오류가 나면 그때 처음 불러옴)
+def load_local_gallery():
+    """학습 데이터는 한 번만 읽어두고, 파일이 교체되면 백그라운드에서 다시 읽어 바꿔 끼움"""
+    global gallery, resolution
+    if gallery is None:
+        gallery = HotGallery(ENCODINGS_PATH).start()
+    if ADAPTIVE_TARGET_MS and resolution is None:  # 서버를 쓰는 동안은 검출이 서버 설정을 따름
+        resolution = AdaptiveResolution(target_ms=ADAPTIVE_TARGET_MS)
 
-    ret, frame = cam.read()
-    if ret:
-        cv2.imwrite(output_path, frame)
-        print(f"[INFO] USB 웹캠 이미지 캡처 완료: {output_path}")
-    else:
+
+# 지금 쓸 인식 서버 (없거나 오류 중이면 None, 오류 후 SERVER_RETRY_SECONDS 가 지나면 다시 확인)
+def active_server():
+    global recognition_client, server_retry_at
+    if recognition_client is None and server_client is not None and time.monotonic() >= server_retry_at:
+        if server_client.serves(ENCODINGS_PATH):
+            recognition_client = server_client
+            print(f"[INFO] 인식 서버 다시 사용: {server_client.base_url}")
+        else:
+            server_retry_at = time.monotonic() + SERVER_RETRY_SECONDS
+    return recognition_client
+
+
+# 인식 서버 오류 시 로컬 인식으로 전환
+def fall_back_to_local(error):
+    global recognition_client, server_retry_at
+    recognition_client = None
+    server_retry_at = time.monotonic() + SERVER_RETRY_SECONDS
+    metrics.inc("server_errors")
+    print(f"[WARN] 인식 서버 오류, 로컬 인식으로 전환 ({SERVER_RETRY_SECONDS}초 후 다시 시도): {error}")
+    load_local_gallery()
+
+
+# USB 웹캠의 아직 처리하지 않은 최신 프레임
+def capture_webcam_frame():
+    """Frame(index, timestamp, bgr) 반환, 동영상/이미지 폴더 공급원이 끝나면 None"""
+    global last_frame_index
+    with metrics.timer("frame_wait"):  # 새 프레임을 기다린 시간 (장치 읽기 시간은 FrameGrabber 가 "capture" 로 기록)
+        frame = grabber.wait_for_frame(after_index=last_frame_index)
+    metrics.inc("frames")
+    if frame is None:
+        if grabber.finished and not isinstance(grabber.source, CameraSource):
+            return None
         fail_exit("웹캠에서 이미지를 캡처하는 데 실패했습니다.")
+    last_frame_index = frame.index
+    return frame
+
+
+# USB 웹캠으로 이미지 캡처
+def capture_webcam_image(save_path=None):
+    """백그라운드에서 읽고 있는 웹캠의 최신 프레임을 RGB 배열로 반환 (디스크 저장 없음)"""
+    frame = capture_webcam_frame()
+    if frame is None:
+        fail_exit("입력 파일에 더 이상 프레임이 없습니다.")
+    if save_path:
+        cv2.imwrite(save_path, frame.bgr)
+        print(f"[INFO] USB 웹캠 이미지 저장 완료: {save_path}")
+    with metrics.timer("decode"):
+        return frame.rgb()
+
+
+# 얼굴 위치 검출 (top, right, bottom, left 목록, 원본 좌표)
+def detect_face_boxes(image, model="hog"):
+    """resolution 이 있으면 지금 설정(축소 비율, upsample)으로 검출 (여러 스레드에서 불러도 한 번에 하나씩)"""
+    global last_detect_seconds
+    point = resolution.operating_point if resolution is not None else None
+    with detect_lock:
+        started = time.perf_counter()
+        with metrics.timer("detect"):
+            if point is None:
+                boxes = detect_faces(image, model=model)  # face_locations 와 같음 (원본, upsample 1)
+            else:
+                boxes = detect_faces(image, model=model, scale=point.scale, upsample=point.upsample)
+        last_detect_seconds = time.perf_counter() - started
+    return boxes
 
-    cam.release()
-    return output_path
+
+# 주어진 얼굴 위치만 인코딩해서 학습 데이터와 매칭 (이름 목록, 모르는 얼굴은 None)
+def encode_and_match(image, boxes):
+    with metrics.timer("encode"):
+        encodings = _face_recognition().face_encodings(image, boxes)
+    with metrics.timer("match"):
+        return gallery.matcher.identify(encodings)  # 프레임마다 파일을 읽지 않음
+
+
+# 인식 서버에 맡겨서 얼굴 위치와 이름을 받음
+def recognize_on_server(image, model="hog"):
+    with metrics.timer("server"):
+        if isinstance(image, np.ndarray):
+            return recognition_client.recognize_array(image, model=model)
+        return recognition_client.recognize_path(image, model=model)
 
 
 # 얼굴 인식 함수 (결과 반환)
-def recognize_faces_with_result(image_location, model="hog"):
-    """웹캠에서 캡처한 이미지를 사용하여 얼굴을 인식"""
+def recognize_faces_with_result(image, model="hog"):
+    """웹캠에서 캡처한 이미지(RGB 배열 또는 파일 경로)를 사용하여 얼굴을 인식"""
     try:
-        with open(ENCODINGS_PATH, "rb") as f:
-            loaded_encodings = pickle.load(f)
+        if active_server() is not None:
+            try:
+                faces = recognize_on_server(image, model=model)
+            except RecognitionServerError as e:
+                fall_back_to_local(e)
+            else:
+                if not faces:
+                    print("[DEBUG] 얼굴이 감지되지 않았습니다.")
+                    return None
+                return faces[0]["name"]
 
-        image = np.array(Image.open(image_location).convert("RGB"))
-        face_locations_list = face_locations(image, model=model)
-        face_encodings_list = face_encodings(image, face_locations_list)
+        if not isinstance(image, np.ndarray):
+            with metrics.timer("decode"):
+                image = np.array(Image.open(image).convert("RGB"))
+        face_locations_list = detect_face_boxes(image, model=model)
 
         if not face_locations_list:
             print("[DEBUG] 얼굴이 감지되지 않았습니다.")
             return None
 
-        for face_encoding in face_encodings_list:
-            matches = compare_faces(loaded_encodings["encodings"], face_encoding)
-            name_votes = Counter(
-                name for match, name in zip(matches, loaded_encodings["names"]) if match
-            )
-            if name_votes:
-                recognized_name = name_votes.most_common(1)[0][0]
-                return recognized_name
-            else:
-                return "Unknown"
+        # 첫 번째 얼굴의 결과만 사용 (기존 동작과 동일)
+        recognized_name = encode_and_match(image, face_locations_list[:1])[0]
+        return recognized_name if recognized_name else "Unknown"
     except Exception as e:
+        metrics.inc("recognition_errors")
         print(f"[ERROR] 얼굴 인식 중 오류 발생: {e}")
         return "Unknown"
 
 
+# 추적 + 투표로 얼굴 인식 (출입을 허용할 사용자 이름, 아직 확정되지 않았으면 None)
+def recognize_tracked_faces(image, frame_index, model="hog"):
+    """얼굴 검출은 매 프레임, 인코딩은 새 얼굴이거나 다시 확인할 때가 된 얼굴만 수행"""
+    try:
+        if active_server() is not None:
+            # 서버가 검출/인코딩을 모두 하므로 결과는 추적/투표에만 사용
+            try:
+                faces = recognize_on_server(image, model=model)
+            except RecognitionServerError as e:
+                fall_back_to_local(e)
+            else:
+                names = {tuple(face["box"]): face["name"] for face in faces}
+                return tracker.step(list(names), frame_index, lambda boxes: [names[box] for box in boxes])
+
+        boxes = detect_face_boxes(image, model=model)
+        return tracker.step(boxes, frame_index, lambda pending: encode_and_match(image, pending))
+    except Exception as e:
+        metrics.inc("recognition_errors")
+        print(f"[ERROR] 얼굴 인식 중 오류 발생: {e}")
+        return None
+
+
 # 2차 검증 - 얼굴 인식 수행 및 서보 작동 추가
-def secondary_face_verification_with_webcam():
-    """웹캠 캡처 이미지를 사용하여 추가 얼굴 검증 수행"""
-    image_path = capture_webcam_image()  # 웹캠으로 사진 촬영
+def secondary_face_verification_with_webcam(image=None, frame_index=None):
+    """웹캠 캡처 이미지를 사용하여 추가 얼굴 검증 수행 (image 를 주면 그 프레임 사용)
+
+    frame_index 를 주고 추적을 켜두면 한 프레임이 아니라 최근 프레임들의 투표로 판단
+    """
+    if image is None:
+        image = capture_webcam_image()  # 웹캠의 최신 프레임 (메모리)
     print("[INFO] 사용자 인증 시작...")
 
-    result = recognize_faces_with_result(image_location=image_path)  # 얼굴 인식
+    if tracker is not None and frame_index is not None:
+        result = recognize_tracked_faces(image, frame_index)
+    else:
+        result = recognize_faces_with_result(image)  # 얼굴 인식
     if result == "Unknown" or result is None:
+        metrics.inc("auth_failure")
         print("[ERROR] 사용자 인증 실패: 얼굴이 인식되지 않거나 권한이 없는 사용자입니다.")
         return False  # 인증 실패
 
+    metrics.inc("auth_success")
     print(f"[INFO] 사용자 인증 성공: 얼굴 인증 완료! (사용자: {result})")
 
-    # 서보 모터 회전
-    rotate_servo(80)  # 문 열기 상태 (90도 회전)
-    time.sleep(10)  # 5초간 문 열기 상태 유지
-    rotate_servo(0)  # 문 닫기 상태 (0도 회전)
+    # 문 열기 (기다리지 않음, 이미 열려 있으면 열림 시간 연장)
+    with metrics.timer("actuate"):
+        door.request_open()
+
+    return result  # 인증 성공 (사용자 이름)
 
-    return True  # 인증 성공
+
+# 프레임 한 장 인증 (사람이 없어 건너뛰면 None, 인증 실패 False, 성공하면 사용자 이름)
+def process_frame(frame):
+    """메인 루프와 replay.py 가 같이 쓰는 인증 경로"""
+    # 사람이 없으면 HOG 검출/인코딩을 건너뜀 (움직임 -> 얼굴 존재 순서로 확인)
+    with metrics.timer("gate"):
+        present = gate is None or gate.check(frame.bgr, now=frame.timestamp)
+    if gate is not None and gate.frames % GATE_REPORT_INTERVAL == 0:  # 사람이 계속 있어도 주기적으로 출력
+        print(f"[INFO] 게이트: {gate.stats()}")
+        if resolution is not None:
+            print(f"[INFO] 검출 설정: {resolution.stats()}")
+    if not present:
+        metrics.inc("gate_rejected")
+        if tracker is not None:
+            tracker.update([], frame.index)  # 얼굴이 없는 프레임도 추적 대상의 사라짐으로 반영
+        return None
+
+    with metrics.timer("decode"):
+        image = frame.rgb()
+    started = time.perf_counter()
+    local = active_server() is None  # 서버가 처리한 프레임은 로컬 검출 시간 조절에 넣지 않음
+    result = secondary_face_verification_with_webcam(image, frame.index)
+    if local and resolution is not None and resolution.record(time.perf_counter() - started, last_detect_seconds):
+        metrics.inc("resolution_changes")
+    return result
 
 
 # 메인 루프
@@ -129,9 +329,15 @@ def loop():
     print("[INFO] 메인 루프 실행 중...")
     try:
         while True:
-
-            # 1차 인증 (HuskyLens 학습된 얼굴 감지)
-            if secondary_face_verification_with_webcam():
+            frame = capture_webcam_frame()
+            if frame is None:
+                print("[INFO] 입력 파일이 끝났습니다.")
+                break
+            verified = process_frame(frame)
+            if verified is None:
+                continue
+            metrics.observe("end_to_end", time.monotonic() - frame.timestamp)  # 캡처부터 판단까지
+            if verified:
                 print("[INFO] 사용자 인증: 학습된 얼굴 확인됨.")
 
             else:
@@ -141,11 +347,135 @@ def loop():
     except KeyboardInterrupt:
         # 사용자 인터럽트 시 프로그램 안전 종료
         print("[INFO] 프로그램 종료 중...")
-        GPIO.cleanup()
-        sys.exit(0)
+    grabber.stop()
+    door.stop()  # 열려 있으면 닫고 GPIO 정리
+    metrics.close()
+    sys.exit(0)
+
+
+# 파이프라인 단계: 움직임/얼굴 존재 확인 (배경 모델이 있어 스레드 하나에서만 실행)
+def _gate_stage(frame):
+    metrics.inc("frames")
+    with metrics.timer("gate"):
+        present = gate is None or gate.check(frame.bgr, now=frame.timestamp)
+    if not present:
+        metrics.inc("gate_rejected")
+    return frame, present
+
+
+# 파이프라인 단계: 얼굴 검출 (pool 을 주면 다른 프로세스에서 실행해 코어를 나눠 씀)
+# pool 없이 스레드로 돌리면 검출은 detect_lock 으로 하나씩만 실행되고 프레임 변환(decode)만 겹침
+def _make_detect_stage(pool=None, model="hog"):
+    def detect(value):
+        frame, present = value
+        if not present:
+            return frame, None, [], None
+        with metrics.timer("decode"):
+            image = frame.rgb()
+        started = time.perf_counter()
+        if pool is None:
+            boxes = detect_face_boxes(image, model=model)
+        else:
+            point = resolution.operating_point if resolution is not None else None
+            with metrics.timer("detect"):
+                if point is None:
+                    boxes = pool.submit(detect_faces, image, model=model).result()
+                else:
+                    boxes = pool.submit(detect_faces, image, model=model, scale=point.scale, upsample=point.upsample).result()
+        return frame, image, boxes, time.perf_counter() - started
+    return detect
+
+
+# 파이프라인 단계: 인코딩 + 매칭 + 투표 (추적 상태가 있어 프레임 순서대로 하나씩 처리)
+def _identify_stage(value):
+    frame, image, boxes, detect_seconds = value
+    started = time.perf_counter()
+    if tracker is not None:
+        name = tracker.step(boxes, frame.index, lambda pending: encode_and_match(image, pending))
+    else:
+        name = encode_and_match(image, boxes[:1])[0] if boxes else None
+    if resolution is not None and detect_seconds is not None:
+        # 검출 + 인코딩/매칭 시간 (검출 여러 개가 동시에 돌아도 프레임 하나 기준, 사람이 없던 프레임은 제외)
+        if resolution.record(detect_seconds + time.perf_counter() - started, detect_seconds):
+            metrics.inc("resolution_changes")
+    return frame, name
+
+
+# 파이프라인 단계: 문 열기
+def _actuate_stage(value):
+    frame, name = value
+    if name:
+        metrics.inc("auth_success")
+        if not door.is_open:
+            print(f"[INFO] 사용자 인증 성공: 얼굴 인증 완료! (사용자: {name}, 프레임 {frame.index})")
+        with metrics.timer("actuate"):
+            door.request_open()
+    metrics.observe("end_to_end", time.monotonic() - frame.timestamp)  # 캡처부터 판단까지
+    return name
+
+
+# 파이프라인 실행 (캡처/검출/인식/동작을 각각 다른 스레드에서, 단계 사이는 크기 제한 큐)
+def run_pipeline(queue_size=2, policy=DROP_OLDEST, detect_workers=2, processes=True, report_interval=10.0, model="hog"):
+    """뒤 단계가 밀리면 policy 에 따라 오래된/새 프레임을 버리거나(block) 기다림
+
+    검출은 기본으로 detect_workers 개의 프로세스에서 실행 (processes=False 면 스레드, 검출 자체는 병렬이 아님)
+    """
+    pool = None
+    if processes:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=detect_workers)
+    stages = [
+        Stage("gate", _gate_stage),
+        Stage("detect", _make_detect_stage(pool, model), workers=detect_workers),
+        Stage("identify", _identify_stage, ordered=True),
+        Stage("actuate", _actuate_stage),
+    ]
+    pipeline = Pipeline(grabber, stages, queue_size=queue_size, policy=policy).start()
+    print(f"[INFO] 파이프라인 실행 중... (검출 {detect_workers}개 {'프로세스' if processes else '스레드'}, 큐 {queue_size}, {policy})")
+    try:
+        while not pipeline.wait(timeout=report_interval):
+            print(f"[INFO] {pipeline.report()}")
+            if resolution is not None:
+                print(f"[INFO] 검출 설정: {resolution.stats()}")
+    except KeyboardInterrupt:
+        print("[INFO] 프로그램 종료 중...")
+    finally:
+        pipeline.stop()
+        print(f"[INFO] {pipeline.report()}")
+        if pool is not None:
+            pool.shutdown()
+        grabber.stop()
+        door.stop()  # 열려 있으면 닫고 GPIO 정리
+        metrics.close()
+
+
+#CLI 설정
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Door unit: webcam face recognition and servo")
+    parser.add_argument("--pipeline", action="store_true", help="Run capture, detection, identification and actuation as separate stages with bounded queues")
+    parser.add_argument("--queue-size", action="store", type=int, default=2, help="Frames allowed to wait in front of each stage")
+    parser.add_argument("--drop-policy", action="store", default=DROP_OLDEST, choices=POLICIES, help="What to do when a stage falls behind")
+    parser.add_argument("--detect-workers", action="store", type=int, default=2, help="Face detection worker processes (threads with --threads)")
+    parser.add_argument("--threads", action="store_true", help="Run the detect stage in threads instead of processes; dlib detection is serialized, so only frame decoding overlaps")
+    parser.add_argument("--video", action="store", help="Read frames from a video file at its recorded frame rate instead of the webcam; exits when the file ends")
+    parser.add_argument("--mock-servo", action="store_true", help="Log servo moves instead of driving GPIO")
+    parser.add_argument("--target-ms", action="store", type=float, default=ADAPTIVE_TARGET_MS, help="Per-frame detect+encode latency budget; detection resolution and upsampling adapt to hold it (0 = fixed full resolution)")
+    parser.add_argument("--metrics-port", action="store", type=int, help="Serve per-stage timings and counters at http://127.0.0.1:PORT/metrics (Prometheus text)")
+    parser.add_argument("--metrics-log", action="store", help="Append a JSON snapshot of per-stage timings and counters to this file every 10 seconds")
+    return parser
 
 
 # 프로그램 실행 진입점
 if __name__ == "__main__":
-    setup()
-    loop()
+    args = _build_parser().parse_args()
+    ADAPTIVE_TARGET_MS = args.target_ms
+    # 파이프라인은 검출/인코딩을 직접 나눠서 하므로 인식 서버를 쓰지 않음
+    video = VideoFileSource(args.video) if args.video else None
+    setup(source=video, servo_backend=MockServoBackend(verbose=True) if args.mock_servo else None,
+          use_server=not args.pipeline, metrics_port=args.metrics_port, metrics_log=args.metrics_log,
+          max_fps=video.fps if video is not None else None)  # 동영상은 녹화된 속도로 재생
+    if args.pipeline:
+        run_pipeline(queue_size=args.queue_size, policy=args.drop_policy, detect_workers=args.detect_workers,
+                     processes=not args.threads)
+    else:
+        loop()
@@ -0,0 +1,277 @@
+#세션 녹화/재생 (라즈베리파이, 웹캠, 서보 없이 raspitest2.py 의 인증 경로 성능 측정)
+#
+# 녹화: 카메라 프레임을 JPEG 로 압축해 캡처 시각과 함께 파일 하나(.frec)에 순서대로 저장
+#   python HSKLNS_1/replay.py record session.frec --seconds 30
+# 재생: 저장한 프레임을 가짜 카메라/가짜 서보로 raspitest2.process_frame 에 그대로 넣음
+#   python HSKLNS_1/replay.py replay session.frec                 # 최대 속도, 모든 프레임을 순서대로 (결과가 항상 같음)
+#   python HSKLNS_1/replay.py replay session.frec --realtime      # 녹화 당시 속도 (느리면 실제처럼 프레임을 건너뜀)
+# 초당 프레임 수, 판단 지연(p50/p90/p99), 판단 순서를 출력하고 --json 으로 저장 가능 (CI 에서 이전 결과와 비교)
+#
+# 파일 형식: 헤더 "<4sHH" (FREC, 버전, 예약) 뒤에 프레임마다 "<dI" (첫 프레임 기준 초, JPEG 길이) + JPEG
+
+import argparse
+import json
+import os
+import struct
+import sys
+import tempfile
+import time
+from typing import Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from camera import CameraSource, Frame, FrameGrabber, FrameSource
+
+MAGIC = b"FREC"
+VERSION = 1
+HEADER = struct.Struct("<4sHH")
+RECORD = struct.Struct("<dI")
+DEFAULT_QUALITY = 90
+
+
+class SessionFormatError(ValueError):
+    pass
+
+
+#프레임을 JPEG 로 압축해서 파일 하나에 순서대로 기록 (다 쓰고 닫을 때 원래 이름으로 교체)
+class SessionRecorder:
+    def __init__(self, path, quality: int = DEFAULT_QUALITY):
+        self.path = os.path.abspath(path)
+        self.quality = quality
+        self.frames = 0
+        self.bytes = HEADER.size
+        self._first_timestamp = None
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, self._tmp_name = tempfile.mkstemp(prefix=os.path.basename(self.path) + ".", suffix=".tmp", dir=directory)
+        self._file = os.fdopen(fd, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0))
+
+    def write(self, bgr, timestamp: float) -> None:
+        ok, jpeg = cv2.imencode(".jpg", bgr, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            raise ValueError("frame could not be JPEG-encoded")
+        if self._first_timestamp is None:
+            self._first_timestamp = timestamp
+        data = jpeg.tobytes()
+        self._file.write(RECORD.pack(timestamp - self._first_timestamp, len(data)))
+        self._file.write(data)
+        self.frames += 1
+        self.bytes += RECORD.size + len(data)
+
+    def record(self, grabber: FrameGrabber, seconds: Optional[float] = None, max_frames: Optional[int] = None) -> int:
+        """grabber 에서 새 프레임이 들어올 때마다 기록 (seconds 또는 max_frames 만큼, 공급원이 끝나면 중단)"""
+        deadline = time.monotonic() + seconds if seconds else None
+        last_index = -1
+        while (deadline is None or time.monotonic() < deadline) and (max_frames is None or self.frames < max_frames):
+            frame = grabber.wait_for_frame(after_index=last_index, timeout=1.0)
+            if frame is None:
+                if grabber.finished:
+                    break
+                continue
+            last_index = frame.index
+            self.write(frame.bgr, frame.timestamp)
+        return self.frames
+
+    def close(self) -> None:
+        self._file.close()
+        os.replace(self._tmp_name, self.path)
+
+    def abort(self) -> None:
+        self._file.close()
+        if os.path.exists(self._tmp_name):
+            os.remove(self._tmp_name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+#녹화 파일의 (첫 프레임 기준 초, JPEG 바이트) 목록
+def read_session(path) -> List[Tuple[float, bytes]]:
+    with open(path, "rb") as session_file:
+        data = session_file.read()
+    if len(data) < HEADER.size:
+        raise SessionFormatError(f"{path}: not a frame session (too short)")
+    magic, version, _ = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SessionFormatError(f"{path}: not a frame session (bad magic)")
+    if version != VERSION:
+        raise SessionFormatError(f"{path}: unsupported session version {version}")
+    records, offset = [], HEADER.size
+    while offset < len(data):
+        if offset + RECORD.size > len(data):
+            raise SessionFormatError(f"{path}: truncated record header at byte {offset}")
+        timestamp, length = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        if offset + length > len(data):
+            raise SessionFormatError(f"{path}: truncated frame at byte {offset}")
+        records.append((timestamp, data[offset:offset + length]))
+        offset += length
+    return records
+
+
+def _decode(jpeg: bytes):
+    return cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+#녹화 파일을 카메라처럼 읽는 공급원 (realtime=True 이면 녹화 당시 간격에 맞춰 반환)
+class RecordedSource(FrameSource):
+    def __init__(self, path, realtime: bool = False):
+        self.records = read_session(path)
+        self.realtime = realtime
+        self.position = 0
+        self._started = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def read(self):
+        if self.position >= len(self.records):
+            return False, None
+        timestamp, jpeg = self.records[self.position]
+        if self.realtime:
+            if self._started is None:
+                self._started = time.monotonic() - timestamp
+            delay = self._started + timestamp - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        self.position += 1
+        frame = _decode(jpeg)
+        return frame is not None, frame
+
+    def is_opened(self) -> bool:
+        return bool(self.records)
+
+    def frames(self) -> Iterator[Frame]:
+        """모든 프레임을 녹화 시각과 함께 순서대로 (최대 속도 재생용)"""
+        for index, (timestamp, jpeg) in enumerate(self.records):
+            yield Frame(index, timestamp, _decode(jpeg))
+
+
+#재생 결과 요약
+def summarize(decisions: list, latencies: list, elapsed: float, recorded_frames: int) -> dict:
+    processed = len(decisions)
+    percentiles = np.percentile(np.asarray(latencies) * 1000.0, (50, 90, 99)) if latencies else (None,) * 3
+    granted = [(index, decision) for index, decision in decisions if isinstance(decision, str)]
+    return {
+        "recorded_frames": recorded_frames,
+        "processed_frames": processed,
+        "seconds": round(elapsed, 3),
+        "fps": round(processed / elapsed, 2) if elapsed > 0 else None,
+        "latency_ms": {name: None if value is None else round(float(value), 1)
+                       for name, value in zip(("p50", "p90", "p99"), percentiles)},
+        "skipped": sum(1 for _, decision in decisions if decision is None),
+        "denied": sum(1 for _, decision in decisions if decision is False),
+        "granted": len(granted),
+        "decisions": [[index, decision] for index, decision in granted],  # 문을 연 (프레임 번호, 사용자)
+    }
+
+
+#녹화 세션을 raspitest2 의 인증 경로로 재생
+def replay(path, realtime: bool = False, encodings_location: Optional[str] = None,
+           target_ms: Optional[float] = None) -> dict:
+    """realtime=False: 모든 프레임을 순서대로 최대 속도로 처리 (지연 = 프레임 처리 시간)
+    realtime=True : 녹화 간격대로 공급하고 밀린 프레임은 건너뜀 (지연 = 캡처부터 판단까지)
+    target_ms 를 주지 않으면 검출 해상도를 원본으로 고정 (처리 속도에 따라 결과가 달라지지 않도록)
+    """
+    import raspitest2  # face_recognition 을 불러오므로 재생할 때만
+    from door import MockServoBackend
+
+    if encodings_location is not None:
+        raspitest2.ENCODINGS_PATH = encodings_location
+    raspitest2.ADAPTIVE_TARGET_MS = target_ms or 0
+    source = RecordedSource(path, realtime=realtime)
+    # 인식 서버는 쓰지 않음 (다른 프로세스 상태에 따라 결과가 달라지지 않도록)
+    raspitest2.setup(source=source, servo_backend=MockServoBackend(), use_server=False)
+
+    decisions, latencies = [], []
+    started = time.perf_counter()
+    try:
+        if realtime:
+            grabber = raspitest2.grabber
+            last_index = -1
+            while True:
+                frame = grabber.wait_for_frame(after_index=last_index)
+                if frame is None:
+                    break
+                last_index = frame.index
+                decisions.append((frame.index, raspitest2.process_frame(frame)))
+                latencies.append(time.monotonic() - frame.timestamp)
+        else:
+            raspitest2.grabber.stop()  # 최대 속도 재생은 grabber 없이 모든 프레임을 직접 넣음
+            for frame in source.frames():
+                frame_started = time.perf_counter()
+                decisions.append((frame.index, raspitest2.process_frame(frame)))
+                latencies.append(time.perf_counter() - frame_started)
+        elapsed = time.perf_counter() - started
+    finally:
+        raspitest2.grabber.stop()
+        raspitest2.door.stop()
+        if raspitest2.gallery is not None:
+            raspitest2.gallery.stop()  # 파일 감시 스레드 정리 (다음 replay 의 setup 에서 다시 읽음)
+            raspitest2.gallery = None
+        raspitest2.metrics.close()
+    summary = summarize(decisions, latencies, elapsed, len(source))
+    if raspitest2.resolution is not None:
+        summary["detection"] = raspitest2.resolution.stats()  # 재생이 끝났을 때의 검출 설정
+    return summary
+
+
+#카메라에서 녹화
+def record(path, seconds: Optional[float] = None, max_frames: Optional[int] = None, device=0,
+           quality: int = DEFAULT_QUALITY) -> int:
+    grabber = FrameGrabber(CameraSource(device)).start()
+    try:
+        with SessionRecorder(path, quality=quality) as recorder:
+            frames = recorder.record(grabber, seconds=seconds, max_frames=max_frames)
+    finally:
+        grabber.stop()
+    print(f"[INFO] 녹화 완료: 프레임 {frames}개, {recorder.bytes / 1e6:.1f} MB -> {path}")
+    return frames
+
+
+#CLI 설정
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Record camera sessions and replay them through the door-unit authentication path")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record_parser = commands.add_parser("record", help="Record webcam frames to a session file")
+    record_parser.add_argument("path", help="Session file to write (.frec)")
+    record_parser.add_argument("--seconds", action="store", type=float, help="Stop after this many seconds")
+    record_parser.add_argument("--frames", action="store", type=int, help="Stop after this many frames")
+    record_parser.add_argument("--device", action="store", type=int, default=0, help="Webcam device number")
+    record_parser.add_argument("--quality", action="store", type=int, default=DEFAULT_QUALITY, help="JPEG quality (1-100)")
+    replay_parser = commands.add_parser("replay", help="Replay a session through raspitest2 with fake camera and servo")
+    replay_parser.add_argument("path", help="Session file to read (.frec)")
+    replay_parser.add_argument("--realtime", action="store_true", help="Feed frames at the recorded pace instead of as fast as possible")
+    replay_parser.add_argument("--encodings", action="store", help="Encodings store to recognize against (default: raspitest2.ENCODINGS_PATH)")
+    replay_parser.add_argument("--target-ms", action="store", type=float, help="Let detection resolution adapt to this per-frame latency budget (default: fixed full resolution)")
+    replay_parser.add_argument("--json", action="store", help="Also write the summary to this JSON file")
+    return parser
+
+
+if __name__ == "__main__":
+    args = _build_parser().parse_args()
+    if args.command == "record":
+        if args.seconds is None and args.frames is None:
+            sys.exit("record needs --seconds or --frames")
+        record(args.path, seconds=args.seconds, max_frames=args.frames, device=args.device, quality=args.quality)
+    else:
+        summary = replay(args.path, realtime=args.realtime, encodings_location=args.encodings, target_ms=args.target_ms)
+        latency = summary["latency_ms"]
+        print(f"[INFO] {summary['processed_frames']}/{summary['recorded_frames']} frames in {summary['seconds']} s "
+              f"({summary['fps']} fps), latency p50/p90/p99={latency['p50']}/{latency['p90']}/{latency['p99']} ms")
+        print(f"[INFO] skipped={summary['skipped']} denied={summary['denied']} granted={summary['granted']}")
+        if "detection" in summary:
+            print(f"[INFO] 검출 설정: {summary['detection']}")
+        for index, name in summary["decisions"]:
+            print(f"  frame {index}: {name}")
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as json_file:
+                json.dump(summary, json_file, ensure_ascii=False, indent=2)
@@ -0,0 +1,158 @@
+#프레임 간 얼굴 추적 + 시간 투표
+# 검출은 매 프레임 하지만 128차원 인코딩은 아직 확정되지 않은 얼굴만 매 프레임 계산하고
+# 확정된 얼굴은 reencode_interval 프레임이 지났거나 위치가 크게 바뀐 경우에만 다시 계산
+# (모르는 얼굴도 창 안에 Unknown 이 min_votes 번 나오면 확정된 것으로 보고 같은 주기로만 다시 계산)
+# 출입 판단은 한 번의 매칭 결과가 아니라 추적 대상별 최근 window 번의 인코딩 결과 투표로 결정
+# (투표는 실제로 인코딩/매칭한 프레임에서만 하므로 한 번 잘못 매칭된 결과가 여러 표가 되지 않음)
+#
+# 사용 예)
+#   tracker = FaceTracker()
+#   boxes = face_locations(image)                         # (top, right, bottom, left)
+#   name = tracker.step(boxes, frame.index, identify)     # identify(박스 목록) -> 이름 목록
+#   if name: door.request_open()
+
+from collections import Counter, deque
+from itertools import count
+from typing import Callable, List, Optional, Sequence, Tuple
+
+Box = Tuple[int, int, int, int]  # face_recognition 순서 (top, right, bottom, left)
+
+
+def box_iou(a: Box, b: Box) -> float:
+    top, right = max(a[0], b[0]), min(a[1], b[1])
+    bottom, left = min(a[2], b[2]), max(a[3], b[3])
+    inter = max(0, right - left) * max(0, bottom - top)
+    area_a = (a[1] - a[3]) * (a[2] - a[0])
+    area_b = (b[1] - b[3]) * (b[2] - b[0])
+    union = area_a + area_b - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _centroid_distance(a: Box, b: Box) -> float:
+    dy = (a[0] + a[2]) - (b[0] + b[2])
+    dx = (a[1] + a[3]) - (b[1] + b[3])
+    return 0.5 * (dx * dx + dy * dy) ** 0.5
+
+
+#추적 중인 얼굴 하나
+class Track:
+    def __init__(self, track_id: int, box: Box, frame_index: int, window: int):
+        self.track_id = track_id
+        self.box = box
+        self.last_seen = frame_index
+        self.missed = 0                       # 연속으로 놓친 프레임 수
+        self.name: Optional[str] = None       # 마지막 인코딩의 매칭 결과 (모르는 얼굴이면 None)
+        self.identified = False               # 한 번이라도 인코딩했는지
+        self.encoded_box: Optional[Box] = None
+        self.encoded_frame = -1
+        self.votes = deque(maxlen=window)     # 최근 인코딩들의 매칭 결과 (None 포함)
+
+    def __repr__(self):
+        return f"Track(id={self.track_id}, name={self.name!r}, box={self.box}, votes={list(self.votes)})"
+
+
+class FaceTracker:
+    def __init__(self, iou_threshold: float = 0.3, centroid_ratio: float = 0.5, max_missed: int = 5,
+                 reencode_interval: int = 10, reencode_iou: float = 0.5, window: int = 5, min_votes: int = 3):
+        self.iou_threshold = iou_threshold          # 이 값 이상 겹치면 같은 얼굴
+        self.centroid_ratio = centroid_ratio        # 겹침이 부족해도 중심 이동이 얼굴 크기의 이 비율 이내면 같은 얼굴
+        self.max_missed = max_missed                # 이만큼 연속으로 안 보이면 추적 종료
+        self.reencode_interval = reencode_interval  # 확정된 얼굴도 이 프레임 수마다 다시 인코딩
+        self.reencode_iou = reencode_iou            # 인코딩했을 때 위치와의 겹침이 이 값 미만이면 다시 인코딩
+        self.window = window                        # 투표 창 크기 (인코딩 횟수)
+        self.min_votes = min_votes                  # 창 안에서 같은 이름이 이만큼의 인코딩에서 나와야 출입 허용
+        if not 0 < min_votes <= window:
+            raise ValueError("min_votes must be between 1 and window")
+        self.tracks: List[Track] = []
+        self._ids = count(1)
+        self.encoded = 0                            # 실제로 인코딩한 얼굴 수
+        self.skipped = 0                            # 추적 덕분에 인코딩을 건너뛴 얼굴 수
+
+    def _similarity(self, track: Track, box: Box) -> float:
+        iou = box_iou(track.box, box)
+        if iou >= self.iou_threshold:
+            return 1.0 + iou
+        size = max(track.box[1] - track.box[3], track.box[2] - track.box[0], 1)
+        distance = _centroid_distance(track.box, box)
+        if distance <= self.centroid_ratio * size:
+            return 1.0 - distance / size  # 겹침으로 맞춘 쌍보다 항상 뒤에 고려
+        return 0.0
+
+    def update(self, boxes: Sequence[Box], frame_index: int) -> List[Track]:
+        """이번 프레임의 검출 결과를 기존 추적 대상에 연결하고, boxes 와 같은 순서의 Track 목록 반환"""
+        boxes = [tuple(int(value) for value in box) for box in boxes]
+        pairs = sorted(((self._similarity(track, box), t, b)
+                        for t, track in enumerate(self.tracks) for b, box in enumerate(boxes)), reverse=True)
+        assigned: List[Optional[Track]] = [None] * len(boxes)
+        used = set()
+        for similarity, t, b in pairs:
+            if similarity <= 0.0:
+                break
+            if t in used or assigned[b] is not None:
+                continue
+            used.add(t)
+            track = self.tracks[t]
+            track.box, track.last_seen, track.missed = boxes[b], frame_index, 0
+            assigned[b] = track
+
+        for t, track in enumerate(self.tracks):
+            if t not in used:
+                track.missed += 1
+        self.tracks = [track for track in self.tracks if track.missed <= self.max_missed]
+
+        for b, box in enumerate(boxes):
+            if assigned[b] is None:
+                assigned[b] = Track(next(self._ids), box, frame_index, self.window)
+                self.tracks.append(assigned[b])
+        return assigned
+
+    def _leading(self, track: Track) -> Tuple[Optional[str], int]:
+        """창 안에서 가장 많이 나온 이름과 그 표 수"""
+        counts = Counter(name for name in track.votes if name is not None)
+        return counts.most_common(1)[0] if counts else (None, 0)
+
+    def _settled(self, track: Track) -> bool:
+        """창 안에서 같은 결과 (모르는 얼굴 포함) 가 min_votes 번 이상 나왔는지"""
+        counts = Counter(track.votes)
+        return bool(counts) and counts.most_common(1)[0][1] >= self.min_votes
+
+    def needs_encoding(self, track: Track, frame_index: int) -> bool:
+        if not track.identified or not self._settled(track):
+            return True  # 아직 확정되지 않은 얼굴은 매 프레임 인코딩해서 표를 모음
+        if frame_index - track.encoded_frame >= self.reencode_interval:
+            return True
+        return box_iou(track.encoded_box, track.box) < self.reencode_iou
+
+    def record(self, track: Track, name: Optional[str], frame_index: int) -> None:
+        """인코딩/매칭 결과 기록 ("Unknown" 은 None 으로 취급), 인코딩 한 번이 한 표"""
+        track.name = None if name in (None, "Unknown") else name
+        track.votes.append(track.name)
+        track.identified = True
+        track.encoded_box = track.box
+        track.encoded_frame = frame_index
+
+    def decision(self) -> Optional[str]:
+        """현재 보이는 추적 대상 중 창 안에서 min_votes 이상 같은 이름이 나온 사용자 (없으면 None)"""
+        best, best_votes = None, 0
+        for track in self.tracks:
+            if track.missed:
+                continue
+            name, votes = self._leading(track)
+            if votes >= self.min_votes and votes > best_votes:
+                best, best_votes = name, votes
+        return best
+
+    def step(self, boxes: Sequence[Box], frame_index: int,
+             identify: Callable[[List[Box]], Sequence[Optional[str]]]) -> Optional[str]:
+        """한 프레임 처리: 추적 -> 필요한 얼굴만 identify 로 인코딩/매칭(투표) -> 출입 판단"""
+        tracks = self.update(boxes, frame_index)
+        pending = [track for track in tracks if self.needs_encoding(track, frame_index)]
+        if pending:
+            for track, name in zip(pending, identify([track.box for track in pending])):
+                self.record(track, name, frame_index)
+        self.encoded += len(pending)
+        self.skipped += len(tracks) - len(pending)
+        return self.decision()
+
+    def reset(self) -> None:
+        self.tracks = []
@@ -0,0 +1,117 @@
+#근사 검색(IVF) 과 전수 비교의 정확도/속도 비교 벤치마크
+# 사용법: python benchmarks/bench_ann.py --identities 2000 --per-identity 20 --nprobe 1 2 4 8 16 32
+#         python benchmarks/bench_ann.py --encodings output/encodings.fenc   (실제 학습 데이터, 인물별 1장을 질의로 뺌)
+#
+# 인물 중심 + 잡음을 낮은 차원에서 만든 가상 갤러리에서
+#   - 전수 비교 대비 1순위 이름 일치율 (recall@1)
+#   - 얼굴 1개당 매칭 시간 (ms)
+# 을 nprobe 별로 출력함 (질의마다 가장 가까운 다른 사람까지의 거리 분포도 같이 출력해서 데이터 난이도 확인)
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from AI.ann import IVFIndex, gallery_fingerprint  # noqa: E402
+from AI.matcher import GalleryMatcher, pairwise_distances  # noqa: E402
+from AI.store import dequantize, load_gallery  # noqa: E402
+
+
+def synthetic_gallery(identities, per_identity, queries, seed=0, latent_dim=32, strangers=0):
+    rng = np.random.default_rng(seed)
+    # 실제 128차원 인코딩처럼 변화가 적은 수의 방향에 몰려 있도록 latent_dim 차원에서 만들어 128차원으로 옮김
+    # (128차원 전체에 고르게 퍼진 잡음이면 질의가 자기 묶음을 벗어나지 않아 nprobe 1 에서도 recall 100%)
+    # 같은 사람끼리 ~0.3 (질의는 촬영 조건이 달라 조금 더 멂), 가장 가까운 다른 사람 ~0.5-0.6 (tolerance 0.6 근처)
+    basis = np.linalg.qr(rng.normal(size=(128, latent_dim)))[0].T
+    offset = rng.normal(0.0, 0.09, size=128)
+    centers = rng.normal(0.0, 0.1, size=(identities, latent_dim))
+    labels = np.repeat(np.arange(identities), per_identity)
+    encodings = (centers[labels] + rng.normal(0.0, 0.035, size=(len(labels), latent_dim))) @ basis + offset
+    query_labels = rng.integers(0, identities, size=queries)
+    query_encodings = (centers[query_labels] + rng.normal(0.0, 0.045, size=(queries, latent_dim))) @ basis + offset
+    if strangers:
+        # 갤러리에 없는 사람의 질의를 뒤에 붙임 (가장 가까운 거리가 tolerance 근처라 판정이 흔들리기 쉬움)
+        stranger_centers = rng.normal(0.0, 0.1, size=(strangers, latent_dim))
+        stranger_encodings = (stranger_centers + rng.normal(0.0, 0.045, size=(strangers, latent_dim))) @ basis + offset
+        query_encodings = np.concatenate([query_encodings, stranger_encodings])
+    return [f"person{label}" for label in labels], encodings, query_encodings
+
+
+#실제 저장소에서 인코딩이 2장 이상인 인물마다 1장씩 질의로 빼고 나머지를 갤러리로 사용
+def store_gallery(encodings_location, queries, seed=0):
+    store = load_gallery(encodings_location)
+    encodings = dequantize(store.matrix, store.scales)
+    labels = np.asarray(store.labels)
+    rng = np.random.default_rng(seed)
+    candidates = [label for label, count in enumerate(np.bincount(labels, minlength=len(store.label_names))) if count > 1]
+    held_out = [rng.choice(np.flatnonzero(labels == label))
+                for label in rng.permutation(candidates)[:queries]]
+    keep = np.ones(len(labels), dtype=bool)
+    keep[held_out] = False
+    names = [store.label_names[label] for label in labels[keep]]
+    return names, encodings[keep], encodings[held_out]
+
+
+#질의마다 두 번째로 가까운 사람까지의 거리 (1순위가 본인이면 가장 가까운 다른 사람)
+def nearest_impostor(names, encodings, queries):
+    labels = np.unique(names, return_inverse=True)[1]
+    order = np.argsort(labels, kind="stable")
+    starts = np.flatnonzero(np.r_[True, np.diff(labels[order]) != 0])
+    per_person = np.minimum.reduceat(pairwise_distances(queries, encodings)[:, order], starts, axis=1)
+    if per_person.shape[1] < 2:
+        return np.full(len(queries), np.inf)
+    return np.partition(per_person, 1, axis=1)[:, 1]
+
+
+def timed_match(matcher, queries, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = matcher.match(queries, k=1)
+        best = min(best, time.perf_counter() - started)
+    return results, best / len(queries) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IVF recall vs latency against exact search")
+    parser.add_argument("--identities", type=int, default=2000)
+    parser.add_argument("--per-identity", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--lists", type=int, help="Number of IVF lists (default 4*sqrt(N))")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64, 128])
+    parser.add_argument("--latent-dim", type=int, default=32, help="Directions the synthetic encodings vary in (lower = harder for IVF)")
+    parser.add_argument("--encodings", help="Benchmark on a real encoding store instead of synthetic data")
+    options = parser.parse_args()
+
+    if options.encodings:
+        names, encodings, queries = store_gallery(options.encodings, options.queries)
+    else:
+        names, encodings, queries = synthetic_gallery(options.identities, options.per_identity, options.queries,
+                                                      latent_dim=options.latent_dim)
+    matcher = GalleryMatcher(names, encodings)
+    print(f"gallery: {len(matcher)} encodings, {len(matcher.label_names)} identities, {len(queries)} queries")
+    impostor = nearest_impostor(names, encodings, queries)
+    print(f"nearest impostor distance p5/p50/p95: {' / '.join(f'{value:.3f}' for value in np.percentile(impostor, [5, 50, 95]))}")
+
+    exact, exact_ms = timed_match(matcher, queries)
+    exact_names = [result.names[0] for result in exact]
+    print(f"{'exact':>10} {'recall@1':>9} {100.0:>8.1f}% {exact_ms:>9.3f} ms/face")
+
+    started = time.perf_counter()
+    index = IVFIndex.build(matcher.matrix, n_lists=options.lists, fingerprint=gallery_fingerprint(matcher.norms))
+    print(f"index: {index.n_lists} lists, built in {time.perf_counter() - started:.2f} s")
+    for nprobe in options.nprobe:
+        matcher.use_index(index, nprobe)
+        approximate, approximate_ms = timed_match(matcher, queries)
+        recall = np.mean([result.names[0] == name for result, name in zip(approximate, exact_names)])
+        print(f"{'nprobe=' + str(nprobe):>10} {'recall@1':>9} {recall * 100:>8.1f}% {approximate_ms:>9.3f} ms/face "
+              f"(x{exact_ms / approximate_ms:.1f})")
+    matcher.use_index(None)
+
+
+if __name__ == "__main__":
+    main()
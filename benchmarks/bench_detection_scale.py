@@ -0,0 +1,71 @@
+#검출 축소 비율별 속도/재현율 비교 벤치마크
+# 사용법: python benchmarks/bench_detection_scale.py training --scales 1 0.75 0.5 0.33 0.25 --max-side 1024
+#
+# 원본 해상도 검출 결과를 기준으로, 비율마다
+#   - 검출 평균 시간 (ms)
+#   - 재현율: 원본에서 찾은 얼굴 중 IoU >= 0.5 로 다시 찾은 비율
+#   - 인코딩 차이: 같은 얼굴의 원본 기준 인코딩과의 평균 거리 (인코딩은 항상 원본 해상도에서 계산)
+# 을 출력함
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def iou(box_a, box_b):
+    top_a, right_a, bottom_a, left_a = box_a
+    top_b, right_b, bottom_b, left_b = box_b
+    width = max(0, min(right_a, right_b) - max(left_a, left_b))
+    height = max(0, min(bottom_a, bottom_b) - max(top_a, top_b))
+    intersection = width * height
+    union = (right_a - left_a) * (bottom_a - top_a) + (right_b - left_b) * (bottom_b - top_b) - intersection
+    return intersection / union if union else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detection latency / recall per downscale factor")
+    parser.add_argument("images", help="Directory with face images (searched recursively)")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0, 0.75, 0.5, 0.33, 0.25])
+    parser.add_argument("--max-side", type=int, nargs="*", default=[], help="Also benchmark these target max sides")
+    parser.add_argument("-m", default="hog", choices=["hog", "cnn"])
+    parser.add_argument("--limit", type=int, default=50, help="Maximum number of images")
+    options = parser.parse_args()
+
+    import numpy as np
+    import face_recognition
+    from AI import detector
+
+    filepaths = sorted(path for path in Path(options.images).rglob("*")
+                       if path.suffix.lower() in detector.IMAGE_SUFFIXES)[:options.limit]
+    images = [detector.load_image(path) for path in filepaths]
+    print(f"{len(images)} images, mean size {np.mean([image.shape[1] * image.shape[0] for image in images]) / 1e6:.1f} MP")
+
+    reference = [face_recognition.face_locations(image, model=options.m) for image in images]
+    reference_encodings = [face_recognition.face_encodings(image, boxes) for image, boxes in zip(images, reference)]
+    total_faces = sum(len(boxes) for boxes in reference)
+
+    settings = [(scale, None) for scale in options.scales] + [(1.0, side) for side in options.max_side]
+    print(f"{'setting':>14} {'detect ms':>10} {'recall':>8} {'enc diff':>9}")
+    for scale, max_side in settings:
+        elapsed, found, drift = 0.0, 0, []
+        for image, boxes, encodings in zip(images, reference, reference_encodings):
+            started = time.perf_counter()
+            detected = detector.detect_faces(image, model=options.m, scale=scale, max_side=max_side)
+            elapsed += time.perf_counter() - started
+            detected_encodings = face_recognition.face_encodings(image, detected)
+            for box, encoding in zip(boxes, encodings):
+                overlaps = [iou(box, candidate) for candidate in detected]
+                if overlaps and max(overlaps) >= 0.5:
+                    found += 1
+                    drift.append(np.linalg.norm(detected_encodings[int(np.argmax(overlaps))] - encoding))
+        label = f"max_side={max_side}" if max_side else f"scale={scale:g}"
+        recall = found / total_faces if total_faces else float("nan")
+        print(f"{label:>14} {elapsed / max(len(images), 1) * 1000:>10.1f} {recall:>8.1%} "
+              f"{np.mean(drift) if drift else float('nan'):>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#HuskyLens 응답 파싱/명령 생성 속도 비교 (예전 hex 문자열 방식 vs struct 바이너리 코덱)
+# 사용법: python benchmarks/bench_huskylib_codec.py --blocks 1 4 8 --repeat 20000
+#
+# 정보 프레임 1개 + 블록 프레임 N개로 된 응답을
+#   - hex: byteString.hex() -> splitCommandToParts -> 2글자씩 int(..., 16) (예전 processReturnData 와 같은 방식)
+#   - struct: parseFrame (체크섬 확인 포함) -> decodeInfo / decodeObject
+#   - array: parseFrame -> decodeObjectArray (프레임의 모든 객체를 NumPy 구조체 배열 하나로, requestAll(batch=True) 와 같은 방식)
+# 로 파싱하는 시간과, 같은 응답을 --baud 속도의 시리얼로 받는 데 걸리는 시간을 비교
+# 명령 생성은 hex 문자열 + calculateChecksum + cmdToBytes 와 미리 만들어둔 프레임/buildCommand 를 비교
+import argparse
+import struct
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "HSKLNS_1"))
+
+import huskylib  # noqa: E402
+from huskylib import (COMMAND_FRAMES, COMMAND_REQUEST, COMMAND_REQUEST_LEARN, COMMAND_RETURN_BLOCK,  # noqa: E402
+                      COMMAND_RETURN_INFO, ID_STRUCT, HuskyLensLibrary, buildCommand, decodeInfo, decodeObject,
+                      decodeObjectArray, parseFrame)
+
+BITS_PER_BYTE = 10  # 8N1: 시작 비트 + 8 + 정지 비트
+
+
+def sample_response(blocks):
+    info = buildCommand(COMMAND_RETURN_INFO, struct.pack("<HHHI", blocks, 3, 1234, 0))
+    objects = [buildCommand(COMMAND_RETURN_BLOCK, struct.pack("<5H", 10 + 30 * i, 20 + i, 40, 50, i + 1))
+               for i in range(blocks)]
+    return info, objects
+
+
+#예전 processReturnData 의 파싱 부분 (16비트 값을 low+255+high 로 읽던 것까지 그대로)
+def parse_hex(library, info, objects):
+    commandSplit = library.splitCommandToParts(info.hex())
+    numberOfBlocksOrArrow = int(commandSplit[4][2:4] + commandSplit[4][0:2], 16)
+    returnData, isBlock = [], True
+    for frame in objects[:numberOfBlocksOrArrow]:
+        objectSplit = library.splitCommandToParts(frame.hex())
+        isBlock = objectSplit[3] == "2a"
+        returnData.append(objectSplit[4])
+    finalData = []
+    for i in returnData:
+        tmp = []
+        for q in range(0, len(i), 4):
+            low = int(i[q:q + 2], 16)
+            high = int(i[q + 2:q + 4], 16)
+            tmp.append(low + 255 + high if high > 0 else low)
+        finalData.append(tmp)
+    return library.convert_to_class_object(finalData, isBlock)
+
+
+def parse_struct(info, objects):
+    command, data = parseFrame(info)
+    numberOfBlocksOrArrow = decodeInfo(data)[0]
+    return [decodeObject(*parseFrame(frame)) for frame in objects[:numberOfBlocksOrArrow]]
+
+
+def parse_array(info, objects):
+    command, data = parseFrame(info)
+    numberOfBlocksOrArrow = decodeInfo(data)[0]
+    return decodeObjectArray([parseFrame(frame) for frame in objects[:numberOfBlocksOrArrow]])
+
+
+def timed(func, repeat):
+    func()  # 첫 호출의 import (batch 모드의 numpy) 는 제외
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HuskyLens protocol parsing: legacy hex strings vs struct codec")
+    parser.add_argument("--blocks", type=int, nargs="+", default=[0, 1, 4, 8])
+    parser.add_argument("--repeat", type=int, default=20000)
+    parser.add_argument("--baud", type=int, default=9600, help="Serial speed used for the link-time column (raspitest1 uses 9600)")
+    options = parser.parse_args()
+
+    library = HuskyLensLibrary.__new__(HuskyLensLibrary)  # 장치 없이 파싱 메서드만 사용
+    print(f"{'blocks':>6} {'bytes':>6} {'hex us':>9} {'struct us':>10} {'speedup':>8} {'array us':>9} {'link us':>10}")
+    for blocks in options.blocks:
+        info, objects = sample_response(blocks)
+        size = len(info) + sum(len(frame) for frame in objects)
+        hex_us = timed(lambda: parse_hex(library, info, objects), options.repeat)
+        struct_us = timed(lambda: parse_struct(info, objects), options.repeat)
+        array_us = timed(lambda: parse_array(info, objects), options.repeat)
+        link_us = size * BITS_PER_BYTE / options.baud * 1e6
+        print(f"{blocks:>6} {size:>6} {hex_us:>9.2f} {struct_us:>10.2f} {hex_us / struct_us:>7.1f}x {array_us:>9.2f} {link_us:>10.0f}")
+
+    def build_hex_fixed():
+        return library.cmdToBytes(huskylib.commandHeaderAndAddress + "002030")
+
+    def build_hex_learn():
+        data = "{:04x}".format(300)
+        cmd = huskylib.commandHeaderAndAddress + "0236" + data[2:] + data[0:2]
+        return library.cmdToBytes(cmd + library.calculateChecksum(cmd))
+
+    print()
+    print(f"{'command':>14} {'hex us':>9} {'struct us':>10}")
+    print(f"{'requestAll':>14} {timed(build_hex_fixed, options.repeat):>9.2f} "
+          f"{timed(lambda: COMMAND_FRAMES[COMMAND_REQUEST], options.repeat):>10.2f}")
+    print(f"{'learn(300)':>14} {timed(build_hex_learn, options.repeat):>9.2f} "
+          f"{timed(lambda: buildCommand(COMMAND_REQUEST_LEARN, ID_STRUCT.pack(300)), options.repeat):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
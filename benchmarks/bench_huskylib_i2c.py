@@ -0,0 +1,105 @@
+#HuskyLens I2C 응답 읽기의 버스 트랜잭션 수 비교 (바이트마다 read_byte vs i2c_rdwr 블록 읽기)
+# 사용법: python benchmarks/bench_huskylib_i2c.py --blocks 0 1 4 8 --clock 100000
+#
+# 가짜 SMBus 가 requestAll 응답(정보 프레임 + 블록 프레임 N개)을 돌려주고 트랜잭션 수와 바이트 수를 셈
+# 버스 시간은 트랜잭션마다 시작/주소/정지 (약 11비트), 데이터 바이트마다 9비트로 어림잡아 --clock 속도로 계산
+# (실제 라즈베리파이에서는 트랜잭션마다 커널 호출 비용이 더해지므로 차이가 더 큼)
+import argparse
+import struct
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "HSKLNS_1"))
+
+from huskylib import COMMAND_RETURN_BLOCK, COMMAND_RETURN_INFO, HuskyLensLibrary, buildCommand  # noqa: E402
+
+TRANSACTION_BITS = 11  # 시작 + 주소 바이트(ACK 포함) + 정지
+BYTE_BITS = 9          # 데이터 8비트 + ACK
+
+
+#smbus2.i2c_msg.read 대신 쓰는 읽기 메시지
+class FakeMessage:
+    def __init__(self, address, size):
+        self.address = address
+        self.size = size
+        self.buf = b""
+
+    @classmethod
+    def read(cls, address, size):
+        return cls(address, size)
+
+    def __bytes__(self):
+        return self.buf
+
+
+#명령을 받으면 준비된 응답을 내보내는 가짜 SMBus (트랜잭션/바이트 수 기록)
+class FakeSMBus:
+    def __init__(self, response: bytes, block_reads: bool = True):
+        self.response = response
+        self.pending = bytearray()
+        self.transactions = 0
+        self.bytes = 0
+        if not block_reads:
+            self.i2c_rdwr = None  # 예전 smbus 모듈처럼 블록 읽기가 없는 버스
+
+    def write_i2c_block_data(self, address, register, data):
+        self.transactions += 1
+        self.bytes += 1 + len(data)
+        self.pending = bytearray(self.response)
+
+    def read_byte(self, address):
+        self.transactions += 1
+        self.bytes += 1
+        value = self.pending[0]
+        del self.pending[0]
+        return value
+
+    def i2c_rdwr(self, *messages):
+        for message in messages:
+            self.transactions += 1
+            self.bytes += message.size
+            message.buf = bytes(self.pending[:message.size])
+            del self.pending[:message.size]
+
+
+def sample_response(blocks):
+    info = buildCommand(COMMAND_RETURN_INFO, struct.pack("<HHHI", blocks, 3, 1234, 0))
+    objects = b"".join(buildCommand(COMMAND_RETURN_BLOCK, struct.pack("<5H", 10 + 30 * i, 20 + i, 40, 50, i + 1))
+                       for i in range(blocks))
+    return info + objects
+
+
+def measure(response, block_reads, repeat, clock):
+    bus = FakeSMBus(response, block_reads=block_reads)
+    huskylens = HuskyLensLibrary("I2C", bus=bus)
+    if block_reads:
+        huskylens.transport.i2cMsg = FakeMessage  # smbus2 가 없어도 블록 읽기 경로를 측정
+    started = time.perf_counter()
+    for _ in range(repeat):
+        huskylens.requestAll()
+    python_us = (time.perf_counter() - started) / repeat * 1e6
+    transactions, size = bus.transactions / repeat, bus.bytes / repeat
+    bus_us = (transactions * TRANSACTION_BITS + size * BYTE_BITS) / clock * 1e6
+    return transactions, bus_us, python_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HuskyLens I2C bus transactions: per-byte reads vs block reads")
+    parser.add_argument("--blocks", type=int, nargs="+", default=[0, 1, 4, 8])
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--clock", type=int, default=100000, help="I2C clock in Hz used for the bus-time estimate")
+    options = parser.parse_args()
+
+    print(f"{'blocks':>6} {'bytes':>6} {'per-byte tx':>12} {'bus us':>8} {'py us':>8} {'block tx':>9} {'bus us':>8} {'py us':>8}")
+    for blocks in options.blocks:
+        response = sample_response(blocks)
+        byte_tx, byte_bus, byte_py = measure(response, False, options.repeat, options.clock)
+        block_tx, block_bus, block_py = measure(response, True, options.repeat, options.clock)
+        print(f"{blocks:>6} {len(response):>6} {byte_tx:>12.0f} {byte_bus:>8.0f} {byte_py:>8.1f} "
+              f"{block_tx:>9.0f} {block_bus:>8.0f} {block_py:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#정밀도별(float64 / float32 / float16 / int8) 갤러리의 정확도/속도/메모리 비교 벤치마크
+# 사용법: python benchmarks/bench_quantized_gallery.py --identities 2000 --per-identity 20
+#
+# bench_ann.py 와 같은 가상 갤러리 (갤러리에 없는 사람의 질의 --strangers 개 포함) 에서 float64 전수 비교를 기준으로
+#   - 1순위 이름 일치율, 인식 결과(identify, tolerance 판정 포함) 일치율
+#   - 거리 최대 오차
+#   - 얼굴 1개당 매칭 시간 (ms)
+#   - 갤러리 메모리 (인코딩 행렬 + 노름)
+# 을 출력함
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from AI.matcher import DEFAULT_TOLERANCE, GalleryMatcher  # noqa: E402
+from AI.store import PRECISIONS  # noqa: E402
+
+sys.path.insert(0, str(ROOT / "benchmarks"))
+from bench_ann import synthetic_gallery, timed_match  # noqa: E402
+
+
+#float64 기준값 (matcher 와 같은 행렬곱 방식을 배정밀도로)
+def float64_distances(encodings, queries):
+    encodings = np.asarray(encodings, dtype=np.float64)
+    queries = np.asarray(queries, dtype=np.float64)
+    squared = np.einsum("ij,ij->i", queries, queries)[:, None] + np.einsum("ij,ij->i", encodings, encodings)[None, :] \
+        - 2.0 * (queries @ encodings.T)
+    return np.sqrt(np.maximum(squared, 0.0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accuracy, latency and memory of reduced-precision galleries against float64")
+    parser.add_argument("--identities", type=int, default=2000)
+    parser.add_argument("--per-identity", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--strangers", type=int, default=200, help="Extra queries from people who are not in the gallery")
+    options = parser.parse_args()
+
+    names, encodings, queries = synthetic_gallery(options.identities, options.per_identity, options.queries,
+                                                  strangers=options.strangers)
+    print(f"gallery: {len(names)} encodings, {options.identities} identities, "
+          f"{options.queries} queries + {options.strangers} strangers")
+
+    # float64 기준: 거리, matcher 와 같은 규칙 (득표수 -> 인물별 최소 거리) 으로 정한 1순위, tolerance 판정
+    reference_ms = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        reference = float64_distances(encodings, queries)
+        reference_ms = min(reference_ms, (time.perf_counter() - started) / len(queries) * 1000)
+    labels = np.unique(names, return_inverse=True)[1]
+    person_names = np.unique(names)
+    order = np.argsort(labels, kind="stable")
+    starts = np.flatnonzero(np.r_[True, np.diff(labels[order]) != 0])
+    votes = np.add.reduceat((reference[:, order] <= DEFAULT_TOLERANCE).astype(np.int32), starts, axis=1)
+    min_distances = np.minimum.reduceat(reference[:, order], starts, axis=1)
+    best = [np.lexsort((row_distances, -row_votes))[0] for row_votes, row_distances in zip(votes, min_distances)]
+    reference_top = [person_names[person] for person in best]
+    reference_known = votes[np.arange(len(queries)), best] > 0
+    closest = min_distances.min(axis=1)
+    print(f"queries with the closest face within 0.01 of tolerance {DEFAULT_TOLERANCE}: "
+          f"{np.sum(np.abs(closest - DEFAULT_TOLERANCE) <= 0.01)}")
+    reference_bytes = np.asarray(encodings, dtype=np.float64).nbytes
+    print(f"{'float64':>8} {'top1 100.0%':>12} {'identify 100.0%':>16} {'max err 0':>18} "
+          f"{reference_ms:>9.3f} ms/face {reference_bytes / 1e6:>8.2f} MB")
+
+    for precision in PRECISIONS:
+        matcher = GalleryMatcher(names, encodings, precision=precision)
+        results, match_ms = timed_match(matcher, queries)
+        top = [result.names[0] for result in results]
+        identified = [result.name for result in results]
+        expected = [name if known else None for name, known in zip(reference_top, reference_known)]
+        # matcher 는 인물별로 묶인 순서라 열 순서가 다르므로 같은 순서로 맞춰서 비교
+        error = np.abs(matcher.face_distances(queries) - reference[:, order]).max()
+        memory = matcher.matrix.nbytes + matcher.norms.nbytes + (matcher.scales.nbytes if matcher.scales is not None else 0)
+        top1 = np.mean([a == b for a, b in zip(top, reference_top)]) * 100
+        agreement = np.mean([a == b for a, b in zip(identified, expected)]) * 100
+        print(f"{precision:>8} {'top1 ' + format(top1, '.1f') + '%':>12} {'identify ' + format(agreement, '.1f') + '%':>16} "
+              f"{'max err ' + format(error, '.2e'):>18} {match_ms:>9.3f} ms/face {memory / 1e6:>8.2f} MB "
+              f"(x{reference_bytes / memory:.1f} smaller)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#detector 모듈 import / warm_up 시간 측정
+# 사용법: python benchmarks/bench_startup.py [--repeat 5] [--top 15]
+#
+# 새 파이썬 프로세스에서 `python -X importtime -c "from AI import detector"` 를 실행해
+#   - import 전체 시간 (여러 번 실행한 중앙값)
+#   - -X importtime 기준으로 누적 시간이 가장 큰 모듈
+#   - warm_up() (dlib 와 모델 파일 로딩) 시간
+# 을 출력함. face_recognition 이 목록에 보이면 import 시점에 dlib 를 불러오고 있다는 뜻
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); from AI import detector; print(time.perf_counter() - t)"
+WARM_UP_SNIPPET = "from AI import detector; print(detector.warm_up())"
+
+
+def run_python(args):
+    return subprocess.run([sys.executable] + args, cwd=ROOT, capture_output=True, text=True, check=True)
+
+
+#-X importtime 출력 (import time: self [us] | cumulative | imported package) 해석
+def parse_importtime(stderr: str):
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((int(cumulative_us), int(self_us), name))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure detector import and warm-up time")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--skip-warm-up", action="store_true", help="Only measure the import (no dlib needed)")
+    options = parser.parse_args()
+
+    import_times = [float(run_python(["-c", IMPORT_SNIPPET]).stdout.strip()) for _ in range(options.repeat)]
+    print(f"import AI.detector: median {statistics.median(import_times) * 1000:.1f} ms "
+          f"(min {min(import_times) * 1000:.1f}, max {max(import_times) * 1000:.1f}, n={options.repeat})")
+
+    rows = parse_importtime(run_python(["-X", "importtime", "-c", "from AI import detector"]).stderr)
+    print(f"\n{'cumulative ms':>14} {'self ms':>8}  module")
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[:options.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>8.1f}  {name}")
+    heavy = [name for _, _, name in rows if name.strip() in ("face_recognition", "dlib", "_dlib_pybind11")]
+    print(f"\ndlib imported eagerly: {'YES' if heavy else 'no'}")
+
+    if not options.skip_warm_up:
+        warm_up = float(run_python(["-c", WARM_UP_SNIPPET]).stdout.strip().splitlines()[-1])
+        print(f"detector.warm_up(): {warm_up * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()